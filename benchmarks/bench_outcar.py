@@ -0,0 +1,311 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+"""
+Scaling benchmark of the OUTCAR parser.
+
+Synthetic OUTCAR files of growing size are written with outcar_generator.write_outcar(), then the run time and the
+peak memory (as traced by tracemalloc) of Outcar.from_file() and of every Outcar.get_*() extractor are measured. The
+results are printed as scaling curves together with the exponent of a power law fit and compared to the stored
+baseline - the benchmark fails if any time or memory exceeds the baseline by more than the tolerance factor.
+
+    python benchmarks/bench_outcar.py                    # compare to benchmarks/outcar_baseline.json
+    python benchmarks/bench_outcar.py --update-baseline  # store the current results as baseline
+
+The times in the baseline are normalized by a calibration workload, so a baseline recorded on one machine can be
+used on another one.
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+from outcar_generator import write_outcar
+from vaspparser.vasp.parser.outcar import Outcar
+
+BASELINE_FILENAME = os.path.join(os.path.dirname(__file__), "outcar_baseline.json")
+
+# the size of the generated OUTCAR files is scaled along one of these dimensions, starting from DEFAULT_CONFIGURATION
+SCALING_DIMENSIONS = {
+    "n_ionic_steps": [25, 50, 100, 200],
+    "n_atoms": [8, 16, 32, 64],
+}
+DEFAULT_CONFIGURATION = {
+    "n_atoms": 16,
+    "n_ionic_steps": 50,
+    "n_scf_steps": 8,
+    "spin": True,
+    "n_kpoints": 4,
+    "md": True,
+}
+
+
+def get_extractors():
+    """
+    Returns:
+        list: names of the Outcar.get_*() extractors which parse a quantity from the lines of an OUTCAR file
+    """
+    return [
+        name
+        for name, function in inspect.getmembers(Outcar, inspect.isfunction)
+        if name.startswith("get_")
+        and not name.endswith("_from_line")
+        and "lines" in inspect.signature(function).parameters
+    ]
+
+
+def calibrate(repeat=5):
+    """
+    Time a fixed workload similar to parsing - splitting and converting text - to normalize the measured times.
+
+    Args:
+        repeat (int): number of repetitions, the fastest is used
+
+    Returns:
+        float: time of the workload in seconds
+    """
+    text = " ".join(str(x) for x in np.linspace(-1000, 1000, 200000)) + "\n"
+    lines = [text[i : i + 80] for i in range(0, len(text), 80)]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        np.array("".join(lines).split()[:-1], dtype=float)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(function, repeat=3):
+    """
+    Args:
+        function (callable): function without arguments to measure
+        repeat (int): number of timed repetitions, the fastest is used
+
+    Returns:
+        float: run time in seconds
+        float: peak memory allocated during one call in MB
+    """
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    tracemalloc.start()
+    try:
+        function()
+        peak_memory = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak_memory
+
+
+def check_outcar(filename, quantities):
+    """
+    Check that the quantities parsed from a generated OUTCAR file match the quantities written to it.
+
+    Args:
+        filename (str): path of the OUTCAR file
+        quantities (dict): quantities returned by write_outcar()
+    """
+    outcar = Outcar()
+    outcar.from_file(filename=filename)
+    for key, value in quantities.items():
+        if not np.allclose(outcar.parse_dict[key], value):
+            raise AssertionError("Parsing " + key + " from " + filename + " failed")
+
+
+def run_benchmark(dimension, sizes, configuration, repeat=3):
+    """
+    Args:
+        dimension (str): key of the configuration which is scaled
+        sizes (list): values of the scaled dimension
+        configuration (dict): arguments of write_outcar() for the other dimensions
+        repeat (int): number of timed repetitions
+
+    Returns:
+        dict: for each size the run time in seconds and peak memory in MB of from_file() and each extractor
+    """
+    results = dict()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "OUTCAR")
+        for size in sizes:
+            quantities = write_outcar(
+                filename, **dict(configuration, **{dimension: size})
+            )
+            check_outcar(filename=filename, quantities=quantities)
+            with open(filename, "r", errors="ignore") as f:
+                lines = f.readlines()
+            outcar = Outcar()
+            functions = {"from_file": lambda: Outcar().from_file(filename=filename)}
+            for name in get_extractors():
+                functions[name] = lambda name=name: getattr(outcar, name)(
+                    filename=filename, lines=lines
+                )
+            results[str(size)] = {
+                name: dict(
+                    zip(("time", "memory"), measure(function=function, repeat=repeat))
+                )
+                for name, function in functions.items()
+            }
+    return results
+
+
+def get_scaling_exponent(sizes, timings):
+    """
+    Args:
+        sizes (list): sizes of the OUTCAR files
+        timings (list): corresponding run times
+
+    Returns:
+        float: exponent b of the power law fit timings = a * sizes^b
+    """
+    timings = np.maximum(timings, 1e-9)
+    return np.polyfit(np.log(sizes), np.log(timings), 1)[0]
+
+
+def report(dimension, results):
+    """
+    Print the scaling curve of from_file() and each extractor along one dimension.
+
+    Args:
+        dimension (str): scaled dimension
+        results (dict): results of run_benchmark()
+    """
+    sizes = [int(size) for size in results.keys()]
+    names = list(results[str(sizes[0])].keys())
+    print("\nScaling with " + dimension + " - time in ms (peak memory in MB)")
+    print(
+        "{:32s}".format("")
+        + "".join("{:>18d}".format(size) for size in sizes)
+        + "{:>10s}".format("exponent")
+    )
+    for name in names:
+        timings = [results[str(size)][name]["time"] for size in sizes]
+        print(
+            "{:32s}".format(name)
+            + "".join(
+                "{:>10.2f} ({:5.1f})".format(
+                    1000 * results[str(size)][name]["time"],
+                    results[str(size)][name]["memory"],
+                )
+                for size in sizes
+            )
+            + "{:>10.2f}".format(get_scaling_exponent(sizes, timings))
+        )
+
+
+def compare(results, baseline, calibration, tolerance, min_time=5e-3):
+    """
+    Compare the results to the baseline. Single timings are noisy, so the time of an extractor counts as a regression
+    only if the median ratio to the baseline over all sizes of a dimension exceeds the tolerance. The peak memory is
+    reproducible and compared for each size.
+
+    Args:
+        results (dict): results of run_benchmark() for each scaled dimension
+        baseline (dict): stored baseline with the same layout and the calibration time
+        calibration (float): calibration time of this machine
+        tolerance (float): factor by which a time or memory may exceed the baseline
+        min_time (float): times below this threshold (in seconds) are too noisy to be compared
+
+    Returns:
+        list: descriptions of the regressions
+    """
+    regressions = []
+    scale = calibration / baseline["calibration"]
+    for dimension, dimension_results in results.items():
+        time_ratios = dict()
+        for size, size_results in dimension_results.items():
+            for name, result in size_results.items():
+                try:
+                    reference = baseline["results"][dimension][size][name]
+                except KeyError:
+                    continue
+                time_ratios.setdefault(name, []).append(
+                    result["time"] / max(reference["time"] * scale, min_time)
+                )
+                if result["memory"] > max(tolerance * reference["memory"], 1.0):
+                    regressions.append(
+                        "{} ({}={}): {:.1f} MB, baseline {:.1f} MB".format(
+                            name, dimension, size, result["memory"], reference["memory"]
+                        )
+                    )
+        for name, ratios in time_ratios.items():
+            if np.median(ratios) > tolerance:
+                regressions.append(
+                    "{} (scaling {}): {:.1f} times slower than the baseline".format(
+                        name, dimension, np.median(ratios)
+                    )
+                )
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--baseline", default=BASELINE_FILENAME)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the results as new baseline instead of comparing to it",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=3.0,
+        help="factor by which a result may exceed the baseline",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--dimension", choices=list(SCALING_DIMENSIONS.keys()), action="append"
+    )
+    args = parser.parse_args(args)
+    warnings.simplefilter("ignore")
+    calibration = calibrate()
+    results = dict()
+    for dimension in args.dimension or SCALING_DIMENSIONS.keys():
+        results[dimension] = run_benchmark(
+            dimension=dimension,
+            sizes=SCALING_DIMENSIONS[dimension],
+            configuration=DEFAULT_CONFIGURATION,
+            repeat=args.repeat,
+        )
+        report(dimension=dimension, results=results[dimension])
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"calibration": calibration, "results": results}, f, indent=1)
+        print("\nBaseline stored in " + args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline found at " + args.baseline)
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(
+        results=results,
+        baseline=baseline,
+        calibration=calibration,
+        tolerance=args.tolerance,
+    )
+    if len(regressions) > 0:
+        print("\nRegressions compared to the baseline:")
+        print("\n".join("  " + regression for regression in regressions))
+        return 1
+    print("\nNo regressions compared to the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
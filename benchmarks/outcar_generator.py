@@ -0,0 +1,426 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+"""
+Generator for synthetic OUTCAR files of configurable size, which follow the layout of the OUTCAR files written by
+VASP 5.4 closely enough to be parsed by vaspparser.vasp.parser.outcar.Outcar.
+"""
+
+import numpy as np
+
+SEPARATOR = " " + "-" * 103 + "\n"
+
+
+def write_outcar(
+    filename,
+    n_atoms=8,
+    n_ionic_steps=10,
+    n_scf_steps=5,
+    spin=False,
+    n_kpoints=1,
+    n_bands=None,
+    md=False,
+    seed=0,
+):
+    """
+    Write a synthetic OUTCAR file.
+
+    Args:
+        filename (str): path of the OUTCAR file to write
+        n_atoms (int): number of atoms
+        n_ionic_steps (int): number of ionic steps
+        n_scf_steps (int): number of electronic (SCF) steps per ionic step
+        spin (bool): spin polarized calculation (ISPIN = 2) with magnetization tables
+        n_kpoints (int): number of irreducible k-points
+        n_bands (int/None): number of bands, 4 per atom (but at least 8) if None
+        md (bool): molecular dynamics run, which prints the temperature of every ionic step
+        seed (int): seed of the random numbers
+
+    Returns:
+        dict: the quantities written to the file - "energies" (free energies), "energies_zero", "forces",
+              "positions", "cells" and "temperatures" of every ionic step
+    """
+    rng = np.random.default_rng(seed)
+    if n_bands is None:
+        n_bands = max(8, 4 * n_atoms)
+    n_spin = 2 if spin else 1
+    kpoints = rng.random((n_kpoints, 3)).round(6)
+    cell = np.eye(3) * (2.0 * max(n_atoms, 1) ** (1 / 3) + 2.0)
+    positions = rng.random((n_atoms, 3)) @ cell
+    quantities = {
+        "energies": [],
+        "energies_zero": [],
+        "forces": [],
+        "positions": [],
+        "cells": [],
+        "temperatures": [],
+    }
+    with open(filename, "w") as f:
+        f.write(
+            _get_header(
+                n_atoms=n_atoms,
+                n_spin=n_spin,
+                kpoints=kpoints,
+                n_bands=n_bands,
+                positions=positions,
+                cell=cell,
+                md=md,
+            )
+        )
+        for step in range(n_ionic_steps):
+            energy = -5.0 * n_atoms + rng.normal(scale=0.1)
+            energy_zero = energy + rng.normal(scale=1e-3)
+            forces = rng.normal(scale=0.1, size=(n_atoms, 3)).round(6)
+            positions = (positions + rng.normal(scale=0.01, size=(n_atoms, 3))).round(5)
+            cell = (cell * (1 + rng.normal(scale=1e-3))).round(9)
+            temperature = round(300 + rng.normal(scale=10), 2)
+            for scf_step in range(n_scf_steps):
+                scf_energy = energy + 10.0 ** (1 - scf_step) * rng.random()
+                if scf_step == n_scf_steps - 1:
+                    scf_energy = energy
+                f.write(
+                    _get_scf_step(
+                        ionic_step=step + 1,
+                        scf_step=scf_step + 1,
+                        energy=scf_energy,
+                        energy_zero=energy_zero,
+                        n_atoms=n_atoms,
+                        spin=spin,
+                        rng=rng,
+                    )
+                )
+            f.write(
+                _get_ionic_step_end(
+                    energy=energy,
+                    energy_zero=energy_zero,
+                    forces=forces,
+                    positions=positions,
+                    cell=cell,
+                    kpoints=kpoints,
+                    n_bands=n_bands,
+                    n_spin=n_spin,
+                    temperature=temperature if md else None,
+                    rng=rng,
+                )
+            )
+            quantities["energies"].append(round(energy, 8))
+            quantities["energies_zero"].append(round(energy_zero, 8))
+            quantities["forces"].append(forces)
+            quantities["positions"].append(positions)
+            quantities["cells"].append(cell)
+            quantities["temperatures"].append(temperature if md else 0.0)
+        f.write(_get_footer(n_atoms=n_atoms, spin=spin, rng=rng))
+    return {key: np.array(value) for key, value in quantities.items()}
+
+
+def _get_header(n_atoms, n_spin, kpoints, n_bands, positions, cell, md):
+    n_kpoints = len(kpoints)
+    weight = 1.0 / n_kpoints
+    lines = [
+        " vasp.5.4.4.18Apr17-6-g9f103f2a35 (build Feb 19 2020 16:12:31) complex\n",
+        "  \n",
+        " executed on             LinuxIFC date 2021.07.28  16:22:10\n",
+        " POTCAR:    PAW_PBE Fe 06Sep2000\n",
+        "   TITEL  = PAW_PBE Fe 06Sep2000\n",
+        " kinetic energy error for atom=    0.0020 (will be added to EATOM!!)\n",
+        "\n",
+        " Subroutine IBZKPT returns following result:\n",
+        " ===========================================\n",
+        "\n",
+        " Found {:6d} irreducible k-points:\n".format(n_kpoints),
+        "\n",
+        " Following reciprocal coordinates:\n",
+        "            Coordinates               Weight\n",
+    ]
+    lines += [
+        "{:10.6f}{:10.6f}{:10.6f}{:14.6f}\n".format(*kpoint, 1.0) for kpoint in kpoints
+    ]
+    lines += [
+        "\n",
+        " Following cartesian coordinates:\n",
+        "            Coordinates               Weight\n",
+    ]
+    lines += [
+        "{:10.6f}{:10.6f}{:10.6f}{:14.6f}\n".format(*(kpoint / cell[0, 0]), 1.0)
+        for kpoint in kpoints
+    ]
+    lines += [
+        "\n",
+        SEPARATOR,
+        "\n",
+        " Dimension of arrays:\n",
+        "   k-points           NKPTS = {:6d}   k-points in BZ     NKDIM = {:6d}   number of bands    NBANDS= {:6d}\n".format(
+            n_kpoints, n_kpoints, n_bands
+        ),
+        "   number of dos      NEDOS =    301   number of ions     NIONS = {:6d}\n".format(
+            n_atoms
+        ),
+        "   ions per type = {:15d}\n".format(n_atoms),
+        " Ionic relaxation\n",
+        "   NSW    =    100    number of steps for IOM\n",
+        "   NBLOCK =      1;   KBLOCK =    100    inner block; outer block\n",
+        "   IBRION = {:6d}    ionic relax: 0-MD 1-quasi-New 2-CG\n".format(
+            0 if md else 2
+        ),
+        "   ISPIN  = {:6d}    spin polarized calculation?\n".format(n_spin),
+        "\n",
+        "   POTIM  = 1.0000    time-step for ionic-motion\n",
+        "  Atomic Wigner-Seitz radii\n",
+        "   RWIGS  =  -1.00\n",
+        "   NELECT = {:16.4f}    total number of electrons\n".format(8.0 * n_atoms),
+        "\n",
+        " k-points in reciprocal lattice and weights: synthetic\n",
+    ]
+    lines += [
+        "{:14.8f}{:12.8f}{:12.8f}{:12.3f}\n".format(*kpoint, weight)
+        for kpoint in kpoints
+    ]
+    lines += ["\n", " position of ions in fractional coordinates (direct lattice)\n"]
+    lines += [
+        "{:14.8f}{:12.8f}{:12.8f}\n".format(*position)
+        for position in positions @ np.linalg.inv(cell)
+    ]
+    lines += ["\n", SEPARATOR, "\n"]
+    lines += [
+        " k-point {:2d} :{:9.4f}{:7.4f}{:7.4f}  plane waves: {:7d}\n".format(
+            i + 1, *kpoint, 5000
+        )
+        for i, kpoint in enumerate(kpoints)
+    ]
+    lines += [
+        "\n",
+        " Broyden mixing: mesh for mixing (old mesh)\n",
+        "   NGX = 15   NGY = 15   NGZ = 15\n",
+        "  (NGX  = 48   NGY  = 48   NGZ  = 48)\n",
+        "  gives a total of   3375 points\n",
+        "\n",
+        SEPARATOR,
+        "\n",
+    ]
+    return "".join(lines)
+
+
+def _get_scf_step(ionic_step, scf_step, energy, energy_zero, n_atoms, spin, rng):
+    components = rng.normal(scale=100.0, size=10)
+    magnetization = (
+        "{:16.7f}".format(2.0 * n_atoms * rng.random()) if spin else " "
+    ).rstrip()
+    lines = [
+        "--------------------------------------- Iteration {:6d}({:4d})  ---------------------------------------\n".format(
+            ionic_step, scf_step
+        ),
+        "\n",
+        "\n",
+        "    POTLOK:  cpu time    0.0100: real time    0.0100\n",
+        "    --------------------------------------------\n",
+        "      LOOP:  cpu time    0.1000: real time    0.1000\n",
+        "\n",
+        " eigenvalue-minimisations  :    24\n",
+        " total energy-change (2. order) :-0.1000000E-04  (-0.1000000E-04)\n",
+        " number of electron {:15.7f} magnetization {}\n".format(
+            8.0 * n_atoms, magnetization
+        ),
+        "\n",
+        " Free energy of the ion-electron system (eV)\n",
+        "  ---------------------------------------------------\n",
+        "  alpha Z        PSCENC = {:18.8f}\n".format(components[0]),
+        "  Ewald energy   TEWEN  = {:18.8f}\n".format(components[1]),
+        "  -Hartree energ DENC   = {:18.8f}\n".format(components[2]),
+        "  -exchange      EXHF   = {:18.8f}\n".format(0.0),
+        "  -V(xc)+E(xc)   XCENC  = {:18.8f}\n".format(components[4]),
+        "  PAW double counting   = {:18.8f} {:16.8f}\n".format(
+            components[5], components[6]
+        ),
+        "  entropy T*S    EENTRO = {:18.8f}\n".format(components[7] * 1e-4),
+        "  eigenvalues    EBANDS = {:18.8f}\n".format(components[8]),
+        "  atomic energy  EATOM  = {:18.8f}\n".format(components[9]),
+        "  Solvation  Ediel_sol  = {:18.8f}\n".format(0.0),
+        "  ---------------------------------------------------\n",
+        "  free energy    TOTEN  = {:18.8f} eV\n".format(energy),
+        "\n",
+        "  energy without entropy = {:17.8f}  energy(sigma->0) = {:17.8f}\n".format(
+            energy, energy_zero
+        ),
+        "\n",
+        "\n",
+        SEPARATOR,
+        "\n",
+    ]
+    return "".join(lines)
+
+
+def _get_ionic_step_end(
+    energy,
+    energy_zero,
+    forces,
+    positions,
+    cell,
+    kpoints,
+    n_bands,
+    n_spin,
+    temperature,
+    rng,
+):
+    n_atoms = len(positions)
+    lines = [
+        " E-fermi : {:8.4f}     XC(G=0):  -0.7138     alpha+bet : -0.1301\n".format(
+            -5.0
+        ),
+        "\n",
+        "\n",
+    ]
+    eigenvalues = np.sort(rng.uniform(-15.0, 5.0, size=(n_spin, len(kpoints), n_bands)))
+    for spin in range(n_spin):
+        if n_spin == 2:
+            lines += [" spin component {}\n".format(spin + 1), "\n"]
+        for kpoint_index, kpoint in enumerate(kpoints):
+            lines += [
+                " k-point {:5d} :{:14.4f}{:10.4f}{:10.4f}\n".format(
+                    kpoint_index + 1, *kpoint
+                ),
+                "  band No.  band energies     occupation \n",
+            ]
+            lines += [
+                "{:7d}{:13.4f}{:13.5f}\n".format(
+                    band + 1, eigenvalue, (2.0 / n_spin) * (eigenvalue < -5.0)
+                )
+                for band, eigenvalue in enumerate(eigenvalues[spin, kpoint_index])
+            ]
+            lines += ["\n"]
+    lines += ["\n", SEPARATOR, "\n"]
+    if n_spin == 2:
+        lines += _get_magnetization_table(n_atoms=n_atoms, rng=rng)
+    stress = rng.normal(scale=5.0, size=6)
+    lines += [
+        "  FORCE on cell =-STRESS in cart. coord.  units (eV):\n",
+        "  Direction    XX          YY          ZZ          XY          YZ          ZX\n",
+        "  --------------------------------------------------------------------------------------\n",
+        "  Alpha Z {:11.5f} {:11.5f} {:11.5f}\n".format(0.1, 0.1, 0.1),
+        "  Ewald   " + "".join("{:12.5f}".format(v) for v in stress * 10) + "\n",
+        "  Hartree " + "".join("{:12.5f}".format(v) for v in stress * 5) + "\n",
+        "  Kinetic " + "".join("{:12.5f}".format(v) for v in stress * 2) + "\n",
+        "  -------------------------------------------------------------------------------------\n",
+        "  Total   " + "".join("{:12.5f}".format(v) for v in stress) + "\n",
+        "  in kB   " + "".join("{:12.5f}".format(v) for v in stress * 1.6) + "\n",
+        "  external pressure = {:11.2f} kB  Pullay stress =        0.00 kB\n".format(
+            np.mean(stress[:3] * 1.6)
+        ),
+        "\n",
+        "\n",
+        " VOLUME and BASIS-vectors are now :\n",
+        " -----------------------------------------------------------------------------\n",
+        "  energy-cutoff  :      500.00\n",
+        "  volume of cell : {:11.2f}\n".format(np.linalg.det(cell)),
+        "      direct lattice vectors                 reciprocal lattice vectors\n",
+    ]
+    reciprocal_cell = np.linalg.inv(cell).T
+    lines += [
+        "  "
+        + "".join("{:13.9f}".format(v) for v in cell[i])
+        + "  "
+        + "".join("{:13.9f}".format(v) for v in reciprocal_cell[i])
+        + "\n"
+        for i in range(3)
+    ]
+    lines += [
+        "\n",
+        "  length of vectors\n",
+        "  "
+        + "".join("{:13.9f}".format(v) for v in np.linalg.norm(cell, axis=1))
+        + "\n",
+        "\n",
+        "\n",
+        " POSITION                                       TOTAL-FORCE (eV/Angst)\n",
+        " -----------------------------------------------------------------------------------\n",
+    ]
+    lines += [
+        "{:13.5f}{:13.5f}{:13.5f}{:17.6f}{:14.6f}{:14.6f}\n".format(*position, *force)
+        for position, force in zip(positions, forces)
+    ]
+    lines += [
+        " -----------------------------------------------------------------------------------\n",
+        "    total drift:                               -0.000000     -0.000000      0.000000\n",
+        "\n",
+        "\n",
+        SEPARATOR,
+        "\n",
+        "\n",
+        "\n",
+        "  FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)\n",
+        "  ---------------------------------------------------\n",
+        "  free  energy   TOTEN  = {:18.8f} eV\n".format(energy),
+        "\n",
+        "  energy  without entropy= {:18.8f}  energy(sigma->0) = {:18.8f}\n".format(
+            energy, energy_zero
+        ),
+    ]
+    if temperature is not None:
+        lines += [
+            "\n",
+            "  kinetic energy EKIN   = {:18.6f}  (temperature {:8.2f} K)\n".format(
+                temperature * n_atoms * 1.29e-4, temperature
+            ),
+            "  kin. lattice  EKIN_LAT= {:18.6f}  (temperature {:8.2f} K)\n".format(
+                0.0, temperature
+            ),
+            "  total energy   ETOTAL = {:18.8f} eV\n".format(energy),
+        ]
+    lines += [
+        "\n",
+        "\n",
+        SEPARATOR,
+        "\n",
+        "\n",
+        "     LOOP+:  cpu time    1.0000: real time    1.0000\n",
+        "\n",
+        "\n",
+    ]
+    return "".join(lines)
+
+
+def _get_magnetization_table(n_atoms, rng):
+    moments = rng.normal(scale=2.0, size=n_atoms)
+    lines = [
+        " magnetization (x)\n",
+        "\n",
+        "# of ion       s       p       d       tot\n",
+        "------------------------------------------\n",
+    ]
+    lines += [
+        "{:5d} {:12.3f}{:8.3f}{:8.3f}{:8.3f}\n".format(i + 1, 0.0, 0.0, m, m)
+        for i, m in enumerate(moments)
+    ]
+    lines += [
+        "--------------------------------------------------\n",
+        "tot  {:12.3f}{:8.3f}{:8.3f}{:8.3f}\n".format(
+            0.0, 0.0, moments.sum(), moments.sum()
+        ),
+        "\n",
+        "\n",
+    ]
+    return lines
+
+
+def _get_footer(n_atoms, spin, rng):
+    lines = []
+    if spin:
+        lines += _get_magnetization_table(n_atoms=n_atoms, rng=rng)
+    lines += [
+        "\n",
+        " General timing and accounting informations for this job:\n",
+        " ========================================================\n",
+        "\n",
+        "                  Total CPU time used (sec):      225.942\n",
+        "                            User time (sec):      222.991\n",
+        "                          System time (sec):        2.952\n",
+        "                         Elapsed time (sec):      226.501\n",
+        "\n",
+        "                   Maximum memory used (kb):     1036056.\n",
+        "                   Average memory used (kb):           0.\n",
+        "\n",
+        "                          Minor page faults:       258272\n",
+        "                          Major page faults:            0\n",
+        "                 Voluntary context switches:         4351\n",
+    ]
+    return "".join(lines)
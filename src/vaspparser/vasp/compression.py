@@ -0,0 +1,86 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+__author__ = "Sudarsan Surendralal"
+__copyright__ = (
+    "Copyright 2021, Max-Planck-Institut für Eisenforschung GmbH - "
+    "Computational Materials Design (CM) Department"
+)
+__version__ = "1.0"
+__maintainer__ = "Sudarsan Surendralal"
+__email__ = "surendralal@mpie.de"
+__status__ = "production"
+__date__ = "Sep 1, 2020"
+
+COMPRESSION_OPENERS = {
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+
+
+def is_compressed(filename):
+    """
+    Args:
+        filename (str): path to the file
+
+    Returns:
+        bool: True if the file is compressed according to its extension (see COMPRESSION_OPENERS)
+    """
+    return os.path.splitext(filename)[1] in COMPRESSION_OPENERS.keys()
+
+
+def open_file(filename, mode="r", errors=None, buffer_size=2**20):
+    """
+    Open a file for reading, files compressed with gzip, bzip2 or xz are decompressed while they are read, in chunks
+    of buffer_size bytes, rather than to a temporary file.
+
+    Args:
+        filename (str): path to the file
+        mode (str): "r" to read text or "rb" to read bytes
+        errors (str/None): how decoding errors are handled in text mode, see open()
+        buffer_size (int): number of bytes decompressed at once
+
+    Returns:
+        file object: the opened file
+    """
+    if mode not in ["r", "rb"]:
+        raise ValueError("Files can only be opened for reading: " + mode)
+    if not is_compressed(filename):
+        return open(filename, mode, errors=errors)
+    extension = os.path.splitext(filename)[1]
+    f = io.BufferedReader(
+        COMPRESSION_OPENERS[extension](filename, "rb"), buffer_size=buffer_size
+    )
+    if mode == "rb":
+        return f
+    return io.TextIOWrapper(f, errors=errors)
+
+
+def get_files_present(directory):
+    """
+    List the files in a directory by their name without compression extension, an uncompressed file is preferred over
+    its compressed versions.
+
+    Args:
+        directory (str): path to the directory
+
+    Returns:
+        dict: names of the files without compression extension as keys and the names of the files as values, e.g.
+              {"OUTCAR": "OUTCAR.gz", "vasprun.xml": "vasprun.xml"}
+    """
+    files_present = dict()
+    for filename in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(filename)
+        if extension in COMPRESSION_OPENERS.keys():
+            files_present.setdefault(name, filename)
+        else:
+            files_present[filename] = filename
+    return files_present
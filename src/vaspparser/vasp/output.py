@@ -9,6 +9,7 @@ from ase.atoms import Atoms
 
 from vaspparser.dft.bader import Bader
 from vaspparser.dft.waves.electronic import ElectronicStructure
+from vaspparser.vasp.compression import get_files_present
 from vaspparser.vasp.parser.oszicar import Oszicar
 from vaspparser.vasp.parser.outcar import Outcar, OutcarCollectError
 from vaspparser.vasp.procar import Procar
@@ -57,27 +58,44 @@ class Output:
         self._structure = atoms
 
     def collect(
-        self, directory=os.getcwd(), sorted_indices=None, es_class=ElectronicStructure
+        self,
+        directory=os.getcwd(),
+        sorted_indices=None,
+        es_class=ElectronicStructure,
+        magmoms_as_array=False,
+        vasprun_exclude=None,
     ):
         """
-        Collects output from the working directory
+        Collects output from the working directory. The vasprun.xml file of a running or killed job, which ends in the
+        middle, is parsed up to the last complete ionic step.
 
         Args:
             directory (str): Path to the directory
             sorted_indices (np.array/None):
+            magmoms_as_array (bool): Store the magnetization of the electronic steps as list of numpy arrays and the
+                                     final magnetic moments as numpy array rather than as nested lists
+            vasprun_exclude (list/None): Sections of the vasprun.xml file which are not needed and skipped, e.g.
+                                         ["projected"] if the projected density of states is not used (see
+                                         vaspparser.vasp.vasprun.VASPRUN_OPTIONAL_SECTIONS)
         """
         if sorted_indices is None:
             sorted_indices = vasp_sorter(self.structure)
-        files_present = os.listdir(directory)
+        # the files are also found if they are compressed, e.g. OUTCAR.gz
+        files_present = get_files_present(directory)
         log_dict = dict()
         vasprun_working, outcar_working = False, False
         if not ("OUTCAR" in files_present or "vasprun.xml" in files_present):
             raise IOError("Either the OUTCAR or vasprun.xml files need to be present")
         if "OSZICAR" in files_present:
-            self.oszicar.from_file(filename=posixpath.join(directory, "OSZICAR"))
+            self.oszicar.from_file(
+                filename=posixpath.join(directory, files_present["OSZICAR"])
+            )
         if "OUTCAR" in files_present:
             try:
-                self.outcar.from_file(filename=posixpath.join(directory, "OUTCAR"))
+                self.outcar.from_file(
+                    filename=posixpath.join(directory, files_present["OUTCAR"]),
+                    magmoms_as_array=magmoms_as_array,
+                )
                 outcar_working = True
             except OutcarCollectError as e:
                 warnings.warn(f"OUTCAR present, but could not be parsed: {e}!")
@@ -87,7 +105,11 @@ class Output:
                 with warnings.catch_warnings(record=True) as w:
                     warnings.simplefilter("always")
                     self.vp_new.from_file(
-                        filename=posixpath.join(directory, "vasprun.xml")
+                        filename=posixpath.join(
+                            directory, files_present["vasprun.xml"]
+                        ),
+                        exclude=vasprun_exclude,
+                        allow_truncated=True,
                     )
                     if any([isinstance(warn.category, VasprunWarning) for warn in w]):
                         warnings.warn(
@@ -95,6 +117,13 @@ class Output:
                             "Check vasp output to be sure",
                             VasprunWarning,
                         )
+                if self.vp_new.is_truncated:
+                    warnings.warn(
+                        "vasprun.xml is truncated, only the {} complete ionic steps are parsed".format(
+                            len(self.vp_new.vasprun_dict["total_energies"])
+                        ),
+                        VasprunWarning,
+                    )
             except VasprunError:
                 warnings.warn(
                     "Unable to parse the vasprun.xml file. Will attempt to get data from OUTCAR"
@@ -111,24 +140,26 @@ class Output:
                 "n_elect"
             ]
             if len(self.outcar.parse_dict["magnetization"]) > 0:
-                magnetization = np.array(
-                    self.outcar.parse_dict["magnetization"], dtype=object
-                )
-                final_magmoms = np.array(
-                    self.outcar.parse_dict["final_magmoms"], dtype=object
-                )
+                final_magmoms = np.array(self.outcar.parse_dict["final_magmoms"])
                 # magnetization[sorted_indices] = magnetization.copy()
                 if len(final_magmoms) != 0:
                     if len(final_magmoms.shape) == 3:
                         final_magmoms[:, sorted_indices, :] = final_magmoms.copy()
                     else:
                         final_magmoms[:, sorted_indices] = final_magmoms.copy()
-                self.generic_output.dft_log_dict["magnetization"] = (
-                    magnetization.tolist()
-                )
-                self.generic_output.dft_log_dict["final_magmoms"] = (
-                    final_magmoms.tolist()
-                )
+                if magmoms_as_array:
+                    self.generic_output.dft_log_dict["magnetization"] = [
+                        np.array(magnetization)
+                        for magnetization in self.outcar.parse_dict["magnetization"]
+                    ]
+                    self.generic_output.dft_log_dict["final_magmoms"] = final_magmoms
+                else:
+                    self.generic_output.dft_log_dict["magnetization"] = np.array(
+                        self.outcar.parse_dict["magnetization"], dtype=object
+                    ).tolist()
+                    self.generic_output.dft_log_dict["final_magmoms"] = (
+                        final_magmoms.tolist()
+                    )
             self.generic_output.dft_log_dict["e_fermi_list"] = self.outcar.parse_dict[
                 "e_fermi_list"
             ]
@@ -155,10 +186,13 @@ class Output:
                 )
             except KeyError:  # in case the parser didn't read the version info
                 is_vasp5 = True
-            if is_vasp5:
+            if is_vasp5 and "scf_fr_energies" in self.vp_new.vasprun_dict.keys():
                 log_dict["energy_pot"] = np.array(
                     [e[-1] for e in self.vp_new.vasprun_dict["scf_fr_energies"]]
                 )
+            elif is_vasp5 and outcar_working:
+                # the electronic steps were skipped in the vasprun.xml file
+                log_dict["energy_pot"] = self.outcar.parse_dict["energies"]
             else:
                 # total energies refers here to the total energy of the electronic system, not the total system of
                 # electrons plus (potentially) moving ions; hence this is the energy_pot
@@ -179,17 +213,24 @@ class Output:
             )
             # log_dict["scf_energies"] = self.vp_new.vasprun_dict["scf_energies"]
             # log_dict["scf_dipole_moments"] = self.vp_new.vasprun_dict["scf_dipole_moments"]
-            self.electronic_structure = self.vp_new.get_electronic_structure(
-                es_class=es_class,
-            )
-            if self.electronic_structure.grand_dos_matrix is not None:
-                self.electronic_structure.grand_dos_matrix[
-                    :, :, :, sorted_indices, :
-                ] = self.electronic_structure.grand_dos_matrix[:, :, :, :, :].copy()
-            if self.electronic_structure.resolved_densities is not None:
-                self.electronic_structure.resolved_densities[
-                    :, sorted_indices, :, :
-                ] = self.electronic_structure.resolved_densities[:, :, :, :].copy()
+            # the electronic structure is not available if the eigenvalues or k-points were skipped
+            if all(
+                [
+                    key in self.vp_new.vasprun_dict.keys()
+                    for key in ["kpoints", "grand_eigenvalue_matrix"]
+                ]
+            ):
+                self.electronic_structure = self.vp_new.get_electronic_structure(
+                    es_class=es_class,
+                )
+                if self.electronic_structure.grand_dos_matrix is not None:
+                    self.electronic_structure.grand_dos_matrix[
+                        :, :, :, sorted_indices, :
+                    ] = self.electronic_structure.grand_dos_matrix[:, :, :, :, :].copy()
+                if self.electronic_structure.resolved_densities is not None:
+                    self.electronic_structure.resolved_densities[
+                        :, sorted_indices, :, :
+                    ] = self.electronic_structure.resolved_densities[:, :, :, :].copy()
             self.structure.positions = log_dict["positions"][-1]
             self.structure.set_cell(log_dict["cells"][-1])
             self.generic_output.dft_log_dict["potentiostat_output"] = (
@@ -250,7 +291,7 @@ class Output:
             if "PROCAR" in files_present:
                 try:
                     self.electronic_structure = self.procar.from_file(
-                        filename=posixpath.join(directory, "PROCAR")
+                        filename=posixpath.join(directory, files_present["PROCAR"])
                     )
                     #  Even the atom resolved values have to be sorted from the vasp atoms order to the Atoms order
                     self.electronic_structure.grand_dos_matrix[
@@ -270,38 +311,81 @@ class Output:
         self.generic_output.log_dict = log_dict
         if vasprun_working:
             # self.dft_output.log_dict["parameters"] = self.vp_new.vasprun_dict["parameters"]
-            self.generic_output.dft_log_dict["scf_dipole_mom"] = (
-                self.vp_new.vasprun_dict["scf_dipole_moments"]
-            )
-            if len(self.generic_output.dft_log_dict["scf_dipole_mom"][0]) > 0:
-                total_dipole_moments = np.array(
+            if "scf_energies" in self.vp_new.vasprun_dict.keys():
+                self.generic_output.dft_log_dict["scf_dipole_mom"] = (
+                    self.vp_new.vasprun_dict["scf_dipole_moments"]
+                )
+                if len(self.generic_output.dft_log_dict["scf_dipole_mom"][0]) > 0:
+                    total_dipole_moments = np.array(
+                        [
+                            dip[-1]
+                            for dip in self.generic_output.dft_log_dict[
+                                "scf_dipole_mom"
+                            ]
+                        ]
+                    )
+                    self.generic_output.dft_log_dict["dipole_mom"] = (
+                        total_dipole_moments
+                    )
+                self.generic_output.dft_log_dict["scf_energy_int"] = (
+                    self.vp_new.vasprun_dict["scf_energies"]
+                )
+                self.generic_output.dft_log_dict["scf_energy_free"] = (
+                    self.vp_new.vasprun_dict["scf_fr_energies"]
+                )
+                self.generic_output.dft_log_dict["scf_energy_zero"] = (
+                    self.vp_new.vasprun_dict["scf_0_energies"]
+                )
+                self.generic_output.dft_log_dict["energy_int"] = np.array(
                     [
-                        dip[-1]
-                        for dip in self.generic_output.dft_log_dict["scf_dipole_mom"]
+                        e_int[-1]
+                        for e_int in self.generic_output.dft_log_dict["scf_energy_int"]
                     ]
                 )
-                self.generic_output.dft_log_dict["dipole_mom"] = total_dipole_moments
-            self.generic_output.dft_log_dict["scf_energy_int"] = (
-                self.vp_new.vasprun_dict["scf_energies"]
-            )
-            self.generic_output.dft_log_dict["scf_energy_free"] = (
-                self.vp_new.vasprun_dict["scf_fr_energies"]
-            )
-            self.generic_output.dft_log_dict["scf_energy_zero"] = (
-                self.vp_new.vasprun_dict["scf_0_energies"]
-            )
-            self.generic_output.dft_log_dict["energy_int"] = np.array(
-                [
-                    e_int[-1]
-                    for e_int in self.generic_output.dft_log_dict["scf_energy_int"]
-                ]
-            )
-            self.generic_output.dft_log_dict["energy_free"] = np.array(
-                [
-                    e_free[-1]
-                    for e_free in self.generic_output.dft_log_dict["scf_energy_free"]
+                self.generic_output.dft_log_dict["energy_free"] = np.array(
+                    [
+                        e_free[-1]
+                        for e_free in self.generic_output.dft_log_dict[
+                            "scf_energy_free"
+                        ]
+                    ]
+                )
+                self.generic_output.dft_log_dict["energy_zero"] = np.array(
+                    [
+                        e_zero[-1]
+                        for e_zero in self.generic_output.dft_log_dict[
+                            "scf_energy_zero"
+                        ]
+                    ]
+                )
+            elif outcar_working:
+                # the electronic steps were skipped in the vasprun.xml file, they are taken from the OUTCAR file
+                self.generic_output.dft_log_dict["scf_energy_free"] = (
+                    self.outcar.parse_dict["scf_energies"]
+                )
+                self.generic_output.dft_log_dict["scf_dipole_mom"] = (
+                    self.outcar.parse_dict["scf_dipole_moments"]
+                )
+                self.generic_output.dft_log_dict["energy_int"] = self.outcar.parse_dict[
+                    "energies_int"
                 ]
-            )
+                self.generic_output.dft_log_dict["energy_free"] = (
+                    self.outcar.parse_dict["energies"]
+                )
+                self.generic_output.dft_log_dict["energy_zero"] = (
+                    self.outcar.parse_dict["energies_zero"]
+                )
+            else:
+                # the electronic steps were skipped, only the energies of the ionic steps are available
+                self.generic_output.dft_log_dict["energy_int"] = (
+                    self.vp_new.vasprun_dict["total_energies"]
+                )
+                self.generic_output.dft_log_dict["energy_free"] = (
+                    self.vp_new.vasprun_dict["total_fr_energies"]
+                )
+                self.generic_output.dft_log_dict["energy_zero"] = (
+                    self.vp_new.vasprun_dict["total_0_energies"]
+                )
             # Overwrite energy_free with much better precision from the OSZICAR file
             if "energy_pot" in self.oszicar.parse_dict.keys():
                 if np.array_equal(
@@ -311,15 +395,10 @@ class Output:
                     self.generic_output.dft_log_dict["energy_free"] = (
                         self.oszicar.parse_dict["energy_pot"]
                     )
-            self.generic_output.dft_log_dict["energy_zero"] = np.array(
-                [
-                    e_zero[-1]
-                    for e_zero in self.generic_output.dft_log_dict["scf_energy_zero"]
-                ]
-            )
-            self.generic_output.dft_log_dict["n_elect"] = float(
-                self.vp_new.vasprun_dict["parameters"]["electronic"]["NELECT"]
-            )
+            if "parameters" in self.vp_new.vasprun_dict.keys():
+                self.generic_output.dft_log_dict["n_elect"] = float(
+                    self.vp_new.vasprun_dict["parameters"]["electronic"]["NELECT"]
+                )
             if "kinetic_energies" in self.vp_new.vasprun_dict.keys():
                 # scf_energy_kin is for backwards compatibility
                 self.generic_output.dft_log_dict["scf_energy_kin"] = (
@@ -331,17 +410,19 @@ class Output:
 
         if (
             "LOCPOT" in files_present
-            and os.stat(posixpath.join(directory, "LOCPOT")).st_size != 0
+            and os.stat(posixpath.join(directory, files_present["LOCPOT"])).st_size != 0
         ):
             self.electrostatic_potential.from_file(
-                filename=posixpath.join(directory, "LOCPOT"), normalize=False
+                filename=posixpath.join(directory, files_present["LOCPOT"]),
+                normalize=False,
             )
         if (
             "CHGCAR" in files_present
-            and os.stat(posixpath.join(directory, "CHGCAR")).st_size != 0
+            and os.stat(posixpath.join(directory, files_present["CHGCAR"])).st_size != 0
         ):
             self.charge_density.from_file(
-                filename=posixpath.join(directory, "CHGCAR"), normalize=True
+                filename=posixpath.join(directory, files_present["CHGCAR"]),
+                normalize=True,
             )
         self.generic_output.bands = self.electronic_structure
 
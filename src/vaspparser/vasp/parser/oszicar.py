@@ -4,6 +4,8 @@
 
 import numpy as np
 
+from vaspparser.vasp.compression import open_file
+
 __author__ = "Sudarsan Surendralal"
 __copyright__ = (
     "Copyright 2021, Max-Planck-Institut für Eisenforschung GmbH - "
@@ -31,7 +33,7 @@ class Oszicar(object):
         self.parse_dict = dict()
 
     def from_file(self, filename="OSZICAR"):
-        with open(filename, "r", errors="ignore") as f:
+        with open_file(filename, "r", errors="ignore") as f:
             lines = f.readlines()
         self.parse_dict["energy_pot"] = self.get_energy_pot(lines)
 
@@ -2,13 +2,22 @@
 # Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
 # Distributed under the terms of "New BSD License", see the LICENSE file.
 
+import bisect
+import concurrent.futures
+import itertools
+import mmap
+import operator
+import os
 import re
 import warnings
 from collections import OrderedDict
+from collections.abc import MutableMapping
 
 import numpy as np
 import scipy.constants
 
+from vaspparser.vasp.compression import is_compressed, open_file
+
 __author__ = "Sudarsan Surendralal"
 __copyright__ = (
     "Copyright 2021, Max-Planck-Institut für Eisenforschung GmbH - "
@@ -24,6 +33,126 @@ KBAR_TO_EVA = (
     scipy.constants.physical_constants["joule-electron volt relationship"][0] / 1e22
 )
 
+# All trigger strings used by the Outcar.get_*() functions - they are located in a single pass over the file in
+# Outcar.from_file() rather than one pass per function.
+OUTCAR_TRIGGERS = (
+    "FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)",
+    "free energy    TOTEN  =",
+    "Free energy of the ion-electron system (eV)",
+    "Solvation  Ediel_sol  = ",
+    "TOTAL-FORCE (eV/Angst)",
+    "VOLUME and BASIS-vectors are now :",
+    "FORCE on cell =-STRESS in cart. coord.  units (eV):",
+    "Subroutine IBZKPT returns following result:",
+    "k-points in reciprocal lattice and weights:",
+    "position of ions in fractional coordinates (direct lattice)",
+    "k-point  1 :",
+    "k-point     1 :",
+    "eigenvalue-minimisations",
+    "Atomic Wigner-Seitz radii",
+    "magnetization (x)",
+    "magnetization (y)",
+    "magnetization (z)",
+    "gives a total of ",
+    "kin. lattice  EKIN_LAT= ",
+    "NBLOCK =",
+    "POTIM  =",
+    "kinetic energy error for atom=",
+    "ions per type =",
+    "E-fermi",
+    "E-fermi :",
+    "band No.  band energies     occupation",
+    "dipolmoment",
+    "NELECT",
+    "NIONS =",
+    "Total CPU time used (sec):",
+    "User time (sec):",
+    "System time (sec):",
+    "Elapsed time (sec):",
+    "Maximum memory used (kb):",
+    "TOTAL ELASTIC MODULI (kBar)",
+)
+# Extractors run by Outcar.from_file(), each mapped to the extractors it depends on and the parse_dict keys it
+# provides. Outcar.from_file(fields=[...]) runs only the extractors which provide the requested keys and their
+# dependencies, extractors which provide no keys are only used by other extractors.
+OUTCAR_EXTRACTORS = {
+    "vasp_version": ((), ("vasp_version",)),
+    "energies": ((), ("energies",)),
+    "energies_int": ((), ("energies_int",)),
+    "energies_zero": ((), ("energies_zero",)),
+    "scf_energies": ((), ("scf_energies",)),
+    "n_atoms": ((), ()),
+    "positions_and_forces": (("n_atoms",), ("forces", "positions")),
+    "cells": ((), ("cells",)),
+    "steps": ((), ("steps",)),
+    "temperatures": ((), ("temperatures",)),
+    "time": (("steps",), ("time",)),
+    "fermi_level": ((), ("fermi_level",)),
+    "scf_dipole_moments": ((), ("scf_dipole_moments",)),
+    "kin_energy_error": ((), ("kin_energy_error",)),
+    "stresses_kbar": ((), ()),
+    "stresses": (("stresses_kbar",), ("stresses",)),
+    "irreducible_kpoints": (
+        (),
+        ("irreducible_kpoints", "irreducible_kpoint_weights", "number_plane_waves"),
+    ),
+    "magnetization": ((), ("magnetization", "final_magmoms")),
+    "broyden_mixing": ((), ("broyden_mixing",)),
+    "n_elect": ((), ("n_elect",)),
+    "band_data": ((), ()),
+    "band_properties": (("band_data",), ("e_fermi_list", "vbm_list", "cbm_list")),
+    "band_occupations": (("band_data",), ("band_occupations",)),
+    "elastic_constants": ((), ("elastic_constants",)),
+    "energy_components": ((), ("energy_components",)),
+    "resources": ((), ("resources",)),
+    "pressures": (("stresses_kbar", "steps"), ("pressures",)),
+}
+
+# parse_dict keys which are only parsed when they are requested explicitly, as they can become large
+OUTCAR_OPTIONAL_FIELDS = ("band_occupations",)
+
+# parse_dict keys which only depend on the header of the OUTCAR file, before the first ionic step
+OUTCAR_HEADER_FIELDS = (
+    "vasp_version",
+    "kin_energy_error",
+    "irreducible_kpoints",
+    "irreducible_kpoint_weights",
+    "number_plane_waves",
+    "broyden_mixing",
+    "n_elect",
+)
+
+# How the quantities parsed from consecutive ionic steps of the same OUTCAR file are combined in Outcar.follow() -
+# "array" and "list" quantities are appended along the ionic steps, "band" quantities along their second axis and
+# "step" quantities are recalculated from the total number of ionic steps. All other quantities are taken from the
+# latest part of the file in which they were found.
+OUTCAR_STEP_QUANTITIES = {
+    "energies": "array",
+    "energies_int": "array",
+    "energies_zero": "array",
+    "forces": "array",
+    "positions": "array",
+    "cells": "array",
+    "temperatures": "array",
+    "stresses": "array",
+    "pressures": "array",
+    "e_fermi_list": "array",
+    "band_occupations": "array",
+    "scf_energies": "list",
+    "scf_dipole_moments": "list",
+    "magnetization": "list",
+    "final_magmoms": "list",
+    "energy_components": "list",
+    "vbm_list": "band",
+    "cbm_list": "band",
+    "steps": "step",
+    "time": "step",
+}
+
+
+# format version of the sidecar index files written by Outcar.from_file(index=True)
+_TRIGGER_INDEX_VERSION = 1
+
 
 # derives from ValueError, because that was the exception previously raised
 class OutcarCollectError(ValueError):
@@ -43,100 +172,428 @@ class Outcar(object):
 
     def __init__(self):
         self.parse_dict = dict()
-
-    def from_file(self, filename="OUTCAR"):
+        self._follow_state = None
+        self._magmoms_as_array = False
+
+    def from_file(
+        self,
+        filename="OUTCAR",
+        memory_map=False,
+        fields=None,
+        lazy=False,
+        index=False,
+        processes=1,
+        magmoms_as_array=False,
+    ):
         """
         Parse and store relevant quantities from the OUTCAR file into parse_dict.
 
         Args:
             filename (str): Filename of the OUTCAR file to parse
+            memory_map (bool): Map the file into memory and decode only the lines which are parsed, rather than
+                               reading all lines - this keeps the memory consumption low for large OUTCAR files
+            fields (list/None): parse_dict keys to parse, e.g. ["energies", "forces", "cells"] - only the extractors
+                                required for these keys are run (see OUTCAR_EXTRACTORS), all keys are parsed if None
+            lazy (bool): Parse each quantity only when its parse_dict key is accessed for the first time, the file
+                         stays open (or mapped) until all quantities are parsed
+            index (bool): Read the offsets of the lines and of the trigger lines from the sidecar index file
+                          (OUTCAR.vpidx) instead of searching the file, the index file is (re)built if it does not
+                          exist or if the OUTCAR file was modified since - implies memory_map
+            processes (int): Number of processes to parse the OUTCAR file with - for more than one process the file is
+                             split into parts at the ends of ionic steps, which are parsed together with the header in
+                             a process pool (memory_map and index only apply to parsing in a single process)
+            magmoms_as_array (bool): Store the final magnetic moments as numpy array of shape (ionic steps, atoms) or
+                                     (ionic steps, atoms, 3) rather than as nested lists
+
+        Compressed files (.gz, .bz2, .xz) are decompressed while they are read, they can neither be mapped into memory
+        nor split into parts, so memory_map, index and processes are ignored for them.
 
         """
-        with open(filename, "r", errors="ignore") as f:
-            lines = f.readlines()
-        energies = self.get_total_energies(filename=filename, lines=lines)
-        energies_int = self.get_energy_without_entropy(filename=filename, lines=lines)
-        energies_zero = self.get_energy_sigma_0(filename=filename, lines=lines)
-        scf_energies = self.get_all_total_energies(filename=filename, lines=lines)
-        n_atoms = self.get_number_of_atoms(filename=filename, lines=lines)
-        forces = self.get_forces(filename=filename, lines=lines, n_atoms=n_atoms)
-        positions = self.get_positions(filename=filename, lines=lines, n_atoms=n_atoms)
-        cells = self.get_cells(filename=filename, lines=lines)
-        steps = self.get_steps(filename=filename, lines=lines)
-        temperatures = self.get_temperatures(filename=filename, lines=lines)
-        time = self.get_time(filename=filename, lines=lines)
-        fermi_level = self.get_fermi_level(filename=filename, lines=lines)
-        scf_moments = self.get_dipole_moments(filename=filename, lines=lines)
-        kin_energy_error = self.get_kinetic_energy_error(filename=filename, lines=lines)
-        stresses = self.get_stresses(filename=filename, si_unit=False, lines=lines)
-        n_elect = self.get_nelect(filename=filename, lines=lines)
-        e_fermi_list, vbm_list, cbm_list = self.get_band_properties(
-            filename=filename, lines=lines
+        self._follow_state = None
+        self._magmoms_as_array = magmoms_as_array
+        if is_compressed(filename):
+            memory_map, index, processes = False, False, 1
+        if processes > 1:
+            if lazy:
+                raise ValueError(
+                    "Lazy parsing is not supported with multiple processes"
+                )
+            _get_outcar_extractors(fields=fields)
+            self.parse_dict.update(
+                _parse_outcar_parallel(
+                    filename=filename, fields=fields, processes=processes
+                )
+            )
+            if magmoms_as_array and "final_magmoms" in self.parse_dict:
+                self.parse_dict["final_magmoms"] = np.array(
+                    self.parse_dict["final_magmoms"]
+                )
+            return
+        if index:
+            memory_map = True
+        if index or (fields is None and not lazy):
+            triggers = OUTCAR_TRIGGERS
+        else:
+            # the extractors search only for the triggers they need
+            _get_outcar_extractors(fields=fields)
+            triggers = ()
+        if lazy:
+            if memory_map:
+                lines = _MappedLines(filename, triggers=triggers, use_index=index)
+            else:
+                with open_file(filename, "r", errors="ignore") as f:
+                    lines = _TriggerLines(f.readlines(), triggers=triggers)
+            self.parse_dict = _LazyParseDict(
+                outcar=self, filename=filename, lines=lines, fields=fields
+            )
+        elif memory_map:
+            with _MappedLines(filename, triggers=triggers, use_index=index) as lines:
+                self._parse_lines(filename=filename, lines=lines, fields=fields)
+        else:
+            with open_file(filename, "r", errors="ignore") as f:
+                lines = _TriggerLines(f.readlines(), triggers=triggers)
+            self._parse_lines(filename=filename, lines=lines, fields=fields)
+
+    def follow(self, filename="OUTCAR"):
+        """
+        Parse the OUTCAR file of a running calculation incrementally. The first call parses all complete ionic steps,
+        every further call reads only the bytes which were appended to the file since the previous call and extends
+        the ionic step quantities in parse_dict. An ionic step which is still being written is held back until its
+        "LOOP+" line is complete. Once the calculation has finished, the remainder of the file is parsed as well.
+        If the file was replaced or truncated in between, it is parsed from the start again.
+
+        Args:
+            filename (str): Filename of the OUTCAR file to parse
+
+        Returns:
+            int: number of ionic steps added to parse_dict
+        """
+        state = self._follow_state
+        with open(filename, "rb") as f:
+            if state is None or not _is_same_outcar(f=f, state=state):
+                if state is not None:
+                    self.parse_dict = dict()
+                state = {
+                    "filename": os.path.abspath(filename),
+                    "offset": 0,
+                    "head": None,
+                    "header": None,
+                    "parse_dict": dict(),
+                    "buffers": dict(),
+                }
+                self._follow_state = state
+            f.seek(state["offset"])
+            data = f.read()
+        n_steps = len(state["parse_dict"].get("energies", []))
+        if state["header"] is None:
+            header_end = _find_header_end(data)
+            if header_end is None:
+                # the first ionic step has not started, so the header is not complete yet
+                return 0
+            state["head"] = data[: min(header_end, 4096)]
+            state["header"] = _split_lines(data[:header_end].decode(errors="ignore"))
+            header_lines = _TriggerLines(state["header"], triggers=OUTCAR_TRIGGERS)
+            state["nblock"] = _get_nblock(lines=header_lines)
+            state["potim"] = _get_potim(lines=header_lines)
+            state["offset"] = header_end
+            data = data[header_end:]
+            self._merge_step_quantities(
+                state=state, parse_dict=self._parse_step_data(state=state, data=b"")
+            )
+        step_end = _find_ionic_step_end(data)
+        if step_end > 0:
+            self._merge_step_quantities(
+                state=state,
+                parse_dict=self._parse_step_data(state=state, data=data[:step_end]),
+            )
+            state["offset"] += step_end
+            data = data[step_end:]
+        parse_dict = dict(state["parse_dict"])
+        if b"General timing and accounting" in data:
+            # the calculation has finished, the remainder is parsed again on every call, in case it is incomplete
+            parse_dict = _merge_outcar_parse_dicts(
+                parse_dicts=[parse_dict, self._parse_step_data(state=state, data=data)]
+            )
+        _update_outcar_steps(
+            parse_dict=parse_dict,
+            n_steps=len(parse_dict["energies"]),
+            nblock=state["nblock"],
+            potim=state["potim"],
         )
-        elastic_constants = self.get_elastic_constants(filename=filename, lines=lines)
-        energy_components = self.get_energy_components(filename=filename, lines=lines)
-        cpu_time = self.get_cpu_time(filename=filename, lines=lines)
-        user_time = self.get_user_time(filename=filename, lines=lines)
-        system_time = self.get_system_time(filename=filename, lines=lines)
-        elapsed_time = self.get_elapsed_time(filename=filename, lines=lines)
-        memory_used = self.get_memory_used(filename=filename, lines=lines)
-        vasp_version = self.get_vasp_version(filename=filename, lines=lines)
+        self.parse_dict.update(parse_dict)
+        return len(self.parse_dict["energies"]) - n_steps
 
-        try:
-            (
-                irreducible_kpoints,
-                ir_kpt_weights,
-                plane_waves,
-            ) = self.get_irreducible_kpoints(filename=filename, lines=lines)
-        except ValueError:
-            print("irreducible kpoints not parsed !")
-            irreducible_kpoints = None
-            ir_kpt_weights = None
-            plane_waves = None
-        magnetization, final_magmom_lst = self.get_magnetization(
-            filename=filename, lines=lines
+    @staticmethod
+    def iter_steps(filename="OUTCAR", chunk_size=2**20):
+        """
+        Iterate over the ionic steps of an OUTCAR file, which is read in chunks, so only the current ionic step is
+        held in memory regardless of the length of the trajectory.
+
+        Args:
+            filename (str): Filename of the OUTCAR file to parse
+            chunk_size (int): number of bytes read at once
+
+        Yields:
+            dict: quantities of one ionic step - "energy", "energy_sigma_0", "forces", "positions", "cell",
+                  "stress", "temperature" and "magnetization" in the units of parse_dict, None if the quantity is
+                  not written for the ionic step
+        """
+        header = None
+        buffer = bytearray()
+        with open_file(filename, "rb") as f:
+            while True:
+                data = f.read(chunk_size)
+                buffer += data
+                if header is None:
+                    header_end = _find_header_end(buffer)
+                    if header_end is None:
+                        if len(data) == 0:
+                            return
+                        continue
+                    header = _get_step_header(buffer[:header_end])
+                    del buffer[:header_end]
+                step_end = _find_ionic_step_end(buffer, first=True)
+                while step_end > 0:
+                    yield from _parse_step_records(
+                        header=header, data=buffer[:step_end]
+                    )
+                    del buffer[:step_end]
+                    step_end = _find_ionic_step_end(buffer, first=True)
+                if len(data) == 0:
+                    # the lines following the last ionic step
+                    yield from _parse_step_records(header=header, data=buffer)
+                    return
+
+    def _parse_step_data(self, state, data):
+        """
+        Parse the header of a followed OUTCAR file together with some of its ionic steps.
+
+        Args:
+            state (dict): state of Outcar.follow()
+            data (bytes): complete lines of consecutive ionic steps
+
+        Returns:
+            dict: quantities parsed from the ionic steps
+        """
+        outcar = Outcar()
+        outcar._parse_lines(
+            filename=state["filename"],
+            lines=_TriggerLines(
+                state["header"] + _split_lines(data.decode(errors="ignore")),
+                triggers=OUTCAR_TRIGGERS,
+            ),
         )
-        broyden_mixing = self.get_broyden_mixing_mesh(filename=filename, lines=lines)
-        self.parse_dict["vasp_version"] = vasp_version
-        self.parse_dict["energies"] = energies
-        self.parse_dict["energies_int"] = energies_int
-        self.parse_dict["energies_zero"] = energies_zero
-        self.parse_dict["scf_energies"] = scf_energies
-        self.parse_dict["forces"] = forces
-        self.parse_dict["positions"] = positions
-        self.parse_dict["cells"] = cells
-        self.parse_dict["steps"] = steps
-        self.parse_dict["temperatures"] = temperatures
-        self.parse_dict["time"] = time
-        self.parse_dict["fermi_level"] = fermi_level
-        self.parse_dict["scf_dipole_moments"] = scf_moments
-        self.parse_dict["kin_energy_error"] = kin_energy_error
-        self.parse_dict["stresses"] = stresses * KBAR_TO_EVA
-        self.parse_dict["irreducible_kpoints"] = irreducible_kpoints
-        self.parse_dict["irreducible_kpoint_weights"] = ir_kpt_weights
-        self.parse_dict["number_plane_waves"] = plane_waves
-        self.parse_dict["magnetization"] = magnetization
-        self.parse_dict["final_magmoms"] = final_magmom_lst
-        self.parse_dict["broyden_mixing"] = broyden_mixing
-        self.parse_dict["n_elect"] = n_elect
-        self.parse_dict["e_fermi_list"] = e_fermi_list
-        self.parse_dict["vbm_list"] = vbm_list
-        self.parse_dict["cbm_list"] = cbm_list
-        self.parse_dict["elastic_constants"] = elastic_constants
-        self.parse_dict["energy_components"] = energy_components
-        self.parse_dict["resources"] = {
-            "cpu_time": cpu_time,
-            "user_time": user_time,
-            "system_time": system_time,
-            "elapsed_time": elapsed_time,
-            "memory_used": memory_used,
-        }
-        try:
-            self.parse_dict["pressures"] = (
-                np.average(stresses[:, 0:3], axis=1) * KBAR_TO_EVA
+        return outcar.parse_dict
+
+    @staticmethod
+    def _merge_step_quantities(state, parse_dict):
+        """
+        Append the quantities parsed from the next ionic steps to the quantities stored in the state of
+        Outcar.follow(), the array quantities are extended in place.
+
+        Args:
+            state (dict): state of Outcar.follow()
+            parse_dict (dict): quantities parsed from the next ionic steps
+        """
+        for key, value in parse_dict.items():
+            if OUTCAR_STEP_QUANTITIES.get(key) == "array":
+                buffer = state["buffers"].setdefault(key, _ArrayBuffer())
+                buffer.extend(value)
+                state["parse_dict"][key] = buffer.array
+            elif OUTCAR_STEP_QUANTITIES.get(key) == "list":
+                state["parse_dict"].setdefault(key, list()).extend(value)
+        state["parse_dict"].update(
+            _merge_outcar_parse_dicts(
+                parse_dicts=[
+                    state["parse_dict"],
+                    {
+                        key: value
+                        for key, value in parse_dict.items()
+                        if OUTCAR_STEP_QUANTITIES.get(key) not in ["array", "list"]
+                    },
+                ]
+            )
+        )
+
+    def _parse_lines(self, filename, lines, fields=None):
+        """
+        Parse and store relevant quantities from the lines of an OUTCAR file into parse_dict.
+
+        Args:
+            filename (str): Filename of the OUTCAR file to parse
+            lines (_TriggerLines/_MappedLines): lines of the OUTCAR file
+            fields (list/None): parse_dict keys to parse, all keys are parsed if None
+
+        """
+        extractors = _get_outcar_extractors(fields=fields)
+        quantities = dict()
+        for name in extractors:
+            quantities.update(
+                self._run_extractor(
+                    name=name, filename=filename, lines=lines, quantities=quantities
+                )
             )
-        except IndexError:
-            self.parse_dict["pressures"] = np.zeros(len(steps))
+        for name in extractors:
+            for key in OUTCAR_EXTRACTORS[name][1]:
+                if fields is None or key in fields:
+                    self.parse_dict[key] = quantities[key]
+
+    def _run_extractor(self, name, filename, lines, quantities):
+        """
+        Run one of the extractors listed in OUTCAR_EXTRACTORS.
+
+        Args:
+            name (str): name of the extractor
+            filename (str): Filename of the OUTCAR file to parse
+            lines (_TriggerLines/_MappedLines): lines of the OUTCAR file
+            quantities (dict): quantities provided by the extractors this extractor depends on
+
+        Returns:
+            dict: quantities provided by the extractor
+        """
+        if name == "vasp_version":
+            return {
+                "vasp_version": self.get_vasp_version(filename=filename, lines=lines)
+            }
+        elif name == "energies":
+            return {"energies": self.get_total_energies(filename=filename, lines=lines)}
+        elif name == "energies_int":
+            return {
+                "energies_int": self.get_energy_without_entropy(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "energies_zero":
+            return {
+                "energies_zero": self.get_energy_sigma_0(filename=filename, lines=lines)
+            }
+        elif name == "scf_energies":
+            return {
+                "scf_energies": self.get_all_total_energies(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "n_atoms":
+            return {"n_atoms": self.get_number_of_atoms(filename=filename, lines=lines)}
+        elif name == "positions_and_forces":
+            positions, forces = self.get_positions_and_forces(
+                filename=filename, lines=lines, n_atoms=quantities["n_atoms"]
+            )
+            return {"forces": forces, "positions": positions}
+        elif name == "cells":
+            return {"cells": self.get_cells(filename=filename, lines=lines)}
+        elif name == "steps":
+            return {"steps": self.get_steps(filename=filename, lines=lines)}
+        elif name == "temperatures":
+            return {
+                "temperatures": self.get_temperatures(filename=filename, lines=lines)
+            }
+        elif name == "time":
+            lines = _get_lines_from_file(filename=filename, lines=lines)
+            return {"time": _get_potim(lines=lines) * quantities["steps"]}
+        elif name == "fermi_level":
+            return {"fermi_level": self.get_fermi_level(filename=filename, lines=lines)}
+        elif name == "scf_dipole_moments":
+            return {
+                "scf_dipole_moments": self.get_dipole_moments(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "kin_energy_error":
+            return {
+                "kin_energy_error": self.get_kinetic_energy_error(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "stresses_kbar":
+            return {
+                "stresses_kbar": self.get_stresses(
+                    filename=filename, si_unit=False, lines=lines
+                )
+            }
+        elif name == "stresses":
+            return {"stresses": quantities["stresses_kbar"] * KBAR_TO_EVA}
+        elif name == "irreducible_kpoints":
+            try:
+                (
+                    irreducible_kpoints,
+                    ir_kpt_weights,
+                    plane_waves,
+                ) = self.get_irreducible_kpoints(filename=filename, lines=lines)
+            except ValueError:
+                print("irreducible kpoints not parsed !")
+                irreducible_kpoints = None
+                ir_kpt_weights = None
+                plane_waves = None
+            return {
+                "irreducible_kpoints": irreducible_kpoints,
+                "irreducible_kpoint_weights": ir_kpt_weights,
+                "number_plane_waves": plane_waves,
+            }
+        elif name == "magnetization":
+            magnetization, final_magmom_lst = self.get_magnetization(
+                filename=filename, lines=lines, as_array=self._magmoms_as_array
+            )
+            return {"magnetization": magnetization, "final_magmoms": final_magmom_lst}
+        elif name == "broyden_mixing":
+            return {
+                "broyden_mixing": self.get_broyden_mixing_mesh(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "n_elect":
+            return {"n_elect": self.get_nelect(filename=filename, lines=lines)}
+        elif name == "band_data":
+            return {"band_data": _get_band_data(filename=filename, lines=lines)}
+        elif name == "band_properties":
+            e_fermi_list, vbm_list, cbm_list = self.get_band_properties(
+                filename=filename, lines=lines, band_data=quantities["band_data"]
+            )
+            return {
+                "e_fermi_list": e_fermi_list,
+                "vbm_list": vbm_list,
+                "cbm_list": cbm_list,
+            }
+        elif name == "elastic_constants":
+            return {
+                "elastic_constants": self.get_elastic_constants(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "energy_components":
+            return {
+                "energy_components": self.get_energy_components(
+                    filename=filename, lines=lines
+                )
+            }
+        elif name == "resources":
+            return {
+                "resources": {
+                    "cpu_time": self.get_cpu_time(filename=filename, lines=lines),
+                    "user_time": self.get_user_time(filename=filename, lines=lines),
+                    "system_time": self.get_system_time(filename=filename, lines=lines),
+                    "elapsed_time": self.get_elapsed_time(
+                        filename=filename, lines=lines
+                    ),
+                    "memory_used": self.get_memory_used(filename=filename, lines=lines),
+                }
+            }
+        elif name == "pressures":
+            try:
+                return {
+                    "pressures": np.average(quantities["stresses_kbar"][:, 0:3], axis=1)
+                    * KBAR_TO_EVA
+                }
+            except IndexError:
+                return {"pressures": np.zeros(len(quantities["steps"]))}
+        elif name == "band_occupations":
+            return {
+                "band_occupations": self.get_band_occupations(
+                    filename=filename, lines=lines, band_data=quantities["band_data"]
+                )
+            }
+        else:
+            raise ValueError("Unknown OUTCAR extractor: {}".format(name))
 
     def to_dict_minimal(self):
         output_dict = {}
@@ -278,33 +735,31 @@ class Outcar(object):
             filename=filename,
             trigger="FORCE on cell =-STRESS in cart. coord.  units (eV):",
         )
-        stress_lst = []
-        for j in trigger_indices:
-            # search for '------...' delimiters of the stress table
-            # setting a constant offset into `lines` does not work, because the number of stress contributions may vary
-            # depending on the VASP configuration (e.g. with or without van der Waals interactions)
-            jj = j
-            while set(lines[jj].strip()) != {"-"}:
-                jj += 1
-            jj += 1
-            # there's two delimiters, so search again
-            while set(lines[jj].strip()) != {"-"}:
-                jj += 1
-            try:
-                if si_unit:
-                    stress = [float(l) for l in lines[jj + 1].split()[1:7]]
-                else:
-                    stress = [float(l) for l in lines[jj + 2].split()[2:8]]
-            except ValueError:
-                stress = [float("NaN")] * 6
-            # VASP outputs the stresses in XX, YY, ZZ, XY, YZ, ZX order
-            #                               0,  1,  2,  3,  4,  5
-            stressm = np.diag(stress[:3])
-            stressm[0, 1] = stressm[1, 0] = stress[3]
-            stressm[1, 2] = stressm[2, 1] = stress[4]
-            stressm[0, 2] = stressm[2, 0] = stress[5]
-            stress_lst.append(stressm)
-        return np.array(stress_lst)
+        if len(trigger_indices) == 0:
+            return np.array([])
+        # search for the two '------...' delimiters of the stress tables
+        # setting a constant offset into `lines` does not work, because the number of stress contributions may vary
+        # depending on the VASP configuration (e.g. with or without van der Waals interactions)
+        delimiter_indices = _get_delimiter_indices(
+            lines=lines, trigger_indices=trigger_indices
+        )
+        if si_unit:
+            stresses = _parse_rows(
+                lines=lines, line_indices=delimiter_indices[:, 1] + 1, start=1, stop=7
+            )
+        else:
+            stresses = _parse_rows(
+                lines=lines, line_indices=delimiter_indices[:, 1] + 2, start=2, stop=8
+            )
+        # VASP outputs the stresses in XX, YY, ZZ, XY, YZ, ZX order
+        #                               0,  1,  2,  3,  4,  5
+        stress_array = np.zeros((len(trigger_indices), 3, 3))
+        for ind_voigt, (i, j) in enumerate(
+            [(0, 0), (1, 1), (2, 2), (0, 1), (1, 2), (0, 2)]
+        ):
+            stress_array[:, i, j] = stresses[:, ind_voigt]
+            stress_array[:, j, i] = stresses[:, ind_voigt]
+        return stress_array
 
     @staticmethod
     def get_irreducible_kpoints(
@@ -337,21 +792,42 @@ class Outcar(object):
         trigger_number_alt = 0
         trigger_number_alt_total = 0
         trigger_plane_waves = 0
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if trigger_number_str in line:
-                trigger_number = int(i)
-            elif trigger_number_str_alt in line:
-                trigger_number_alt = int(i) + 1
-            elif trigger_number_alt != 0 and trigger_number_str_total in line:
-                trigger_number_alt_total = int(i) - 1
-            elif planewaves:
-                if (
-                    trigger_plane_waves_str in line
-                    or trigger_plane_waves_alt_str in line
-                ) and "plane waves: " in line:
-                    trigger_plane_waves = int(i)
+        trigger_dict, lines = _get_triggers(
+            triggers=[
+                trigger_number_str,
+                trigger_number_str_alt,
+                trigger_number_str_total,
+                trigger_plane_waves_str,
+                trigger_plane_waves_alt_str,
+            ],
+            filename=filename,
+            lines=lines,
+        )
+        # the triggers are mutually exclusive per line, the first one in this order takes precedence
+        number_set = set(trigger_dict[trigger_number_str])
+        number_alt_set = set(trigger_dict[trigger_number_str_alt]) - number_set
+        if len(number_set) > 0:
+            trigger_number = max(number_set)
+        if len(number_alt_set) > 0:
+            trigger_number_alt = max(number_alt_set) + 1
+            number_alt_total_set = {
+                i
+                for i in trigger_dict[trigger_number_str_total]
+                if i > min(number_alt_set)
+            } - (number_set | number_alt_set)
+            if len(number_alt_total_set) > 0:
+                trigger_number_alt_total = max(number_alt_total_set) - 1
+        else:
+            number_alt_total_set = set()
+        if planewaves:
+            plane_waves_set = {
+                i
+                for i in trigger_dict[trigger_plane_waves_str]
+                + trigger_dict[trigger_plane_waves_alt_str]
+                if "plane waves: " in lines[i].strip()
+            } - (number_set | number_alt_set | number_alt_total_set)
+            if len(plane_waves_set) > 0:
+                trigger_plane_waves = max(plane_waves_set)
         if trigger_number != 0:
             number_irr_kpoints = int(lines[trigger_number + 3].split()[1])
             if reciprocal:
@@ -527,38 +1003,53 @@ class Outcar(object):
         ]
 
     @staticmethod
-    def get_magnetization(filename="OUTCAR", lines=None):
+    def get_magnetization(filename="OUTCAR", lines=None, as_array=False):
         """
         Gets the magnetization
 
         Args:
             filename (str): Filename of the OUTCAR file to parse
             lines (list/None): lines read from the file
+            as_array (bool): Return the final magnetic moments as numpy array rather than as nested lists
 
         Returns:
             list: A list with the mgnetization values
+            list/numpy.ndarray: The final magnetic moments of shape (ionic steps, atoms) for collinear and (ionic steps,
+                                atoms, 3) for non-collinear calculations
         """
         ionic_trigger = "FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)"
+        local_spin_str = "Atomic Wigner-Seitz radii"
         electronic_trigger = "eigenvalue-minimisations"
         nion_trigger = "NIONS ="
+        magnetization_triggers = [
+            "magnetization ({})".format(direc) for direc in ["x", "y", "z"]
+        ]
         mag_lst = list()
-        local_spin_trigger = False
         n_atoms = None
-        mag_dict = dict()
-        mag_dict["x"] = list()
-        mag_dict["y"] = list()
-        mag_dict["z"] = list()
-        lines = _get_lines_from_file(filename=filename, lines=lines)
+        triggers = [
+            ionic_trigger,
+            local_spin_str,
+            electronic_trigger,
+            nion_trigger,
+        ] + magnetization_triggers
+        trigger_dict, lines = _get_triggers(
+            triggers=triggers, filename=filename, lines=lines
+        )
         istep_energies = list()
-        final_magmom_lst = list()
-        for i, line in enumerate(lines):
-            line = line.strip()
+        final_magmom_lst = np.zeros((0,)) if as_array else list()
+        # process the lines with any of the triggers in the order of the file
+        for i in sorted(
+            set(
+                itertools.chain.from_iterable(
+                    trigger_dict[trigger]
+                    for trigger in [ionic_trigger, electronic_trigger, nion_trigger]
+                )
+            )
+        ):
+            line = lines[i].strip()
             if ionic_trigger in line:
                 mag_lst.append(np.array(istep_energies))
                 istep_energies = list()
-            if "Atomic Wigner-Seitz radii" in line:
-                local_spin_trigger = True
-
             if electronic_trigger in line:
                 try:
                     line = lines[i + 2].split("magnetization")[-1]
@@ -582,30 +1073,28 @@ class Outcar(object):
             if n_atoms is None:
                 if nion_trigger in line:
                     n_atoms = int(line.split(nion_trigger)[-1])
-            if local_spin_trigger:
-                try:
-                    for ind_dir, direc in enumerate(["x", "y", "z"]):
-                        if "magnetization ({})".format(direc) in line:
-                            mag_dict[direc].append(
-                                [
-                                    float(lines[i + 4 + atom_index].split()[-1])
-                                    for atom_index in range(n_atoms)
-                                ]
-                            )
-                except ValueError:
-                    warnings.warn(
-                        "Something went wrong in parsing the magnetic moments"
-                    )
-        if len(mag_dict["x"]) > 0:
-            if len(mag_dict["y"]) == 0:
-                final_mag = np.array(mag_dict["x"])
+        if len(trigger_dict[local_spin_str]) == 0:
+            return mag_lst, final_magmom_lst
+        # only the tables following the Wigner-Seitz radii contain the local magnetic moments
+        local_spin_index = trigger_dict[local_spin_str][0]
+        mag_tables = [
+            _get_magnetization_tables(
+                lines=lines,
+                trigger_indices=[
+                    i for i in trigger_dict[trigger] if i > local_spin_index
+                ],
+                n_atoms=n_atoms,
+            )
+            for trigger in magnetization_triggers
+        ]
+        if len(mag_tables[0]) > 0:
+            if len(mag_tables[1]) == 0:
+                final_mag = mag_tables[0]
             else:
-                n_ionic_steps = np.array(mag_dict["x"]).shape[0]
-                final_mag = np.abs(np.zeros((n_ionic_steps, n_atoms, 3)))
-                final_mag[:, :, 0] = np.array(mag_dict["x"])
-                final_mag[:, :, 1] = np.array(mag_dict["y"])
-                final_mag[:, :, 2] = np.array(mag_dict["z"])
-            final_magmom_lst = final_mag.tolist()
+                final_mag = np.empty((len(mag_tables[0]), n_atoms, 3))
+                for ind_dir, tables in enumerate(mag_tables):
+                    final_mag[:, :, ind_dir] = tables
+            final_magmom_lst = final_mag if as_array else final_mag.tolist()
         return mag_lst, final_magmom_lst
 
     @staticmethod
@@ -685,18 +1174,13 @@ class Outcar(object):
         Returns:
             numpy.ndarray: Steps during the simulation
         """
-        nblock_regex = re.compile(r"NBLOCK =\s+(\d+);")
         trigger = "FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)"
-        steps = 0
-        nblock = None
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for line in lines:
-            if trigger in line:
-                steps += 1
-            if nblock is None and (match := nblock_regex.search(line)):
-                nblock = int(match[1])
-        if nblock is None:
-            nblock = 1
+        nblock_trigger = "NBLOCK ="
+        trigger_dict, lines = _get_triggers(
+            triggers=[trigger, nblock_trigger], filename=filename, lines=lines
+        )
+        steps = len(trigger_dict[trigger])
+        nblock = _get_nblock(lines=lines)
         return np.arange(0, steps * nblock, nblock)
 
     def get_time(self, filename="OUTCAR", lines=None):
@@ -711,16 +1195,8 @@ class Outcar(object):
             numpy.ndarray: An array of time values in fs
 
         """
-        potim_trigger = "POTIM  ="
-        potim = 1.0
         lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            if potim_trigger in line:
-                line = line.strip()
-                line = _clean_line(line)
-                potim = float(line.split(potim_trigger)[1].strip().split()[0])
-                break
-        return potim * self.get_steps(filename)
+        return _get_potim(lines=lines) * self.get_steps(filename=filename, lines=lines)
 
     @staticmethod
     def get_kinetic_energy_error(filename="OUTCAR", lines=None):
@@ -739,15 +1215,16 @@ class Outcar(object):
         n_species_list = list()
         nion_trigger = "ions per type ="
         tot_kin_error = 0.0
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if trigger in line:
-                e_kin_err.append(float(line.split()[5]))
-            if nion_trigger in line:
-                n_species_list = [
-                    float(val) for val in line.split(nion_trigger)[-1].strip().split()
-                ]
+        trigger_dict, lines = _get_triggers(
+            triggers=[trigger, nion_trigger], filename=filename, lines=lines
+        )
+        for i in trigger_dict[trigger]:
+            e_kin_err.append(float(lines[i].strip().split()[5]))
+        if len(trigger_dict[nion_trigger]) > 0:
+            line = lines[trigger_dict[nion_trigger][-1]].strip()
+            n_species_list = [
+                float(val) for val in line.split(nion_trigger)[-1].strip().split()
+            ]
         if len(n_species_list) > 0 and len(n_species_list) == len(e_kin_err):
             tot_kin_error = np.sum(np.array(n_species_list) * np.array(e_kin_err))
         return tot_kin_error
@@ -792,10 +1269,12 @@ class Outcar(object):
         moment_trigger = "dipolmoment"
         istep_trigger = "FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)"
         dip_moms = list()
-        lines = _get_lines_from_file(filename=filename, lines=lines)
+        trigger_dict, lines = _get_triggers(
+            triggers=[istep_trigger, moment_trigger], filename=filename, lines=lines
+        )
         istep_mom = list()
-        for i, line in enumerate(lines):
-            line = line.strip()
+        for i in sorted(set(itertools.chain.from_iterable(trigger_dict.values()))):
+            line = lines[i].strip()
             if istep_trigger in line:
                 dip_moms.append(np.array(istep_mom))
                 istep_mom = list()
@@ -819,11 +1298,11 @@ class Outcar(object):
 
         """
         nelect_trigger = "NELECT"
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if nelect_trigger in line:
-                return float(line.split()[2])
+        trigger_indices, lines = _get_trigger(
+            lines=lines, filename=filename, trigger=nelect_trigger
+        )
+        if len(trigger_indices) > 0:
+            return float(lines[trigger_indices[0]].strip().split()[2])
 
     @staticmethod
     def get_cpu_time(filename="OUTCAR", lines=None):
@@ -839,11 +1318,11 @@ class Outcar(object):
 
         """
         nelect_trigger = "Total CPU time used (sec):"
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if nelect_trigger in line:
-                return float(line.split()[-1])
+        trigger_indices, lines = _get_trigger(
+            lines=lines, filename=filename, trigger=nelect_trigger
+        )
+        if len(trigger_indices) > 0:
+            return float(lines[trigger_indices[0]].strip().split()[-1])
 
     @staticmethod
     def get_user_time(filename="OUTCAR", lines=None):
@@ -859,11 +1338,11 @@ class Outcar(object):
 
         """
         nelect_trigger = "User time (sec):"
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if nelect_trigger in line:
-                return float(line.split()[-1])
+        trigger_indices, lines = _get_trigger(
+            lines=lines, filename=filename, trigger=nelect_trigger
+        )
+        if len(trigger_indices) > 0:
+            return float(lines[trigger_indices[0]].strip().split()[-1])
 
     @staticmethod
     def get_system_time(filename="OUTCAR", lines=None):
@@ -879,11 +1358,11 @@ class Outcar(object):
 
         """
         nelect_trigger = "System time (sec):"
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if nelect_trigger in line:
-                return float(line.split()[-1])
+        trigger_indices, lines = _get_trigger(
+            lines=lines, filename=filename, trigger=nelect_trigger
+        )
+        if len(trigger_indices) > 0:
+            return float(lines[trigger_indices[0]].strip().split()[-1])
 
     @staticmethod
     def get_elapsed_time(filename="OUTCAR", lines=None):
@@ -899,11 +1378,11 @@ class Outcar(object):
 
         """
         nelect_trigger = "Elapsed time (sec):"
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if nelect_trigger in line:
-                return float(line.split()[-1])
+        trigger_indices, lines = _get_trigger(
+            lines=lines, filename=filename, trigger=nelect_trigger
+        )
+        if len(trigger_indices) > 0:
+            return float(lines[trigger_indices[0]].strip().split()[-1])
 
     @staticmethod
     def get_memory_used(filename="OUTCAR", lines=None):
@@ -919,11 +1398,11 @@ class Outcar(object):
 
         """
         nelect_trigger = "Maximum memory used (kb):"
-        lines = _get_lines_from_file(filename=filename, lines=lines)
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if nelect_trigger in line:
-                return float(line.split()[-1])
+        trigger_indices, lines = _get_trigger(
+            lines=lines, filename=filename, trigger=nelect_trigger
+        )
+        if len(trigger_indices) > 0:
+            return float(lines[trigger_indices[0]].strip().split()[-1])
 
     @staticmethod
     def get_number_of_atoms(filename="OUTCAR", lines=None):
@@ -950,35 +1429,92 @@ class Outcar(object):
             )
 
     @staticmethod
-    def get_band_properties(filename="OUTCAR", lines=None):
-        fermi_trigger = "E-fermi"
-        fermi_trigger_indices, lines = _get_trigger(
-            lines=lines, filename=filename, trigger=fermi_trigger
-        )
+    def get_band_occupations(filename="OUTCAR", lines=None, band_data=None):
+        """
+        Gets the band energies and occupations printed after every "E-fermi" line of the OUTCAR file
+
+        Args:
+            filename (str): Filename of the OUTCAR file to parse
+            lines (list/None): lines read from the file
+            band_data (tuple/None): result of _get_band_data() if it is already available
+
+        Returns:
+            numpy.ndarray/None: A (N, S, K, B, 2) array of the band energies in $eV$ and the occupations
+
+            where N is the number of "E-fermi" blocks with band tables, S the number of spin components, K the number
+            of k-points and B the number of bands - None if the band tables differ in size
+        """
+        if band_data is None:
+            band_data = _get_band_data(filename=filename, lines=lines)
+        return band_data[2]
+
+    @staticmethod
+    def get_band_properties(filename="OUTCAR", lines=None, band_data=None):
+        """
+        Gets the Fermi level, the valence band maximum and the conduction band minimum for every "E-fermi" block of
+        the OUTCAR file
+
+        Args:
+            filename (str): Filename of the OUTCAR file to parse
+            lines (list/None): lines read from the file
+            band_data (tuple/None): result of _get_band_data() if it is already available
+
+        Returns:
+            numpy.ndarray: A 1xN array of the Fermi levels in $eV$
+            numpy.ndarray: A SxN array of the valence band maxima in $eV$
+            numpy.ndarray: A SxN array of the conduction band minima in $eV$
+
+            where N is the number of "E-fermi" blocks and S the number of spin components
+        """
+        if band_data is None:
+            band_data = _get_band_data(filename=filename, lines=lines)
+        fermi_trigger_indices, band_trigger_indices, band_occupations = band_data
+        lines = _get_lines_from_file(filename=filename, lines=lines)
         fermi_level_list = list()
-        vbm_level_dict = OrderedDict()
-        cbm_level_dict = OrderedDict()
         for ind in fermi_trigger_indices:
             fermi_level_list.append(float(lines[ind].strip().split()[2]))
-        band_trigger = "band No.  band energies     occupation"
+        if band_occupations is not None and len(fermi_trigger_indices) > 0:
+            n_blocks, n_spin = band_occupations.shape[:2]
+            band_energy = band_occupations[..., 0].reshape(n_blocks, n_spin, -1)
+            cbm_bool = (
+                np.abs(band_occupations[..., 1].reshape(n_blocks, n_spin, -1)) < 1e-6
+            )
+            cbm = np.where(
+                np.any(cbm_bool, axis=-1),
+                np.min(
+                    np.where(cbm_bool, band_energy, np.inf), axis=-1, initial=np.inf
+                ),
+                np.max(band_energy, axis=-1, initial=-np.inf),
+            )
+            # If spin channel is completely empty, setting vbm=cbm
+            vbm = np.where(
+                np.all(cbm_bool, axis=-1),
+                cbm,
+                np.max(
+                    np.where(cbm_bool, -np.inf, band_energy), axis=-1, initial=-np.inf
+                ),
+            )
+            return np.array(fermi_level_list), vbm.T, cbm.T
+        # fall back to the band tables of each block, if they differ in size
+        vbm_level_dict = OrderedDict()
+        cbm_level_dict = OrderedDict()
         is_spin_polarized = False
         for n, ind in enumerate(fermi_trigger_indices):
             if n == len(fermi_trigger_indices) - 1:
-                trigger_indices, lines_new = _get_trigger(
-                    lines=lines[ind:-1], filename=filename, trigger=band_trigger
-                )
+                ind_next = len(lines) - 1
             else:
-                trigger_indices, lines_new = _get_trigger(
-                    lines=lines[ind : fermi_trigger_indices[n + 1]],
-                    filename=filename,
-                    trigger=band_trigger,
+                ind_next = fermi_trigger_indices[n + 1]
+            trigger_indices = band_trigger_indices[
+                bisect.bisect_left(band_trigger_indices, ind) : bisect.bisect_left(
+                    band_trigger_indices, ind_next
                 )
+            ]
             band_data = list()
             for ind in trigger_indices:
-                if "spin component" in lines_new[ind - 3]:
+                if "spin component" in lines[ind - 3]:
                     is_spin_polarized = True
-                for line in lines_new[ind + 1 :]:
-                    data = line.strip().split()
+                for line_index in range(ind + 1, ind_next):
+                    data = lines[line_index].strip().split()
                     # This if "Fermi" bypass needs to exist because of VASP changing it's OUTCAR format after 6.1.0
                     # In all versions prior, searching "Fermi" will only yield 2 mentions in the OUTCAR
                     # In the new versions, a Fermi energy is printed immediately after each spin-component k-point text block:
@@ -1073,20 +1609,32 @@ class Outcar(object):
             where N is the number of atoms and M is the number of time steps
 
         """
-        positions = []
-        forces = []
-        for j in trigger_indices:
-            pos = []
-            force = []
-            for line in lines[j + 2 : j + n_atoms + 2]:
-                line = line.strip()
-                line = _clean_line(line)
-                if pos_flag:
-                    pos.append([float(l) for l in line.split()[0:3]])
-                if force_flag:
-                    force.append([float(l) for l in line.split()[3:]])
-            forces.append(force)
-            positions.append(pos)
+        positions_and_forces = _parse_blocks(
+            lines=lines,
+            trigger_indices=trigger_indices,
+            n_rows=n_atoms,
+            n_columns=6,
+            offset=2,
+        )
+        if positions_and_forces is not None:
+            positions = positions_and_forces[:, :, 0:3]
+            forces = positions_and_forces[:, :, 3:]
+        else:
+            # fall back to line by line parsing, when the blocks are not complete
+            positions = []
+            forces = []
+            for j in trigger_indices:
+                pos = []
+                force = []
+                for line in lines[j + 2 : j + n_atoms + 2]:
+                    line = line.strip()
+                    line = _clean_line(line)
+                    if pos_flag:
+                        pos.append([float(l) for l in line.split()[0:3]])
+                    if force_flag:
+                        force.append([float(l) for l in line.split()[3:]])
+                forces.append(force)
+                positions.append(pos)
         if pos_flag and force_flag:
             return np.array(positions), np.array(forces)
         elif pos_flag:
@@ -1125,7 +1673,7 @@ class Outcar(object):
             return
 
     @staticmethod
-    def get_energy_components(filename="OUTCAR", lines=None):
+    def get_energy_components(filename="OUTCAR", lines=None, as_dict=False):
         """
         Gets the individual components of the free energy energy for every electronic step from the OUTCAR file
 
@@ -1143,9 +1691,18 @@ class Outcar(object):
         Args:
             filename (str): Filename of the OUTCAR file to parse
             lines (list/None): lines read from the file
+            as_dict (bool): Return the components of all electronic steps as one array per component rather than one
+                            table per ionic step
         Returns:
             numpy.ndarray: A 1xM array of the total energies in $eV$
             where M is the number of time steps
+
+            if as_dict is True:
+            dict: The components of all electronic steps of shape (number of electronic steps,) keyed by their name -
+                  PSCENC, TEWEN, DENC, EXHF, XCENC, PAWPS, PAWAE (the two PAW double counting terms), EENTRO, EBANDS,
+                  EATOM and Ediel_sol if the solvation energy is written
+            numpy.ndarray: Offsets of the electronic steps of each ionic step - the electronic steps of the i-th ionic
+                           step are offsets[i]:offsets[i + 1]
         """
         ind_ionic_lst, lines = _get_trigger(
             trigger="FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)",
@@ -1159,6 +1716,34 @@ class Outcar(object):
             lines=lines,
             return_lines=False,
         )
+        offsets = np.concatenate(
+            [[0], np.searchsorted(ind_elec_lst, ind_ionic_lst)]
+        ).astype(int)
+        ind_elec_array = np.array(ind_elec_lst, dtype=int)[: offsets[-1]]
+        names, components = _parse_energy_components(
+            lines=lines, trigger_indices=ind_elec_array
+        )
+        if as_dict:
+            if components is None:
+                warnings.warn("Unable to parse the energy components")
+                return OrderedDict(), np.zeros(1, dtype=int)
+            return (
+                OrderedDict(
+                    (name, components[:, i].copy()) for i, name in enumerate(names)
+                ),
+                offsets,
+            )
+        if components is not None and len(names) == 11:
+            energy_components = list()
+            for ind_start, ind_end in zip(offsets[:-1], offsets[1:]):
+                if ind_start == ind_end:
+                    energy_components.append(np.array([]))
+                    continue
+                step_components = components[ind_start:ind_end].copy()
+                # the PAW double counting of the last electronic step is repeated for all electronic steps
+                step_components[:, 5:7] = step_components[-1, 5:7]
+                energy_components.append(step_components.T)
+            return energy_components
         ind_combo_lst = _split_indices(
             ind_ionic_lst=ind_ionic_lst, ind_elec_lst=ind_elec_lst
         )
@@ -1192,46 +1777,1306 @@ def _clean_line(line):
     return line.replace("-", " -")
 
 
-def _get_trigger(trigger, filename=None, lines=None, return_lines=True):
+def _parse_blocks(
+    lines, trigger_indices, n_rows, n_columns, offset=0, max_rows_per_batch=100000
+):
     """
-    Find the lines where a specific trigger appears.
+    Decode the numerical tables of equal shape following the trigger lines with one numerical conversion per batch of
+    tables rather than one per value. Fused negative numbers are separated like in _clean_line().
 
     Args:
-        trigger (str): string pattern to search for
-        lines (list/None): list of lines
-        filename (str/None): file to read lines from
+        lines (list): lines read from the file
+        trigger_indices (list): list of line indices where the trigger was found
+        n_rows (int): number of lines of each table
+        n_columns (int): number of values in each line of a table
+        offset (int): number of lines between the trigger line and the first line of each table
+        max_rows_per_batch (int): maximum number of lines which are joined and converted at once
 
     Returns:
-        list: indicies of the lines where the trigger string was found and list of lines
+        numpy.ndarray/None: tables of shape (number of tables, n_rows, n_columns) or None if the lines following the
+                            triggers do not contain tables of this shape
     """
-    lines = _get_lines_from_file(filename=filename, lines=lines)
-    trigger_indicies = [i for i, line in enumerate(lines) if trigger in line.strip()]
-    if return_lines:
-        return trigger_indicies, lines
-    else:
-        return trigger_indicies
+    n_blocks = len(trigger_indices)
+    if n_blocks == 0 or n_rows < 1:
+        return None
+    blocks = np.empty((n_blocks, n_rows, n_columns))
+    blocks_per_batch = max(max_rows_per_batch // n_rows, 1)
+    for start in range(0, n_blocks, blocks_per_batch):
+        batch_indices = trigger_indices[start : start + blocks_per_batch]
+        text = "".join(
+            itertools.chain.from_iterable(
+                lines[i + offset : i + offset + n_rows] for i in batch_indices
+            )
+        )
+        values = _clean_line(text).split()
+        if len(values) != len(batch_indices) * n_rows * n_columns:
+            return None
+        try:
+            blocks[start : start + len(batch_indices)] = np.array(
+                values, dtype=float
+            ).reshape(len(batch_indices), n_rows, n_columns)
+        except ValueError:
+            return None
+    return blocks
 
 
-def _split_indices(ind_ionic_lst, ind_elec_lst):
+def _get_magnetization_tables(lines, trigger_indices, n_atoms):
     """
-    Combine ionic pattern matches and electronic pattern matches
+    Decode the total local magnetic moments of the magnetization tables of one direction.
 
     Args:
-        ind_ionic_lst (list): indices of lines which matched the iconic pattern
-        ind_elec_lst (list): indices of lines which matched the electronic pattern
+        lines (list): lines read from the file
+        trigger_indices (list): line indices of the "magnetization (x/y/z)" headings
+        n_atoms (int): number of atoms
 
     Returns:
-        list: nested list of electronic pattern matches within an ionic pattern match
+        numpy.ndarray: magnetic moments of shape (number of tables, n_atoms)
     """
-    ind_elec_array = np.array(ind_elec_lst)
-    return [
-        (
-            ind_elec_array[(ind_elec_array < j2) & (j1 < ind_elec_array)]
-            if j1 < j2
-            else ind_elec_array[(ind_elec_array < j2)]
+    if len(trigger_indices) == 0:
+        return np.zeros((0, n_atoms))
+    n_columns = len(_clean_line(lines[trigger_indices[0] + 4]).split())
+    blocks = _parse_blocks(
+        lines=lines,
+        trigger_indices=trigger_indices,
+        n_rows=n_atoms,
+        n_columns=n_columns,
+        offset=4,
+    )
+    if blocks is not None:
+        return blocks[:, :, -1]
+    tables = list()
+    for i in trigger_indices:
+        try:
+            tables.append(
+                [
+                    float(lines[i + 4 + atom_index].split()[-1])
+                    for atom_index in range(n_atoms)
+                ]
+            )
+        except ValueError:
+            warnings.warn("Something went wrong in parsing the magnetic moments")
+    return np.array(tables).reshape(len(tables), n_atoms)
+
+
+def _get_delimiter_indices(lines, trigger_indices, n_delimiters=2, window=24):
+    """
+    Find the first lines consisting only of dashes, which delimit the tables following the trigger lines. The
+    windows of lines following all triggers are searched at once, only if a window does not contain enough
+    delimiters, the lines following its trigger are searched one by one.
+
+    Args:
+        lines (list): lines read from the file
+        trigger_indices (list): line indices of the triggers
+        n_delimiters (int): number of delimiters to find for each trigger
+        window (int): number of lines following each trigger which are searched at once
+
+    Returns:
+        numpy.ndarray: line indices of the delimiters of shape (number of triggers, n_delimiters)
+    """
+    trigger_indices = np.array(trigger_indices, dtype=int)
+    window_lines = [lines[j : j + window] for j in trigger_indices]
+    window_starts = np.cumsum([0] + [len(w) for w in window_lines])[:-1]
+    # the text starts with a newline, so every line, including the delimiters, is preceded by one
+    text = b"\n" + "".join(itertools.chain.from_iterable(window_lines)).encode()
+    line_starts = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == ord("\n"))
+    match_starts = np.array(
+        [match.start() for match in re.finditer(rb"\n[ \t]*-+[ \t\r]*(?=\n|$)", text)],
+        dtype=int,
+    )
+    match_lines = np.searchsorted(line_starts, match_starts)
+    match_windows = np.searchsorted(window_starts, match_lines, side="right") - 1
+    delimiter_indices = np.full((len(trigger_indices), n_delimiters), -1)
+    _, first_matches, n_matches = np.unique(
+        match_windows, return_index=True, return_counts=True
+    )
+    for k in range(n_delimiters):
+        found = n_matches > k
+        match_indices = first_matches[found] + k
+        delimiter_indices[match_windows[match_indices], k] = (
+            trigger_indices[match_windows[match_indices]]
+            + match_lines[match_indices]
+            - window_starts[match_windows[match_indices]]
         )
-        for j1, j2 in zip(np.roll(ind_ionic_lst, 1), ind_ionic_lst)
-    ]
+    for i in np.flatnonzero(np.any(delimiter_indices < 0, axis=1)):
+        jj = trigger_indices[i]
+        for k in range(n_delimiters):
+            while set(lines[jj].strip()) != {"-"}:
+                jj += 1
+            delimiter_indices[i, k] = jj
+            jj += 1
+    return delimiter_indices
+
+
+def _parse_rows(lines, line_indices, start, stop):
+    """
+    Decode the columns start:stop of the given lines in one numerical conversion, if all lines have the same number of
+    columns. Lines whose columns can not be converted are set to NaN.
+
+    Args:
+        lines (list): lines read from the file
+        line_indices (list/numpy.ndarray): indices of the lines
+        start (int): first column to decode
+        stop (int): column after the last column to decode
+
+    Returns:
+        numpy.ndarray: decoded columns of shape (number of lines, stop - start)
+    """
+    rows = [lines[i].split() for i in line_indices]
+    if len(rows) > 0 and all(len(row) == len(rows[0]) for row in rows):
+        try:
+            return np.array(rows)[:, start:stop].astype(float)
+        except ValueError:
+            pass
+    row_values = np.full((len(rows), stop - start), np.nan)
+    for i, row in enumerate(rows):
+        try:
+            row_values[i] = [float(value) for value in row[start:stop]]
+        except ValueError:
+            pass
+    return row_values
+
+
+def _get_outcar_fields(fields=None):
+    """
+    Args:
+        fields (list/None): parse_dict keys to parse, None for all keys except OUTCAR_OPTIONAL_FIELDS
+
+    Returns:
+        list: parse_dict keys to parse
+    """
+    if fields is None:
+        return [
+            key
+            for _, keys in OUTCAR_EXTRACTORS.values()
+            for key in keys
+            if key not in OUTCAR_OPTIONAL_FIELDS
+        ]
+    return list(fields)
+
+
+def _parse_outcar_parallel(filename, fields=None, processes=2, max_part_size=2**28):
+    """
+    Parse an OUTCAR file in parts in a process pool. The parts end after the "LOOP+" line which concludes an ionic
+    step, each part is parsed together with the header of the file and the header quantities are only taken from
+    the first part.
+
+    Args:
+        filename (str): Filename of the OUTCAR file to parse
+        fields (list/None): parse_dict keys to parse, all keys except OUTCAR_OPTIONAL_FIELDS if None
+        processes (int): number of processes
+        max_part_size (int): maximum size of a part in bytes, the file is split into more parts than processes if
+                             required to stay below it
+
+    Returns:
+        dict: quantities parsed from the OUTCAR file
+    """
+    with open(filename, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return _parse_outcar_part(
+                filename=filename, header_end=0, start=0, end=0, fields=fields
+            )
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            header_end = _find_header_end(buffer)
+            if header_end is None:
+                header_end = 0
+            n_parts = max(processes, -(-(size - header_end) // max_part_size))
+            boundaries = [header_end]
+            for i in range(1, n_parts):
+                start = buffer.find(
+                    b"LOOP+",
+                    max(
+                        header_end + i * (size - header_end) // n_parts,
+                        boundaries[-1],
+                    ),
+                )
+                if start == -1:
+                    break
+                end = buffer.find(b"\n", start)
+                if end == -1:
+                    break
+                if end + 1 > boundaries[-1]:
+                    boundaries.append(end + 1)
+            header = buffer[:header_end].decode(errors="ignore")
+    if boundaries[-1] < size:
+        boundaries.append(size)
+    if len(boundaries) < 2:
+        boundaries.append(header_end)
+    part_fields = [fields] + [
+        [
+            field
+            for field in _get_outcar_fields(fields=fields)
+            if field not in OUTCAR_HEADER_FIELDS
+        ]
+    ] * (len(boundaries) - 2)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        parse_dicts = list(
+            executor.map(
+                _parse_outcar_part,
+                itertools.repeat(filename),
+                itertools.repeat(header_end),
+                boundaries[:-1],
+                boundaries[1:],
+                part_fields,
+                # without a selection of fields most triggers are required, so they are searched for in one pass
+                itertools.repeat(OUTCAR_TRIGGERS if fields is None else ()),
+            )
+        )
+    parse_dict = _merge_outcar_parse_dicts(parse_dicts=parse_dicts)
+    header_lines = _TriggerLines(_split_lines(header))
+    _update_outcar_steps(
+        parse_dict=parse_dict,
+        n_steps=sum(len(d.get("steps", d.get("time", []))) for d in parse_dicts),
+        nblock=_get_nblock(lines=header_lines),
+        potim=_get_potim(lines=header_lines),
+    )
+    return parse_dict
+
+
+def _parse_outcar_part(filename, header_end, start, end, fields=None, triggers=()):
+    """
+    Parse a part of an OUTCAR file together with its header.
+
+    Args:
+        filename (str): Filename of the OUTCAR file to parse
+        header_end (int): offset of the end of the header
+        start (int): offset of the start of the part
+        end (int): offset of the end of the part
+        fields (list/None): parse_dict keys to parse, all keys except OUTCAR_OPTIONAL_FIELDS if None
+        triggers (list/tuple): trigger strings to search for before parsing
+
+    Returns:
+        dict: quantities parsed from the part
+    """
+    with open(filename, "rb") as f:
+        header = f.read(header_end)
+        f.seek(start)
+        data = f.read(end - start)
+    outcar = Outcar()
+    outcar._parse_lines(
+        filename=filename,
+        lines=_TriggerLines(
+            _split_lines((header + data).decode(errors="ignore")),
+            triggers=triggers,
+        ),
+        fields=fields,
+    )
+    return outcar.parse_dict
+
+
+def _get_outcar_extractors(fields=None):
+    """
+    Resolve the extractors required to parse some of the parse_dict keys of an OUTCAR file.
+
+    Args:
+        fields (list/None): parse_dict keys to parse, all keys except OUTCAR_OPTIONAL_FIELDS are parsed if None
+
+    Returns:
+        list: names of the required extractors in the order they have to be run
+    """
+    fields = _get_outcar_fields(fields=fields)
+    key_extractors = {
+        key: name for name, (_, keys) in OUTCAR_EXTRACTORS.items() for key in keys
+    }
+    unknown_fields = [field for field in fields if field not in key_extractors.keys()]
+    if len(unknown_fields) > 0:
+        raise ValueError(
+            "Unknown OUTCAR fields {}, available fields are {}".format(
+                unknown_fields, list(key_extractors.keys())
+            )
+        )
+    required = set()
+    names = [key_extractors[field] for field in fields]
+    while len(names) > 0:
+        name = names.pop()
+        if name not in required:
+            required.add(name)
+            names += list(OUTCAR_EXTRACTORS[name][0])
+    return [name for name in OUTCAR_EXTRACTORS.keys() if name in required]
+
+
+def _get_band_data(filename="OUTCAR", lines=None):
+    """
+    Collect the band tables following the "E-fermi" lines of an OUTCAR file into one array, if all blocks contain the
+    same number of tables with the same number of bands.
+
+    Args:
+        filename (str): Filename of the OUTCAR file to parse
+        lines (list/None): lines read from the file
+
+    Returns:
+        list: indices of the "E-fermi" lines
+        list: indices of the band table headers
+        numpy.ndarray/None: A (N, S, K, B, 2) array of the band energies and occupations, see
+                            Outcar.get_band_occupations()
+    """
+    trigger_dict, lines = _get_triggers(
+        triggers=["E-fermi", "band No.  band energies     occupation"],
+        filename=filename,
+        lines=lines,
+    )
+    fermi_trigger_indices = trigger_dict["E-fermi"]
+    band_trigger_indices = trigger_dict["band No.  band energies     occupation"]
+    band_indices = np.array(band_trigger_indices, dtype=int)
+    block_indices = (
+        np.searchsorted(
+            np.array(fermi_trigger_indices, dtype=int), band_indices, side="right"
+        )
+        - 1
+    )
+    band_indices = band_indices[block_indices >= 0]
+    block_indices = block_indices[block_indices >= 0]
+    if len(band_indices) == 0:
+        return fermi_trigger_indices, band_trigger_indices, np.zeros((0, 1, 0, 0, 2))
+    # once a spin component header was found, all following blocks are treated as spin polarized
+    spin_polarized = np.maximum.accumulate(
+        ["spin component" in lines[ind - 3] for ind in band_indices]
+    )
+    _, block_starts, block_sizes = np.unique(
+        block_indices, return_index=True, return_counts=True
+    )
+    block_spin_polarized = spin_polarized[block_starts + block_sizes - 1]
+    n_spin = 2 if block_spin_polarized[0] else 1
+    n_tables = block_sizes[0]
+    if (
+        np.any(block_sizes != n_tables)
+        or np.any(block_spin_polarized != block_spin_polarized[0])
+        or n_tables % n_spin != 0
+    ):
+        return fermi_trigger_indices, band_trigger_indices, None
+    n_bands = 0
+    while not _is_band_table_end(lines=lines, line_index=band_indices[0] + 1 + n_bands):
+        n_bands += 1
+    # the tables have to end after the same number of bands, lines with the Fermi energy written by VASP 6 after the
+    # tables are skipped
+    for ind in band_indices:
+        line_index = ind + 1 + n_bands
+        while line_index < len(lines) and "Fermi" in lines[line_index].split():
+            line_index += 1
+        if not _is_band_table_end(lines=lines, line_index=line_index):
+            return fermi_trigger_indices, band_trigger_indices, None
+    tables = _parse_blocks(
+        lines=lines,
+        trigger_indices=band_indices.tolist(),
+        n_rows=n_bands,
+        n_columns=3,
+        offset=1,
+    )
+    if tables is None or np.any(tables[:, :, 0] != np.arange(1, n_bands + 1)):
+        return fermi_trigger_indices, band_trigger_indices, None
+    return (
+        fermi_trigger_indices,
+        band_trigger_indices,
+        tables[:, :, 1:].reshape(
+            len(block_sizes), n_spin, n_tables // n_spin, n_bands, 2
+        ),
+    )
+
+
+def _is_band_table_end(lines, line_index):
+    """
+    Args:
+        lines (list): lines read from the file
+        line_index (int): index of a line following the rows of a band table
+
+    Returns:
+        bool: True if the line does not continue the band table
+    """
+    if line_index >= len(lines):
+        return True
+    data = lines[line_index].split()
+    return len(data) != 3 or "Fermi" in data
+
+
+def _get_nblock(lines):
+    """
+    Args:
+        lines (_TriggerLines/_MappedLines): lines of the OUTCAR file
+
+    Returns:
+        int: number of MD steps between two ionic steps written to the OUTCAR file
+    """
+    nblock_regex = re.compile(r"NBLOCK =\s+(\d+);")
+    for i in lines.get_trigger_indices("NBLOCK ="):
+        if match := nblock_regex.search(lines[i]):
+            return int(match[1])
+    return 1
+
+
+def _get_potim(lines):
+    """
+    Args:
+        lines (_TriggerLines/_MappedLines): lines of the OUTCAR file
+
+    Returns:
+        float: time step in fs
+    """
+    potim_trigger = "POTIM  ="
+    trigger_indices = lines.get_trigger_indices(potim_trigger)
+    if len(trigger_indices) > 0:
+        line = lines[trigger_indices[0]].strip()
+        line = _clean_line(line)
+        return float(line.split(potim_trigger)[1].strip().split()[0])
+    return 1.0
+
+
+def _split_lines(text):
+    """
+    Split a text into lines like file.readlines(), only at line breaks.
+
+    Args:
+        text (str): text to split
+
+    Returns:
+        list: lines including their line breaks
+    """
+    lines = text.split("\n")
+    last_line = lines.pop()
+    lines = [line + "\n" for line in lines]
+    if last_line != "":
+        lines.append(last_line)
+    return lines
+
+
+def _find_header_end(data):
+    """
+    Args:
+        data (bytes): beginning of an OUTCAR file
+
+    Returns:
+        int/None: offset of the line starting the first ionic step, None if there is none
+    """
+    match = re.search(rb"-\s*Iteration\s+\d+\(\s*\d+\)", data)
+    if match is None:
+        return None
+    return data.rfind(b"\n", 0, match.start()) + 1
+
+
+def _find_ionic_step_end(data, first=False):
+    """
+    Args:
+        data (bytes): part of an OUTCAR file starting at the beginning of an ionic step
+        first (bool): find the end of the first ionic step rather than the end of the last one
+
+    Returns:
+        int: offset after the last (or first) complete "LOOP+" line, which concludes an ionic step, 0 if there is none
+    """
+    if first:
+        start = data.find(b"LOOP+")
+        line_end = data.find(b"\n", start)
+        if start == -1 or line_end == -1:
+            return 0
+        return line_end + 1
+    end = len(data)
+    while True:
+        start = data.rfind(b"LOOP+", 0, end)
+        if start == -1:
+            return 0
+        line_end = data.find(b"\n", start)
+        if line_end != -1:
+            return line_end + 1
+        end = start
+
+
+def _get_step_header(data):
+    """
+    Reduce the header of an OUTCAR file to the lines which the extractors of Outcar.iter_steps() depend on.
+
+    Args:
+        data (bytes): header of an OUTCAR file
+
+    Returns:
+        list: header lines with the number of ions and the Wigner-Seitz radii
+    """
+    lines = _TriggerLines(_split_lines(data.decode(errors="ignore")))
+    trigger_dict, lines = _get_triggers(
+        triggers=["NIONS =", "Atomic Wigner-Seitz radii"], lines=lines
+    )
+    return [
+        lines[i]
+        for i in sorted(set(itertools.chain.from_iterable(trigger_dict.values())))
+    ]
+
+
+def _parse_step_records(header, data):
+    """
+    Parse the ionic steps of a part of an OUTCAR file for Outcar.iter_steps().
+
+    Args:
+        header (list): header lines returned by _get_step_header()
+        data (bytes): complete lines of consecutive ionic steps
+
+    Returns:
+        list: dictionaries with the quantities of each ionic step
+    """
+    record_keys = {
+        "energy": "energies",
+        "energy_sigma_0": "energies_zero",
+        "forces": "forces",
+        "positions": "positions",
+        "cell": "cells",
+        "stress": "stresses",
+        "temperature": "temperatures",
+        "magnetization": "magnetization",
+    }
+    outcar = Outcar()
+    outcar._parse_lines(
+        filename=None,
+        lines=_TriggerLines(header + _split_lines(bytes(data).decode(errors="ignore"))),
+        fields=list(record_keys.values()),
+    )
+    return [
+        {
+            record_key: (
+                outcar.parse_dict[key][step]
+                if step < len(outcar.parse_dict[key])
+                else None
+            )
+            for record_key, key in record_keys.items()
+        }
+        for step in range(len(outcar.parse_dict["energies"]))
+    ]
+
+
+def _is_same_outcar(f, state):
+    """
+    Check whether a followed OUTCAR file is still the one which was parsed before, rather than a replaced or
+    truncated one.
+
+    Args:
+        f (file): OUTCAR file opened in binary mode
+        state (dict): state of Outcar.follow()
+
+    Returns:
+        bool: True if the file can be parsed further from the stored offset
+    """
+    if os.path.abspath(f.name) != state["filename"]:
+        return False
+    if os.fstat(f.fileno()).st_size < state["offset"]:
+        return False
+    if state["head"] is not None:
+        f.seek(0)
+        return f.read(len(state["head"])) == state["head"]
+    return True
+
+
+def _merge_outcar_parse_dicts(parse_dicts):
+    """
+    Combine the quantities parsed from consecutive parts of an OUTCAR file according to OUTCAR_STEP_QUANTITIES.
+
+    Args:
+        parse_dicts (list): quantities parsed from each part, in the order of the parts
+
+    Returns:
+        dict: combined quantities
+    """
+    parse_dict = dict()
+    for key in itertools.chain.from_iterable(parse_dicts):
+        if key in parse_dict.keys():
+            continue
+        values = [d[key] for d in parse_dicts if key in d.keys()]
+        quantity = OUTCAR_STEP_QUANTITIES.get(key)
+        if quantity == "step":
+            parse_dict[key] = values[-1]
+        elif quantity in ["array", "band"]:
+            if any(value is None for value in values):
+                parse_dict[key] = None
+                continue
+            axis = 1 if quantity == "band" else 0
+            arrays = [value for value in values if np.size(value) > 0]
+            if len(arrays) == 0:
+                parse_dict[key] = values[0]
+            elif len(arrays) == 1:
+                parse_dict[key] = arrays[0]
+            else:
+                parse_dict[key] = np.concatenate(arrays, axis=axis)
+        elif quantity == "list":
+            parse_dict[key] = list(itertools.chain.from_iterable(values))
+        elif isinstance(values[-1], dict):
+            parse_dict[key] = {
+                k: next(
+                    (value[k] for value in values[::-1] if value.get(k) is not None),
+                    None,
+                )
+                for k in values[-1].keys()
+            }
+        else:
+            parse_dict[key] = next(
+                (value for value in values[::-1] if value is not None), None
+            )
+    return parse_dict
+
+
+def _update_outcar_steps(parse_dict, n_steps, nblock, potim):
+    """
+    Recalculate the step quantities for the total number of ionic steps of an OUTCAR file parsed in parts.
+
+    Args:
+        parse_dict (dict): parsed quantities, which are updated
+        n_steps (int): total number of ionic steps
+        nblock (int): number of MD steps between two ionic steps written to the OUTCAR file
+        potim (float): time step in fs
+    """
+    steps = np.arange(0, n_steps * nblock, nblock)
+    if "steps" in parse_dict.keys():
+        parse_dict["steps"] = steps
+    if "time" in parse_dict.keys():
+        parse_dict["time"] = potim * steps
+
+
+class _ArrayBuffer(object):
+    """
+    Array which grows along its first axis with an amortized constant cost per appended element, by reserving
+    additional capacity whenever it is exceeded.
+    """
+
+    def __init__(self):
+        self._data = None
+        self._length = 0
+
+    @property
+    def array(self):
+        """
+        numpy.ndarray: view of the elements appended so far
+        """
+        return self._data[: self._length]
+
+    def extend(self, values):
+        """
+        Append elements to the array.
+
+        Args:
+            values (numpy.ndarray): elements to append along the first axis
+        """
+        values = np.asarray(values)
+        if self._data is None or self._length == 0:
+            self._data = np.array(values)
+            self._length = len(values)
+            return
+        if len(values) == 0:
+            return
+        if values.shape[1:] != self._data.shape[1:]:
+            self._data = np.concatenate([self.array, values])
+            self._length = len(self._data)
+            return
+        if self._length + len(values) > len(self._data):
+            data = np.empty(
+                (max(2 * len(self._data), self._length + len(values)),)
+                + self._data.shape[1:],
+                dtype=np.result_type(self._data, values),
+            )
+            data[: self._length] = self.array
+            self._data = data
+        self._data[self._length : self._length + len(values)] = values
+        self._length += len(values)
+
+
+class _LazyParseDict(MutableMapping):
+    """
+    parse_dict of Outcar.from_file(lazy=True), which runs the extractors for a key only when it is accessed for the
+    first time and stores the result. All keys are listed from the start, keys which are not provided by the file
+    raise a KeyError like in a dict.
+
+    Args:
+        outcar (Outcar): Outcar instance running the extractors
+        filename (str): Filename of the OUTCAR file to parse
+        lines (_TriggerLines/_MappedLines): lines of the OUTCAR file
+        fields (list/None): parse_dict keys to provide, all keys if None
+    """
+
+    _pending = object()
+
+    def __init__(self, outcar, filename, lines, fields=None):
+        self._outcar = outcar
+        self._filename = filename
+        self._lines = lines
+        self._data = {
+            key: self._pending
+            for name in _get_outcar_extractors(fields=fields)
+            for key in OUTCAR_EXTRACTORS[name][1]
+            if fields is None or key in fields
+        }
+        self._quantities = dict()
+        self._n_pending = len(self._data)
+
+    def __getitem__(self, key):
+        if self._data[key] is self._pending:
+            self._parse(key=key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        if self._data.get(key, None) is self._pending:
+            self._n_pending -= 1
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        if self._data[key] is self._pending:
+            self._n_pending -= 1
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def _parse(self, key):
+        """
+        Run the extractor providing a key and the extractors it depends on, unless they were run before.
+
+        Args:
+            key (str): parse_dict key
+        """
+        for name in _get_outcar_extractors(fields=[key]):
+            if name not in self._quantities.keys():
+                self._quantities[name] = self._outcar._run_extractor(
+                    name=name,
+                    filename=self._filename,
+                    lines=self._lines,
+                    quantities=dict(
+                        itertools.chain.from_iterable(
+                            quantities.items()
+                            for quantities in self._quantities.values()
+                        )
+                    ),
+                )
+                for provided_key, value in self._quantities[name].items():
+                    if self._data.get(provided_key, None) is self._pending:
+                        self[provided_key] = value
+        if self._n_pending == 0:
+            # all quantities are parsed, so the file is not needed any longer
+            if isinstance(self._lines, _MappedLines):
+                self._lines.close()
+            self._lines = None
+            self._quantities = dict()
+
+
+def _get_trigger(trigger, filename=None, lines=None, return_lines=True):
+    """
+    Find the lines where a specific trigger appears.
+
+    Args:
+        trigger (str): string pattern to search for
+        lines (list/None): list of lines
+        filename (str/None): file to read lines from
+
+    Returns:
+        list: indicies of the lines where the trigger string was found and list of lines
+    """
+    lines = _get_lines_from_file(filename=filename, lines=lines)
+    trigger_indicies = list(lines.get_trigger_indices(trigger))
+    if return_lines:
+        return trigger_indicies, lines
+    else:
+        return trigger_indicies
+
+
+def _get_triggers(triggers, filename=None, lines=None):
+    """
+    Find the lines where any of the given triggers appear, searching for all of them in a single pass.
+
+    Args:
+        triggers (list): string patterns to search for
+        lines (list/None): list of lines
+        filename (str/None): file to read lines from
+
+    Returns:
+        dict: indices of the lines where each trigger string was found and list of lines
+    """
+    lines = _get_lines_from_file(filename=filename, lines=lines)
+    lines.scan(triggers=triggers)
+    return {
+        trigger: list(lines.get_trigger_indices(trigger)) for trigger in triggers
+    }, lines
+
+
+def _scan_triggers(lines, triggers, chunk_size=100000):
+    """
+    Find the lines where the triggers appear in a single pass over the lines. The lines are joined in chunks and
+    searched with one compiled pattern for all triggers, only the lines with a match are checked for the individual
+    triggers. As in a line by line search a trigger has to be contained in the stripped line.
+
+    Args:
+        lines (list): list of lines
+        triggers (list): string patterns to search for
+        chunk_size (int): number of lines joined for a single search
+
+    Returns:
+        dict: indices of the lines where each trigger string was found
+    """
+    trigger_dict = {trigger: [] for trigger in triggers}
+    if len(trigger_dict) == 0:
+        return trigger_dict
+    search = re.compile("|".join(re.escape(trigger) for trigger in trigger_dict)).search
+    for start in range(0, len(lines), chunk_size):
+        chunk = lines[start : start + chunk_size]
+        offsets = list(itertools.accumulate(map(len, chunk), initial=0))
+        text = "".join(chunk)
+        match = search(text)
+        while match is not None:
+            i = bisect.bisect_right(offsets, match.start()) - 1
+            line = chunk[i].strip()
+            for trigger, indices in trigger_dict.items():
+                if trigger in line:
+                    indices.append(start + i)
+            match = search(text, offsets[i + 1])
+    return trigger_dict
+
+
+class _TriggerLines(list):
+    """
+    List of the lines of an OUTCAR file, which stores the indices of the lines where trigger strings appear. The
+    triggers passed on construction are located in a single pass over the lines, any other trigger is searched for
+    the first time it is requested.
+
+    Args:
+        lines (list): list of lines
+        triggers (list/tuple): string patterns to search for
+    """
+
+    def __init__(self, lines=(), triggers=()):
+        super(_TriggerLines, self).__init__(lines)
+        self._trigger_dict = dict()
+        self.scan(triggers=triggers)
+
+    def scan(self, triggers):
+        """
+        Search for all triggers which have not been searched for before, in a single pass over the lines.
+
+        Args:
+            triggers (list/tuple): string patterns to search for
+        """
+        missing = [trigger for trigger in triggers if trigger not in self._trigger_dict]
+        if len(missing) > 0:
+            self._trigger_dict.update(_scan_triggers(lines=self, triggers=missing))
+
+    def get_trigger_indices(self, trigger):
+        """
+        Args:
+            trigger (str): string pattern to search for
+
+        Returns:
+            list: indices of the lines where the trigger string was found
+        """
+        self.scan(triggers=[trigger])
+        return self._trigger_dict[trigger]
+
+
+class _MappedLines(object):
+    """
+    Read-only sequence of the lines of an OUTCAR file, which maps the file into memory rather than reading it. Only the
+    byte offset of every checkpoint_interval-th line is stored, the triggers are searched for in the raw bytes and a
+    line is decoded only when it is accessed. Like _TriggerLines it stores the indices of the lines where trigger
+    strings appear. Pages of the file which have been searched are released from the resident memory again.
+
+    Args:
+        filename (str): file to map into memory
+        triggers (list/tuple): string patterns to search for
+        checkpoint_interval (int): number of lines between two stored line offsets
+        use_index (bool): load the line offsets and trigger indices from the sidecar index file of the file, if it is
+                          up to date, rather than searching the file (see _load_trigger_index())
+    """
+
+    def __init__(self, filename, triggers=(), checkpoint_interval=16, use_index=False):
+        with open(filename, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size > 0:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self._buffer = b""
+        self._filename = filename
+        self._size = len(self._buffer)
+        self._mtime_ns = stat.st_mtime_ns
+        self._trigger_dict = dict()
+        index = None
+        if use_index and self._size == stat.st_size:
+            index = _load_trigger_index(
+                filename=filename, size=self._size, mtime_ns=self._mtime_ns
+            )
+        if index is not None:
+            self._interval = index["checkpoint_interval"]
+            self._checkpoints = index["checkpoints"]
+            self._n_lines = index["n_lines"]
+            self._trigger_dict.update(index["triggers"])
+        else:
+            self._interval = checkpoint_interval
+            self._checkpoints, self._n_lines = self._index_lines()
+        # the last line which was accessed and its offset, to walk forward from it
+        self._last = (0, 0)
+        self.scan(triggers=triggers)
+        if use_index and index is None:
+            self.save_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self._n_lines
+
+    def __iter__(self, chunk_size=10000):
+        for start in range(0, self._n_lines, chunk_size):
+            yield from self[start : start + chunk_size]
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self._n_lines)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            elif start >= stop:
+                return []
+            start_offset = self._line_start(start)
+            return _split_lines(
+                self._buffer[
+                    start_offset : self._line_end(self._line_start(stop - 1))
+                ].decode(errors="ignore")
+            )
+        item = operator.index(item)
+        if item < 0:
+            item += self._n_lines
+        if not 0 <= item < self._n_lines:
+            raise IndexError("line index out of range")
+        start_offset = self._line_start(item)
+        return self._buffer[start_offset : self._line_end(start_offset)].decode(
+            errors="ignore"
+        )
+
+    def close(self):
+        """
+        Unmap the file.
+        """
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def save_index(self):
+        """
+        Store the line offsets and the trigger indices found so far in the sidecar index file of the mapped file.
+        """
+        _save_trigger_index(
+            filename=self._filename,
+            size=self._size,
+            mtime_ns=self._mtime_ns,
+            checkpoint_interval=self._interval,
+            checkpoints=self._checkpoints,
+            n_lines=self._n_lines,
+            trigger_dict=self._trigger_dict,
+        )
+
+    def scan(self, triggers):
+        """
+        Search for all triggers which have not been searched for before, in a single pass over the mapped file.
+
+        Args:
+            triggers (list/tuple): string patterns to search for
+        """
+        trigger_dict = {
+            trigger: []
+            for trigger in triggers
+            if trigger not in self._trigger_dict.keys()
+        }
+        if len(trigger_dict) == 0:
+            return
+        search = re.compile(
+            b"|".join(re.escape(trigger.encode()) for trigger in trigger_dict)
+        ).search
+        released = 0
+        match = search(self._buffer)
+        while match is not None:
+            start_offset = self._buffer.rfind(b"\n", 0, match.start()) + 1
+            end_offset = self._line_end(start_offset)
+            line_index = self._line_index(start_offset)
+            line = self._buffer[start_offset:end_offset].decode(errors="ignore")
+            line = line.strip()
+            for trigger, indices in trigger_dict.items():
+                if trigger in line:
+                    indices.append(line_index)
+            if start_offset - released > 2**24:
+                released = self._release(start=released, end=start_offset)
+            match = search(self._buffer, end_offset)
+        self._release(start=released, end=self._size)
+        self._trigger_dict.update(trigger_dict)
+
+    def get_trigger_indices(self, trigger):
+        """
+        Args:
+            trigger (str): string pattern to search for
+
+        Returns:
+            list: indices of the lines where the trigger string was found
+        """
+        self.scan(triggers=[trigger])
+        return self._trigger_dict[trigger]
+
+    def _index_lines(self, chunk_size=2**24):
+        """
+        Store the offset of every checkpoint_interval-th line and count the lines.
+
+        Args:
+            chunk_size (int): number of bytes searched for line breaks at once
+
+        Returns:
+            numpy.ndarray, int: offsets of the checkpoint lines and the number of lines
+        """
+        checkpoints = [np.zeros(1, dtype=np.int64)]
+        n_line_breaks = 0
+        for start in range(0, self._size, chunk_size):
+            chunk = np.frombuffer(
+                self._buffer[start : start + chunk_size], dtype=np.uint8
+            )
+            line_starts = np.flatnonzero(chunk == ord("\n")) + start + 1
+            first = -(n_line_breaks + 1) % self._interval
+            checkpoints.append(line_starts[first :: self._interval])
+            n_line_breaks += len(line_starts)
+            self._release(start=start, end=start + len(chunk))
+        checkpoints = np.concatenate(checkpoints)
+        # a line break at the end of the file does not start another line
+        if checkpoints[-1] >= self._size > 0:
+            checkpoints = checkpoints[:-1]
+        if self._size > 0 and self._buffer[-1:] != b"\n":
+            return checkpoints, n_line_breaks + 1
+        return checkpoints, n_line_breaks
+
+    def _line_index(self, offset):
+        """
+        Args:
+            offset (int): offset of the start of a line
+
+        Returns:
+            int: index of the line
+        """
+        checkpoint = int(np.searchsorted(self._checkpoints, offset, side="right")) - 1
+        line_index = checkpoint * self._interval + self._buffer[
+            self._checkpoints[checkpoint] : offset
+        ].count(b"\n")
+        self._last = (line_index, offset)
+        return line_index
+
+    def _line_start(self, line_index):
+        """
+        Args:
+            line_index (int): index of the line
+
+        Returns:
+            int: offset of the start of the line
+        """
+        checkpoint = line_index - line_index % self._interval
+        last_index, offset = self._last
+        if not checkpoint <= last_index <= line_index:
+            last_index = checkpoint
+            offset = int(self._checkpoints[line_index // self._interval])
+        for _ in range(line_index - last_index):
+            offset = self._buffer.find(b"\n", offset) + 1
+        self._last = (line_index, offset)
+        return offset
+
+    def _line_end(self, offset):
+        """
+        Args:
+            offset (int): offset of the start of a line
+
+        Returns:
+            int: offset after the line break which ends the line
+        """
+        end_offset = self._buffer.find(b"\n", offset)
+        if end_offset == -1:
+            return self._size
+        return end_offset + 1
+
+    def _release(self, start, end):
+        """
+        Release the pages of the mapped file between start and end from the resident memory, they are read from the
+        file again when they are accessed.
+
+        Args:
+            start (int): offset from which on pages are released
+            end (int): offset up to which pages are released
+
+        Returns:
+            int: offset up to which pages were released
+        """
+        start -= start % mmap.PAGESIZE
+        end -= end % mmap.PAGESIZE
+        if end > start and hasattr(self._buffer, "madvise"):
+            if hasattr(mmap, "MADV_DONTNEED"):
+                self._buffer.madvise(mmap.MADV_DONTNEED, start, end - start)
+        return end
+
+
+def _get_index_filename(filename):
+    """
+    Args:
+        filename (str): Filename of the OUTCAR file
+
+    Returns:
+        str: Filename of the sidecar index file of the OUTCAR file
+    """
+    return filename + ".vpidx"
+
+
+def _load_trigger_index(filename, size, mtime_ns):
+    """
+    Load the sidecar index file of an OUTCAR file with the line offsets and the indices of the trigger lines.
+
+    Args:
+        filename (str): Filename of the OUTCAR file
+        size (int): size of the OUTCAR file in bytes
+        mtime_ns (int): modification time of the OUTCAR file in nanoseconds
+
+    Returns:
+        dict/None: the index, None if there is no index file or if it is outdated or unreadable
+    """
+    index_filename = _get_index_filename(filename)
+    if not os.path.exists(index_filename):
+        return None
+    try:
+        with np.load(index_filename, allow_pickle=False) as index:
+            if (
+                int(index["version"]) != _TRIGGER_INDEX_VERSION
+                or int(index["size"]) != size
+                or int(index["mtime_ns"]) != mtime_ns
+            ):
+                return None
+            trigger_indices = np.split(
+                index["trigger_indices"], np.cumsum(index["trigger_counts"])[:-1]
+            )
+            return {
+                "checkpoint_interval": int(index["checkpoint_interval"]),
+                "checkpoints": index["checkpoints"],
+                "n_lines": int(index["n_lines"]),
+                "triggers": {
+                    str(trigger): indices.tolist()
+                    for trigger, indices in zip(index["triggers"], trigger_indices)
+                },
+            }
+    except (OSError, ValueError, KeyError):
+        warnings.warn("Unable to read the index file {}".format(index_filename))
+        return None
+
+
+def _save_trigger_index(
+    filename, size, mtime_ns, checkpoint_interval, checkpoints, n_lines, trigger_dict
+):
+    """
+    Store the line offsets and the indices of the trigger lines of an OUTCAR file in its sidecar index file. The
+    index is keyed on the size and the modification time of the OUTCAR file, so it is rebuilt once the file changes.
+    Nothing is stored if the directory is not writable.
+
+    Args:
+        filename (str): Filename of the OUTCAR file
+        size (int): size of the OUTCAR file in bytes
+        mtime_ns (int): modification time of the OUTCAR file in nanoseconds
+        checkpoint_interval (int): number of lines between two stored line offsets
+        checkpoints (numpy.ndarray): offsets of every checkpoint_interval-th line
+        n_lines (int): number of lines of the OUTCAR file
+        trigger_dict (dict): indices of the lines where each trigger string was found
+    """
+    index_filename = _get_index_filename(filename)
+    tmp_filename = "{}.{}.tmp".format(index_filename, os.getpid())
+    triggers = list(trigger_dict.keys())
+    try:
+        with open(tmp_filename, "wb") as f:
+            np.savez(
+                f,
+                version=_TRIGGER_INDEX_VERSION,
+                size=size,
+                mtime_ns=mtime_ns,
+                checkpoint_interval=checkpoint_interval,
+                checkpoints=checkpoints,
+                n_lines=n_lines,
+                triggers=np.array(triggers, dtype=str),
+                trigger_counts=np.array(
+                    [len(trigger_dict[trigger]) for trigger in triggers], dtype=np.int64
+                ),
+                trigger_indices=np.array(
+                    list(
+                        itertools.chain.from_iterable(
+                            trigger_dict[trigger] for trigger in triggers
+                        )
+                    ),
+                    dtype=np.int64,
+                ),
+            )
+        os.replace(tmp_filename, index_filename)
+    except OSError:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def _split_indices(ind_ionic_lst, ind_elec_lst):
+    """
+    Combine ionic pattern matches and electronic pattern matches
+
+    Args:
+        ind_ionic_lst (list): indices of lines which matched the iconic pattern
+        ind_elec_lst (list): indices of lines which matched the electronic pattern
+
+    Returns:
+        list: nested list of electronic pattern matches within an ionic pattern match
+    """
+    ind_elec_array = np.array(ind_elec_lst, dtype=int)
+    if len(ind_ionic_lst) == 0:
+        return []
+    # both lists are sorted, so the electronic matches of each ionic step are found by a binary search
+    ind_split = np.searchsorted(ind_elec_array, ind_ionic_lst)
+    return np.split(ind_elec_array[: ind_split[-1]], ind_split[:-1])
+
+
+def _parse_energy_components(lines, trigger_indices, max_rows_per_batch=100000):
+    """
+    Decode the energy components following the "Free energy of the ion-electron system" lines of all electronic
+    steps with one numerical conversion per batch of electronic steps. The layout of the table, which ends with a
+    dashed line, is taken from the first electronic step.
+
+    Args:
+        lines (list): lines read from the file
+        trigger_indices (list/numpy.ndarray): line indices of the "Free energy of the ion-electron system" lines
+        max_rows_per_batch (int): maximum number of lines which are joined and converted at once
+
+    Returns:
+        list: names of the energy components, None if the tables could not be parsed
+        numpy.ndarray/None: energy components of shape (number of electronic steps, number of components)
+    """
+    if len(trigger_indices) == 0:
+        return None, None
+    names = list()
+    n_rows = 0
+    while trigger_indices[0] + 2 + n_rows < len(lines):
+        line = lines[trigger_indices[0] + 2 + n_rows]
+        if "=" not in line:
+            break
+        if "PAW double counting" in line:
+            names += ["PAWPS", "PAWAE"]
+        else:
+            names.append(line.split("=")[0].split()[-1])
+        n_rows += 1
+    if n_rows == 0:
+        return None, None
+    components = np.empty((len(trigger_indices), len(names)))
+    steps_per_batch = max(max_rows_per_batch // n_rows, 1)
+    for start in range(0, len(trigger_indices), steps_per_batch):
+        batch_indices = trigger_indices[start : start + steps_per_batch]
+        # only the part of each line behind the label is joined
+        text = " ".join(
+            line.partition("=")[2]
+            for line in itertools.chain.from_iterable(
+                lines[i + 2 : i + 2 + n_rows] for i in batch_indices
+            )
+        )
+        values = _clean_line(text).split()
+        if len(values) != len(batch_indices) * len(names):
+            return None, None
+        try:
+            components[start : start + len(batch_indices)] = np.array(
+                values, dtype=float
+            ).reshape(len(batch_indices), len(names))
+        except ValueError:
+            return None, None
+    return names, components
 
 
 def _get_lines_from_file(filename, lines=None):
@@ -1243,9 +3088,11 @@ def _get_lines_from_file(filename, lines=None):
         lines (list/ None): list of lines
 
     Returns:
-        list: list of lines
+        _TriggerLines: list of lines
     """
     if lines is None:
-        with open(filename, "r", errors="ignore") as f:
+        with open_file(filename, "r", errors="ignore") as f:
             lines = f.readlines()
+    if not isinstance(lines, (_TriggerLines, _MappedLines)):
+        lines = _TriggerLines(lines)
     return lines
@@ -7,6 +7,7 @@ from collections import OrderedDict
 import numpy as np
 
 from vaspparser.dft.waves.electronic import ElectronicStructure
+from vaspparser.vasp.compression import open_file
 
 __author__ = "Sudarsan Surendralal"
 __copyright__ = (
@@ -30,7 +31,7 @@ class Procar(object):
         self.dos_dict = OrderedDict()
 
     def from_file(self, filename):
-        with open(filename, "r", errors="ignore") as f:
+        with open_file(filename, "r", errors="ignore") as f:
             es_obj = ElectronicStructure()
             lines = f.readlines()
             details_trigger = "# of k-points:"
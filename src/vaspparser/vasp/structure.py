@@ -11,6 +11,8 @@ import numpy as np
 from ase.atoms import Atoms
 from ase.constraints import FixCartesian
 
+from vaspparser.vasp.compression import open_file
+
 __author__ = "Sudarsan Surendralal"
 __copyright__ = (
     "Copyright 2021, Max-Planck-Institut für Eisenforschung GmbH - "
@@ -49,7 +51,7 @@ def read_atoms(
         if len(species_list) == 0:
             warnings.warn("Warning! Unable to read species information from POTCAR")
     file_string = list()
-    with open(filename) as f:
+    with open_file(filename) as f:
         for line in f:
             line = line.strip()
             file_string.append(line)
@@ -2,18 +2,26 @@
 # Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
 # Distributed under the terms of "New BSD License", see the LICENSE file.
 
+import io
 import os
 import re
 import warnings
 from collections import OrderedDict
 
-import defusedxml.cElementTree as ETree
 import numpy as np
 from ase.atoms import Atoms
 from ase.constraints import FixCartesian
 from defusedxml.ElementTree import ParseError
 
 from vaspparser.dft.waves.electronic import ElectronicStructure
+from vaspparser.vasp.compression import open_file
+from vaspparser.vasp.vasprun_index import (
+    INDEXED_SECTIONS,
+    get_vasprun_index,
+    read_calculation,
+    read_vasprun_index,
+)
+from vaspparser.vasp.xml_backend import iterparse
 
 __author__ = "Sudarsan Surendralal"
 __copyright__ = (
@@ -26,6 +34,43 @@ __email__ = "surendralal@mpie.de"
 __status__ = "production"
 __date__ = "Sep 1, 2017"
 
+# keys of the records yielded by Vasprun.iter_calculations() and the corresponding keys of the vasprun_dict
+_CALCULATION_RECORD_KEYS = {
+    "total_energy": "total_energies",
+    "total_fr_energy": "total_fr_energies",
+    "total_0_energy": "total_0_energies",
+    "kinetic_energy": "kinetic_energies",
+    "scf_energies": "scf_energies",
+    "scf_fr_energies": "scf_fr_energies",
+    "scf_0_energies": "scf_0_energies",
+    "scf_dipole_moments": "scf_dipole_moments",
+    "forces": "forces",
+    "stress": "stress_tensors",
+    "positions": "positions",
+    "cell": "cells",
+}
+
+# keys of the eigenvalues and occupancies of all ionic steps, see Vasprun.from_file(eigenvalue_history=True)
+_EIGENVALUE_HISTORY_KEYS = [
+    "eigenvalue_history_steps",
+    "grand_eigenvalue_history",
+    "grand_occupancy_history",
+]
+
+# sections of the vasprun.xml file which can be skipped by Vasprun.from_file(), they are named after their xml tags
+VASPRUN_OPTIONAL_SECTIONS = [
+    "generator",
+    "incar",
+    "kpoints",
+    "parameters",
+    "scstep",
+    "eigenvalues",
+    "dos",
+    "total",
+    "partial",
+    "projected",
+]
+
 
 class Vasprun(object):
     """
@@ -41,31 +86,94 @@ class Vasprun(object):
                 'cell' (numpy.ndarray): Mx3x3 array containing all the size and shape of cells at every iteration point
                 'forces' (numpy.ndarray): MxNx3 array containing all the forces in eV/A
                 'total_energies' (numpy.ndarray): 1xM array containing all the total energies in eV
+
+        is_truncated (bool): True if the vasprun.xml file parsed with allow_truncated=True ends in the middle, the
+                             vasprun_dict then contains the ionic steps completed before the end
+        resume_offset (int/None): Byte offset behind the last complete ionic step, from which update_from_file()
+                                  continues to parse
     """
 
     def __init__(self):
         self.vasprun_dict = dict()
-
-    def from_file(self, filename="vasprun.xml"):
+        self._projected_dos_dtype = np.float64
+        self._xml_backend = None
+        self._skipped_sections = list()
+        self._eigenvalue_history = False
+        self._eigenvalue_history_dtype = np.float64
+        self.is_truncated = False
+        self.resume_offset = None
+
+    def from_file(
+        self,
+        filename="vasprun.xml",
+        include=None,
+        exclude=None,
+        projected_dos_dtype=np.float64,
+        xml_backend=None,
+        allow_truncated=False,
+        eigenvalue_history=False,
+        eigenvalue_history_dtype=np.float64,
+    ):
         """
         Parsing vasprun.xml from the working directory
 
         Args:
             filename (str): Path to the vasprun file
+            include (list/None): Optional sections (see VASPRUN_OPTIONAL_SECTIONS) to parse, all of them if None
+            exclude (list/None): Optional sections to skip, e.g. ["projected", "partial"] if the (partial) projected
+                                 density of states is not needed. Skipped sections are not converted and their keys are
+                                 absent from vasprun_dict.
+            projected_dos_dtype (type): dtype of the grand_dos_matrix, e.g. np.float32 to halve its memory
+            xml_backend (str/None): The xml parser (see vaspparser.vasp.xml_backend.XML_BACKENDS), lxml if it is
+                                    installed and defusedxml otherwise if None
+            allow_truncated (bool): Parse the file of a running or killed job, which ends in the middle. The ionic
+                                    steps completed before the end are kept and is_truncated is set, the following
+                                    ones can be added with update_from_file(). Raises VasprunError if not even the
+                                    first ionic step is complete.
+            eigenvalue_history (bool): Keep the eigenvalues and occupancies of all ionic steps which contain them in
+                                       the arrays grand_eigenvalue_history and grand_occupancy_history (steps x spin x
+                                       k-points x bands), eigenvalue_history_steps are the indices of these ionic
+                                       steps. Otherwise only the eigenvalues of the last of them are decoded.
+            eigenvalue_history_dtype (type): dtype of the eigenvalue and occupancy history, e.g. np.float32
         """
         if not (os.path.isfile(filename)):
             raise AssertionError()
+        self._projected_dos_dtype = projected_dos_dtype
+        self._xml_backend = xml_backend
+        self._eigenvalue_history = eigenvalue_history
+        self._eigenvalue_history_dtype = eigenvalue_history_dtype
+        self.is_truncated = False
+        self.resume_offset = None
+        skipped_sections = _get_skipped_sections(include=include, exclude=exclude)
         try:
-            self.parse_root_to_dict(filename)
-        except ParseError:
+            self.parse_root_to_dict(
+                filename,
+                skipped_sections=skipped_sections,
+                allow_truncated=allow_truncated,
+            )
+        except (ParseError, EOFError):
             raise VasprunError(
                 "The vasprun.xml file is either corrupted or the simulation has failed"
             )
+        if self.is_truncated and self.resume_offset is None:
+            raise VasprunError(
+                "The vasprun.xml file is truncated before the end of the first ionic step"
+            )
 
-    def parse_root_to_dict(self, filename):
+    def parse_root_to_dict(
+        self, filename, skipped_sections=None, allow_truncated=False
+    ):
         """
         Parses from the main xml root.
+
+        Args:
+            filename (str): Path to the vasprun file
+            skipped_sections (list/None): Tags of the sections which are removed without parsing them
+            allow_truncated (bool): Keep the ionic steps completed before the end of a truncated file instead of raising
         """
+        if skipped_sections is None:
+            skipped_sections = list()
+        self._skipped_sections = skipped_sections
         d = self.vasprun_dict
         d["scf_energies"] = list()
         d["scf_fr_energies"] = list()
@@ -79,50 +187,440 @@ class Vasprun(object):
         d["total_0_energies"] = list()
         d["kinetic_energies"] = list()
         d["stress_tensors"] = list()
-        for _, leaf in ETree.iterparse(filename):
-            if leaf.tag in ["generator", "incar"]:
-                d[leaf.tag] = dict()
-                for items in leaf:
-                    d[leaf.tag] = self.parse_item_to_dict(items, d[leaf.tag])
-            if leaf.tag in ["kpoints"]:
-                d[leaf.tag] = dict()
-                self.parse_kpoints_to_dict(leaf, d[leaf.tag])
-            if leaf.tag in ["atominfo"]:
-                d[leaf.tag] = dict()
-                self.parse_atom_information_to_dict(leaf, d[leaf.tag])
-            if leaf.tag in ["structure"] and "name" in leaf.keys():
-                if "initialpos" in leaf.attrib["name"]:
-                    d["init_structure"] = dict()
-                    self.parse_structure_to_dict(leaf, d["init_structure"])
-                elif "finalpos" in leaf.attrib["name"]:
-                    d["final_structure"] = dict()
-                    self.parse_structure_to_dict(leaf, d["final_structure"])
-            if leaf.tag in ["calculation"]:
-                self.parse_calc_to_dict(leaf, d)
-            if leaf.tag in ["parameters"]:
-                pass
-                self.parse_parameters(leaf, d)
-        d["cells"] = np.array(d["cells"])
-        d["positions"] = np.array(d["positions"])
-        # Check if the parsed coordinates are in absolute/relative coordinates. If absolute, convert to relative
-        total_positions = d["positions"].flatten()
-        if len(np.argwhere(total_positions > 1)) / len(total_positions) > 0.2:
-            pos_new = d["positions"].copy()
-            for i, pos in enumerate(pos_new):
-                d["positions"][i] = np.dot(pos, np.linalg.inv(d["cells"][i]))
-        d["forces"] = np.array(d["forces"])
-        d["total_energies"] = np.array(d["total_energies"])
-        d["total_fr_energies"] = np.array(d["total_fr_energies"])
-        d["total_0_energies"] = np.array(d["total_0_energies"])
-        if len(d["kinetic_energies"]) > 0:
-            d["kinetic_energies"] = np.array(d["kinetic_energies"])
+        n_eigenvalue_steps = 1
+        if self._eigenvalue_history:
+            d["eigenvalue_history_steps"] = list()
+            # the history is preallocated if an index of the file is available, otherwise it grows geometrically
+            index = read_vasprun_index(filename)
+            if index is not None:
+                n_eigenvalue_steps = sum(
+                    "eigenvalues" in calculation
+                    for calculation in index["calculations"]
+                )
+        with open_file(filename, "rb") as f:
+            self._parse_calculations_to_dict(
+                _CalculationEndReader(f),
+                d,
+                allow_truncated=allow_truncated,
+                n_eigenvalue_steps=n_eigenvalue_steps,
+            )
+        _convert_calculations(d, skipped_sections=skipped_sections)
+
+    def update_from_file(self, filename="vasprun.xml"):
+        """
+        Parses the ionic steps which were appended to the vasprun.xml file of a running job since it was parsed with
+        from_file(allow_truncated=True) or the last update. Only the part of the file behind the last complete ionic
+        step (at the byte offset resume_offset) is read, the new ionic steps are appended to the vasprun_dict.
+
+        Args:
+            filename (str): Path to the vasprun file
+
+        Returns:
+            int: The number of new ionic steps
+        """
+        if not (os.path.isfile(filename)):
+            raise AssertionError()
+        if not self.is_truncated:
+            return 0
+        d = self.vasprun_dict
+        d_new = {
+            key: value
+            for key, value in d.items()
+            if key not in _CALCULATION_RECORD_KEYS.values()
+            and key not in _EIGENVALUE_HISTORY_KEYS
+        }
+        for key in _CALCULATION_RECORD_KEYS.values():
+            d_new[key] = list()
+        if self._eigenvalue_history:
+            d_new["eigenvalue_history_steps"] = list()
+        try:
+            with open_file(filename, "rb") as f:
+                # the parser continues in the root element of the file
+                prolog = _read_prolog(f)
+                f.seek(self.resume_offset)
+                n_calculations = self._parse_calculations_to_dict(
+                    _CalculationEndReader(f, offset=self.resume_offset, prefix=prolog),
+                    d_new,
+                    allow_truncated=True,
+                    first_step=len(d["total_energies"]),
+                )
+        except (ParseError, EOFError):
+            raise VasprunError(
+                "The vasprun.xml file is either corrupted or the simulation has failed"
+            )
+        _convert_calculations(d_new, skipped_sections=self._skipped_sections)
+        for key, value in d_new.items():
+            if (
+                key not in _CALCULATION_RECORD_KEYS.values()
+                and key not in _EIGENVALUE_HISTORY_KEYS
+            ) or key not in d:
+                d[key] = value
+            elif isinstance(value, np.ndarray):
+                if len(value) > 0:
+                    d[key] = np.concatenate([d[key], value])
+            else:
+                d[key] = d[key] + value
+        return n_calculations
+
+    def _parse_calculations_to_dict(
+        self, f, d, allow_truncated=False, n_eigenvalue_steps=1, first_step=0
+    ):
+        """
+        Parses the xml file into a dictionary, the lists of the ionic steps have to be initialized.
+
+        Args:
+            f (_CalculationEndReader): The vasprun file
+            d (dict): The dictionary to which data is to be parsed
+            allow_truncated (bool): Keep the ionic steps completed before the end of a truncated file instead of raising
+            n_eigenvalue_steps (int): Expected number of ionic steps with eigenvalues, to preallocate their history
+            first_step (int): Index of the first ionic step in the file
+
+        Returns:
+            int: The number of ionic steps parsed
+        """
+        skipped_sections = self._skipped_sections
+        # the open elements from the root to the current one, processed subtrees are removed from their parents to
+        # keep the memory proportional to the parsed arrays rather than to the xml file
+        parents = list()
+        # number of k-points of the projected density of states already parsed for each spin set
+        projected_kpoints = dict()
+        # the eigenvalues of the last ionic step which contains them, they are only decoded after the file is parsed
+        eigenvalues_node = None
+        # the ionic step which is currently parsed contains eigenvalues
+        calculation_eigenvalues = False
+        # the dictionary before the ionic step which is currently parsed, to drop its data if the file is truncated
+        snapshot = None
+        n_calculations = 0
+        try:
+            for event, leaf in iterparse(f, backend=self._xml_backend):
+                if event == "start":
+                    if leaf.tag == "calculation":
+                        snapshot = dict(d), eigenvalues_node
+                        calculation_eigenvalues = False
+                    parents.append(leaf)
+                    continue
+                parents.pop()
+                if leaf.tag in skipped_sections and len(parents) > 0:
+                    parents[-1].remove(leaf)
+                    continue
+                if (
+                    leaf.tag in ["eigenvalues", "dos", "projected"]
+                    and len(parents) > 0
+                    and parents[-1].tag == "calculation"
+                ):
+                    if leaf.tag == "eigenvalues" and self._eigenvalue_history:
+                        self._parse_eigenvalue_history_to_dict(
+                            leaf, d, n_steps=n_eigenvalue_steps
+                        )
+                        calculation_eigenvalues = True
+                    elif leaf.tag == "eigenvalues":
+                        # the eigenvalues are overwritten by the following ionic steps
+                        eigenvalues_node = leaf
+                    else:
+                        self.parse_calc_data_to_dict(leaf, d)
+                    parents[-1].remove(leaf)
+                    continue
+                if (
+                    leaf.tag == "set"
+                    and len(parents) > 3
+                    and parents[-3].tag == "array"
+                    and parents[-4].tag == "projected"
+                    and "projected" not in skipped_sections
+                ):
+                    shape = _get_projected_dos_shape(d)
+                    if shape is not None:
+                        # the k-points of the projected density of states are decoded into the preallocated
+                        # grand_dos_matrix as soon as they are complete, the following elements of the same chunk of
+                        # the file may already be in the tree, so the indices are not taken from the tree
+                        i_kpt = projected_kpoints.get(parents[-1], 0)
+                        projected_kpoints[parents[-1]] = i_kpt + 1
+                        self._parse_projected_kpoint_to_dict(
+                            leaf,
+                            d,
+                            i_spin=list(parents[-2]).index(parents[-1]),
+                            i_kpt=i_kpt,
+                            shape=shape,
+                        )
+                        parents[-1].remove(leaf)
+                        continue
+                if leaf.tag in ["generator", "incar"]:
+                    d[leaf.tag] = dict()
+                    for items in leaf:
+                        d[leaf.tag] = self.parse_item_to_dict(items, d[leaf.tag])
+                if leaf.tag in ["kpoints"]:
+                    d[leaf.tag] = dict()
+                    self.parse_kpoints_to_dict(leaf, d[leaf.tag])
+                if leaf.tag in ["atominfo"]:
+                    d[leaf.tag] = dict()
+                    self.parse_atom_information_to_dict(leaf, d[leaf.tag])
+                if leaf.tag in ["structure"] and "name" in leaf.keys():
+                    if "initialpos" in leaf.attrib["name"]:
+                        d["init_structure"] = dict()
+                        self.parse_structure_to_dict(leaf, d["init_structure"])
+                    elif "finalpos" in leaf.attrib["name"]:
+                        d["final_structure"] = dict()
+                        self.parse_structure_to_dict(leaf, d["final_structure"])
+                if leaf.tag in ["calculation"]:
+                    self.parse_calc_to_dict(leaf, d)
+                    if calculation_eigenvalues:
+                        d["eigenvalue_history_steps"].append(
+                            first_step + n_calculations
+                        )
+                    snapshot = None
+                    n_calculations += 1
+                    self.resume_offset = f.calculation_ends[n_calculations - 1]
+                if leaf.tag in ["parameters"]:
+                    pass
+                    self.parse_parameters(leaf, d)
+                if len(parents) == 1:
+                    parents[0].remove(leaf)
+        except (ParseError, EOFError):
+            if not allow_truncated:
+                raise
+            if snapshot is not None:
+                # the data of the incomplete ionic step, e.g. its eigenvalues, is dropped
+                d.clear()
+                d.update(snapshot[0])
+                eigenvalues_node = snapshot[1]
+            self.is_truncated = True
+        else:
+            self.is_truncated = False
+        if eigenvalues_node is not None:
+            self.parse_eigenvalues_to_dict(eigenvalues_node, d)
+        return n_calculations
+
+    def _parse_eigenvalue_history_to_dict(self, node, d, n_steps=1):
+        """
+        Parses the eigenvalues and occupancies of an ionic step into the next row of the preallocated history, the
+        grand_eigenvalue_matrix and grand_occupancy_matrix are those of the last ionic step
+
+        Args:
+            node (xml.etree.Element instance): The eigenvalues node to parse
+            d (dict): The dictionary to which data is to be parsed
+            n_steps (int): Number of ionic steps with eigenvalues, for which the history is allocated
+        """
+        self.parse_eigenvalues_to_dict(node, d)
+        i_step = len(d["eigenvalue_history_steps"])
+        for key, history_key in [
+            ("grand_eigenvalue_matrix", "grand_eigenvalue_history"),
+            ("grand_occupancy_matrix", "grand_occupancy_history"),
+        ]:
+            values = np.asarray(d[key])
+            if history_key not in d:
+                d[history_key] = np.empty(
+                    (max(n_steps, 1),) + values.shape,
+                    dtype=self._eigenvalue_history_dtype,
+                )
+            elif i_step >= len(d[history_key]):
+                # more ionic steps than allocated, the history grows geometrically
+                d[history_key] = np.concatenate(
+                    [d[history_key], np.empty_like(d[history_key])]
+                )
+            d[history_key][i_step] = values
+
+    def iter_calculations(
+        self, filename="vasprun.xml", eigenvalues=False, xml_backend=None
+    ):
+        """
+        Iterate over the ionic steps (<calculation> nodes) of a vasprun.xml file. Every ionic step is removed from the
+        xml tree once it is parsed, so the memory does not grow with the length of the trajectory. The vasprun_dict is
+        not modified.
+
+        Args:
+            filename (str): Path to the vasprun file
+            eigenvalues (bool): Also parse the eigenvalues and occupancies of the ionic steps which contain them
+            xml_backend (str/None): The xml parser (see vaspparser.vasp.xml_backend.XML_BACKENDS), the default if None
+
+        Yields:
+            dict: quantities of one ionic step - "total_energy", "total_fr_energy", "total_0_energy",
+                  "kinetic_energy", "scf_energies", "scf_fr_energies", "scf_0_energies", "scf_dipole_moments",
+                  "forces", "stress", "positions" (relative), "cell" and with eigenvalues=True also "eigenvalues" and
+                  "occupancies" (spin x k-points x bands), None if the quantity is not written for the ionic step
+        """
+        if not (os.path.isfile(filename)):
+            raise AssertionError()
+        try:
+            with open_file(filename, "rb") as f:
+                yield from self._iter_calculation_records(
+                    f, eigenvalues=eigenvalues, xml_backend=xml_backend
+                )
+        except (ParseError, EOFError):
+            raise VasprunError(
+                "The vasprun.xml file is either corrupted or the simulation has failed"
+            )
+
+    def get_calculations(
+        self,
+        steps,
+        filename="vasprun.xml",
+        eigenvalues=False,
+        sidecar=False,
+        xml_backend=None,
+    ):
+        """
+        Parses selected ionic steps of a vasprun.xml file. The byte offsets of the ionic steps are found by a scan of
+        the file (see vaspparser.vasp.vasprun_index), which is much faster than parsing it, then only the selected
+        <calculation> elements are read and parsed - without their density of states and, unless requested, without
+        their eigenvalues. The vasprun_dict is not modified.
+
+        Args:
+            steps (slice/list): Indices of the ionic steps, negative indices count from the last complete one
+            filename (str): Path to the vasprun file
+            eigenvalues (bool): Also parse the eigenvalues and occupancies of the ionic steps which contain them
+            sidecar (bool): Store the index next to the vasprun.xml file and reuse it while the file is unchanged
+            xml_backend (str/None): The xml parser (see vaspparser.vasp.xml_backend.XML_BACKENDS), the default if None
+
+        Returns:
+            list: The quantities of the ionic steps, see iter_calculations()
+        """
+        if not (os.path.isfile(filename)):
+            raise AssertionError()
+        try:
+            index = get_vasprun_index(filename, sidecar=sidecar)
+        except ValueError:
+            raise VasprunError(
+                "The vasprun.xml file is either corrupted or the simulation has failed"
+            )
+        if isinstance(steps, slice):
+            calculations = index["calculations"][steps]
         else:
-            del d["kinetic_energies"]
-        d["scf_energies"] = d["scf_energies"]
-        d["scf_dipole_moments"] = d["scf_dipole_moments"]
-        d["scf_fr_energies"] = d["scf_fr_energies"]
-        d["scf_0_energies"] = d["scf_0_energies"]
-        d["stress_tensors"] = d["stress_tensors"]
+            calculations = [index["calculations"][k] for k in steps]
+        skipped_sections = [
+            tag
+            for tag in INDEXED_SECTIONS
+            if not (eigenvalues and tag == "eigenvalues")
+        ]
+        records = list()
+        try:
+            with open_file(filename, "rb") as f:
+                prolog = f.read(index["prolog"])
+                for calculation in calculations:
+                    fragment = read_calculation(
+                        f, calculation, skipped_sections=skipped_sections
+                    )
+                    records += self._iter_calculation_records(
+                        io.BytesIO(prolog + fragment + b"</modeling>"),
+                        eigenvalues=eigenvalues,
+                        xml_backend=xml_backend,
+                    )
+        except (ParseError, EOFError):
+            raise VasprunError(
+                "The vasprun.xml file is either corrupted or the simulation has failed"
+            )
+        return records
+
+    def get_calculation(
+        self,
+        k,
+        filename="vasprun.xml",
+        eigenvalues=False,
+        sidecar=False,
+        xml_backend=None,
+    ):
+        """
+        Parses a single ionic step of a vasprun.xml file, see get_calculations()
+
+        Args:
+            k (int): Index of the ionic step, negative indices count from the last complete one
+            filename (str): Path to the vasprun file
+            eigenvalues (bool): Also parse the eigenvalues and occupancies if the ionic step contains them
+            sidecar (bool): Store the index next to the vasprun.xml file and reuse it while the file is unchanged
+            xml_backend (str/None): The xml parser (see vaspparser.vasp.xml_backend.XML_BACKENDS), the default if None
+
+        Returns:
+            dict: The quantities of the ionic step, see iter_calculations()
+        """
+        return self.get_calculations(
+            [k],
+            filename=filename,
+            eigenvalues=eigenvalues,
+            sidecar=sidecar,
+            xml_backend=xml_backend,
+        )[0]
+
+    def get_last_calculation(
+        self, filename="vasprun.xml", eigenvalues=False, sidecar=False, xml_backend=None
+    ):
+        """
+        Parses the last complete ionic step of a vasprun.xml file, see get_calculations()
+
+        Args:
+            filename (str): Path to the vasprun file
+            eigenvalues (bool): Also parse the eigenvalues and occupancies if the ionic step contains them
+            sidecar (bool): Store the index next to the vasprun.xml file and reuse it while the file is unchanged
+            xml_backend (str/None): The xml parser (see vaspparser.vasp.xml_backend.XML_BACKENDS), the default if None
+
+        Returns:
+            dict: The quantities of the ionic step, see iter_calculations()
+        """
+        return self.get_calculation(
+            -1,
+            filename=filename,
+            eigenvalues=eigenvalues,
+            sidecar=sidecar,
+            xml_backend=xml_backend,
+        )
+
+    def _iter_calculation_records(self, f, eigenvalues=False, xml_backend=None):
+        """
+        Iterates over the ionic steps of an opened vasprun.xml file, see iter_calculations()
+
+        Args:
+            f (file object): The vasprun file opened in binary mode
+            eigenvalues (bool): Also parse the eigenvalues and occupancies of the ionic steps which contain them
+            xml_backend (str/None): The xml parser, the default if None
+
+        Yields:
+            dict: quantities of one ionic step
+        """
+        parents = list()
+        for event, leaf in iterparse(f, backend=xml_backend):
+            if event == "start":
+                parents.append(leaf)
+                continue
+            parents.pop()
+            if leaf.tag == "calculation":
+                yield self._parse_calc_to_record(leaf, eigenvalues=eigenvalues)
+            elif (
+                leaf.tag in ["eigenvalues", "dos", "projected"]
+                and len(parents) > 0
+                and parents[-1].tag == "calculation"
+                and not (eigenvalues and leaf.tag == "eigenvalues")
+            ):
+                parents[-1].remove(leaf)
+            if len(parents) == 1:
+                parents[0].remove(leaf)
+
+    def _parse_calc_to_record(self, node, eigenvalues=False):
+        """
+        Parses the data of one ionic step for iter_calculations()
+
+        Args:
+            node (xml.etree.Element instance): The calculation node to parse
+            eigenvalues (bool): Add the eigenvalues and occupancies to the record
+
+        Returns:
+            dict: The quantities of the ionic step
+        """
+        d = {key: list() for key in _CALCULATION_RECORD_KEYS.values()}
+        self.parse_calc_to_dict(node, d)
+        record = dict()
+        for record_key, key in _CALCULATION_RECORD_KEYS.items():
+            if len(d[key]) == 0:
+                record[record_key] = None
+            elif isinstance(d[key][0], list):
+                record[record_key] = np.array(d[key][0])
+            else:
+                record[record_key] = d[key][0]
+        # same check for absolute coordinates as in parse_root_to_dict(), but for a single ionic step
+        positions = record["positions"]
+        if positions is not None and positions.size > 0:
+            if len(np.argwhere(positions.flatten() > 1)) / positions.size > 0.2:
+                record["positions"] = np.dot(positions, np.linalg.inv(record["cell"]))
+        if eigenvalues:
+            record["eigenvalues"] = d.get("grand_eigenvalue_matrix")
+            record["occupancies"] = d.get("grand_occupancy_matrix")
+        return record
 
     def parse_kpoints_to_dict(self, node, d):
         """
@@ -307,34 +805,28 @@ class Vasprun(object):
                             orbital_dict[ii.text.replace(" ", "")] = orbital_index
                         orbital_index += 1
                     if ii.tag == "set":
-                        atom_resolved_dos = list()
-                        for ion in ii:
-                            spin_resolved_dos = list()
-                            if ion.tag == "set" and "ion" in ion.attrib["comment"]:
-                                for sp in ion:
-                                    if (
-                                        sp.tag == "set"
-                                        and "spin" in sp.attrib["comment"]
-                                    ):
-                                        values = self._parse_2d_matrix(
-                                            sp, vec_type=float
-                                        )
-                                        spin_resolved_dos.append(values[:, 1:])
-                            atom_resolved_dos.append(spin_resolved_dos)
-                        atom_resolved_dos = np.array(atom_resolved_dos)
-                        n_atoms, n_spin, n_densities, n_orbitals = np.shape(
-                            atom_resolved_dos
+                        spin_sets = [
+                            [
+                                sp
+                                for sp in ion
+                                if sp.tag == "set" and "spin" in sp.attrib["comment"]
+                            ]
+                            for ion in ii
+                            if ion.tag == "set" and "ion" in ion.attrib["comment"]
+                        ]
+                        if len(spin_sets) == 0:
+                            continue
+                        # all ions and spins are decoded at once to an (atom, spin, energy, 1 + orbital) array
+                        values = _decode_rows(
+                            [r.text for ion in spin_sets for sp in ion for r in sp]
+                        )
+                        values = values.reshape(
+                            len(spin_sets), len(spin_sets[0]), -1, values.shape[-1]
                         )
-                        new_grand_dos_matrix = np.zeros(
-                            (n_spin, n_atoms, n_orbitals, n_densities)
+                        # (spin, atom, orbital, energy) without the energy column
+                        d["resolved_dos_matrix"] = np.ascontiguousarray(
+                            values[:, :, :, 1:].transpose(1, 0, 3, 2)
                         )
-                        for i_spin in range(n_spin):
-                            for i_atom in range(n_atoms):
-                                for i_orbitals in range(n_orbitals):
-                                    new_grand_dos_matrix[
-                                        i_spin, i_atom, i_orbitals, :
-                                    ] = atom_resolved_dos[i_atom, i_spin, :, i_orbitals]
-                        d["resolved_dos_matrix"] = new_grand_dos_matrix
 
     def parse_projected_dos_to_dict(self, node, d):
         """
@@ -355,23 +847,49 @@ class Vasprun(object):
                         orbital_dict[ii.text] = orbital_index
                         orbital_index += 1
                     if ii.tag == "set":
-                        spin_dos_mat = list()
-                        for sp in ii:
-                            if sp.tag == "set" and "spin" in sp.attrib["comment"]:
-                                kpt_dos_mat = list()
-                                for kpt in sp:
-                                    band_dos_mat = list()
-                                    for band in kpt:
-                                        dos_matrix = self._parse_2d_matrix(
-                                            band, vec_type=float
-                                        )
-                                        band_dos_mat.append(dos_matrix)
-                                    kpt_dos_mat.append(band_dos_mat)
-                                spin_dos_mat.append(kpt_dos_mat)
-                        grand_dos_matrix = np.array(spin_dos_mat)
-                        d["grand_dos_matrix"] = grand_dos_matrix
+                        spin_sets = [
+                            sp
+                            for sp in ii
+                            if sp.tag == "set" and "spin" in sp.attrib["comment"]
+                        ]
+                        # the spin sets are empty if their k-points were already parsed by parse_root_to_dict()
+                        for i_spin, sp in enumerate(spin_sets):
+                            for i_kpt, kpt in enumerate(sp):
+                                self._parse_projected_kpoint_to_dict(
+                                    kpt,
+                                    d,
+                                    i_spin=i_spin,
+                                    i_kpt=i_kpt,
+                                    shape=(len(spin_sets), len(sp)),
+                                )
+                        d["grand_dos_matrix"] = d["grand_dos_matrix"][: len(spin_sets)]
                         d["orbital_dict"] = orbital_dict
 
+    def _parse_projected_kpoint_to_dict(self, node, d, i_spin, i_kpt, shape):
+        """
+        Parses the projections of all bands of one k-point into the grand_dos_matrix, which is allocated for the first
+        k-point
+
+        Args:
+            node (xml.etree.Element instance): The k-point node to parse
+            d (dict): The dictionary to which data is to be parsed
+            i_spin (int): Index of the spin component
+            i_kpt (int): Index of the k-point
+            shape (tuple): Number of spin components and k-points
+        """
+        values = _decode_rows([r.text for band in node for r in band])
+        values = values.reshape(len(node), -1, values.shape[-1])
+        if i_spin == 0 and i_kpt == 0:
+            d["grand_dos_matrix"] = np.empty(
+                tuple(shape) + values.shape, dtype=self._projected_dos_dtype
+            )
+        elif i_spin >= len(d["grand_dos_matrix"]):
+            # more spin components than expected from the parameters
+            d["grand_dos_matrix"] = np.concatenate(
+                [d["grand_dos_matrix"], np.empty_like(d["grand_dos_matrix"][:1])]
+            )
+        d["grand_dos_matrix"][i_spin, i_kpt] = values
+
     def parse_scf(self, node):
         """
         Parses the total energy and dipole moments for a VASP calculation
@@ -439,26 +957,8 @@ class Vasprun(object):
                         d["total_0_energies"].append(float(i.text))
                     if i.attrib["name"] == "kinetic":
                         d["kinetic_energies"].append(float(i.text))
-            if item.tag == "eigenvalues":
-                self.parse_eigenvalues_to_dict(item, d)
-
-            if item.tag == "dos":
-                self.parse_fermi_level_to_dict(item, d)
-                d["efermi"] = float(d["efermi"])
-                for i in item:
-                    if i.tag == "total":
-                        try:
-                            self.parse_total_dos_to_dict(i, d)
-                        except ValueError:
-                            pass
-                    if i.tag == "partial":
-                        try:
-                            self.parse_partial_dos_to_dict(i, d)
-                        except ValueError:
-                            pass
-
-            if item.tag == "projected":
-                self.parse_projected_dos_to_dict(item, d)
+            if item.tag in ["eigenvalues", "dos", "projected"]:
+                self.parse_calc_data_to_dict(item, d)
 
             if "cce" in item.tag:
                 self.parse_cce_to_dict(item, d)
@@ -468,6 +968,34 @@ class Vasprun(object):
         d["scf_0_energies"].append(scf_0_energies)
         d["scf_dipole_moments"].append(scf_moments)
 
+    def parse_calc_data_to_dict(self, node, d):
+        """
+        Parses the eigenvalues, the density of states or the projected density of states of an ionic step from a node
+        to a dictionary
+
+        Args:
+            node (xml.etree.Element instance): The node to parse
+            d (dict): The dictionary to which data is to be parsed
+        """
+        if node.tag == "eigenvalues":
+            self.parse_eigenvalues_to_dict(node, d)
+        if node.tag == "dos":
+            self.parse_fermi_level_to_dict(node, d)
+            d["efermi"] = float(d["efermi"])
+            for i in node:
+                if i.tag == "total":
+                    try:
+                        self.parse_total_dos_to_dict(i, d)
+                    except ValueError:
+                        pass
+                if i.tag == "partial":
+                    try:
+                        self.parse_partial_dos_to_dict(i, d)
+                    except ValueError:
+                        pass
+        if node.tag == "projected":
+            self.parse_projected_dos_to_dict(node, d)
+
     @staticmethod
     def parse_cce_to_dict(node, d):
         for item in node:
@@ -495,16 +1023,13 @@ class Vasprun(object):
                         spin_eig_mat = list()
                         for sp in ii:
                             if sp.tag == "set" and "spin" in sp.attrib["comment"]:
-                                kpt_eig_mat = list()
-                                kpt_occ_mat = list()
-                                for kpt in sp:
-                                    values = self._parse_2d_matrix(kpt, vec_type=float)
-                                    eig_vec = values[:, 0].flatten()
-                                    occ_vec = values[:, 1].flatten()
-                                    kpt_eig_mat.append(eig_vec)
-                                    kpt_occ_mat.append(occ_vec)
-                                spin_eig_mat.append(kpt_eig_mat)
-                                spin_occ_mat.append(kpt_occ_mat)
+                                # all k-points of a spin channel are decoded at once
+                                values = _decode_rows(
+                                    [band.text for kpt in sp for band in kpt]
+                                )
+                                values = values.reshape(len(sp), -1, values.shape[-1])
+                                spin_eig_mat.append(values[:, :, 0])
+                                spin_occ_mat.append(values[:, :, 1])
                         grand_eigenvalue_matrix = np.array(spin_eig_mat)
                         grand_occupancy_matrix = np.array(spin_occ_mat)
         d["grand_eigenvalue_matrix"] = grand_eigenvalue_matrix
@@ -609,10 +1134,13 @@ class Vasprun(object):
         Returns:
             numpy.ndarray: The required 2D array/vector
         """
-        arr = list()
-        for item in node:
-            arr.append(self._parse_vector(item, vec_type=vec_type))
-        return np.array(arr)
+        if len(node) == 0:
+            return np.array([])
+        return _decode_rows(
+            [item.text for item in node],
+            vec_type=vec_type,
+            logical=node[0].get("type") == "logical",
+        )
 
     @staticmethod
     def _parse_vector(node, vec_type=float):
@@ -825,6 +1353,184 @@ class Vasprun(object):
         )
 
 
+class _CalculationEndReader(object):
+    """
+    Wraps a file opened in binary mode and records the byte offsets behind the closing tags of the ionic steps while
+    the xml parser reads the file.
+
+    Args:
+        f (file object): The vasprun file, positioned at the offset
+        offset (int): Byte offset in the file from which it is read
+        prefix (bytes): Data passed to the parser before the content of the file
+    """
+
+    _end_tag = b"</calculation>"
+
+    def __init__(self, f, offset=0, prefix=b""):
+        self._f = f
+        self._offset = offset
+        self._prefix = prefix
+        # the end of the previous chunk, which may contain the beginning of a closing tag
+        self._tail = b""
+        self.calculation_ends = list()
+
+    def read(self, size=-1):
+        if len(self._prefix) > 0:
+            if size < 0:
+                size = len(self._prefix)
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        data = self._f.read(size)
+        chunk = self._tail + data
+        chunk_offset = self._offset - len(self._tail)
+        i = chunk.find(self._end_tag)
+        while i >= 0:
+            self.calculation_ends.append(chunk_offset + i + len(self._end_tag))
+            i = chunk.find(self._end_tag, i + len(self._end_tag))
+        self._tail = chunk[-(len(self._end_tag) - 1) :]
+        self._offset += len(data)
+        return data
+
+
+def _read_prolog(f, chunk_size=2**14):
+    """
+    Args:
+        f (file object): The vasprun file opened in binary mode
+        chunk_size (int): Number of bytes read at once
+
+    Returns:
+        bytes: The beginning of the file up to the end of the start tag of the root element
+    """
+    prolog = b""
+    while True:
+        data = f.read(chunk_size)
+        prolog += data
+        match = re.search(rb"<modeling[^>]*>", prolog)
+        if match is not None:
+            return prolog[: match.end()]
+        if len(data) == 0:
+            raise ParseError("The vasprun.xml file has no root element")
+
+
+def _convert_calculations(d, skipped_sections):
+    """
+    Converts the lists of the ionic steps in a dictionary to arrays, after they are parsed
+
+    Args:
+        d (dict): The parsed dictionary
+        skipped_sections (list): Tags of the sections which were skipped
+    """
+    d["cells"] = np.array(d["cells"])
+    d["positions"] = np.array(d["positions"])
+    # Check if the parsed coordinates are in absolute/relative coordinates. If absolute, convert to relative
+    total_positions = d["positions"].flatten()
+    if (
+        len(total_positions) > 0
+        and len(np.argwhere(total_positions > 1)) / len(total_positions) > 0.2
+    ):
+        pos_new = d["positions"].copy()
+        for i, pos in enumerate(pos_new):
+            d["positions"][i] = np.dot(pos, np.linalg.inv(d["cells"][i]))
+    d["forces"] = np.array(d["forces"])
+    d["total_energies"] = np.array(d["total_energies"])
+    d["total_fr_energies"] = np.array(d["total_fr_energies"])
+    d["total_0_energies"] = np.array(d["total_0_energies"])
+    if len(d["kinetic_energies"]) > 0:
+        d["kinetic_energies"] = np.array(d["kinetic_energies"])
+    else:
+        del d["kinetic_energies"]
+    if "eigenvalue_history_steps" in d.keys():
+        n_steps = len(d["eigenvalue_history_steps"])
+        d["eigenvalue_history_steps"] = np.array(
+            d["eigenvalue_history_steps"], dtype=int
+        )
+        for key in ["grand_eigenvalue_history", "grand_occupancy_history"]:
+            if key in d.keys():
+                d[key] = d[key][:n_steps]
+    if "scstep" in skipped_sections:
+        for key in [
+            "scf_energies",
+            "scf_fr_energies",
+            "scf_0_energies",
+            "scf_dipole_moments",
+        ]:
+            del d[key]
+
+
+def _get_projected_dos_shape(d):
+    """
+    Args:
+        d (dict): The dictionary parsed so far
+
+    Returns:
+        tuple/None: Number of spin components and k-points of the projected density of states, None if the parameters
+                    or k-points were not parsed
+    """
+    try:
+        spin_parameters = d["parameters"]["electronic"]["electronic_spin"]
+        if spin_parameters["LNONCOLLINEAR"] == "T":
+            n_spin = 4
+        else:
+            n_spin = int(spin_parameters["ISPIN"])
+        return n_spin, len(d["kpoints"]["kpoint_list"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _get_skipped_sections(include=None, exclude=None):
+    """
+    Args:
+        include (list/None): Optional sections to parse, all of them if None
+        exclude (list/None): Optional sections to skip
+
+    Returns:
+        list: Optional sections which are skipped
+    """
+    for sections in [include, exclude]:
+        if sections is not None:
+            unknown = [s for s in sections if s not in VASPRUN_OPTIONAL_SECTIONS]
+            if len(unknown) > 0:
+                raise ValueError(
+                    "Unknown vasprun sections {}, the optional sections are {}".format(
+                        unknown, VASPRUN_OPTIONAL_SECTIONS
+                    )
+                )
+    return [
+        s
+        for s in VASPRUN_OPTIONAL_SECTIONS
+        if (include is not None and s not in include)
+        or (exclude is not None and s in exclude)
+    ]
+
+
+def _decode_rows(texts, vec_type=float, logical=False):
+    """
+    Decodes the whitespace separated values of several rows (<v>/<r> nodes) at once instead of row by row
+
+    Args:
+        texts (list): The text of each row
+        vec_type (type): The type of the values
+        logical (bool): True if the values are the logicals T and F
+
+    Returns:
+        numpy.ndarray: 2D array with one row per text
+    """
+    row_lengths = set(map(len, map(str.split, texts)))
+    if len(row_lengths) > 1:
+        raise ValueError("The rows have different lengths")
+    n_columns = row_lengths.pop() if len(row_lengths) > 0 else 0
+    if logical:
+        values = np.array(" ".join(texts).split())
+        is_true = values == "T"
+        if not np.all(is_true | (values == "F")):
+            raise KeyError("Logical values have to be T or F")
+        values = is_true
+    else:
+        # all values are converted by numpy at once, which raises a ValueError for values of another type
+        values = np.fromstring(" ".join(texts), dtype=vec_type, sep=" ")
+    return values.reshape(len(texts), n_columns)
+
+
 def clean_character(a, remove_char=" "):
     """
     Args:
@@ -0,0 +1,206 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+import json
+import os
+import re
+import warnings
+
+from vaspparser.vasp.compression import open_file
+
+__author__ = "Sudarsan Surendralal"
+__copyright__ = (
+    "Copyright 2021, Max-Planck-Institut für Eisenforschung GmbH - "
+    "Computational Materials Design (CM) Department"
+)
+__version__ = "1.0"
+__maintainer__ = "Sudarsan Surendralal"
+__email__ = "surendralal@mpie.de"
+__status__ = "production"
+__date__ = "Sep 1, 2020"
+
+# elements of an ionic step which are indexed, they contain most of the data of a vasprun.xml file
+INDEXED_SECTIONS = ["eigenvalues", "dos", "projected"]
+
+# opening and closing tags of the indexed elements, including variants like <eigenvalues_kpoints_opt>, which contain
+# nested <eigenvalues> elements themselves
+_TAG_PATTERN = re.compile(rb"<(/?)((?:calculation|eigenvalues|dos|projected)\w*)")
+_ROOT_PATTERN = re.compile(rb"<modeling[^>]*>")
+# maximum length of a tag, matches closer to the end of a chunk are completed with the next chunk
+_MAX_TAG_LENGTH = 64
+
+SIDECAR_SUFFIX = ".index.json"
+
+# format version of the sidecar index files written by get_vasprun_index(sidecar=True)
+_VASPRUN_INDEX_VERSION = 1
+
+
+def index_vasprun(filename, chunk_size=2**20):
+    """
+    Scans the bytes of a vasprun.xml file - without parsing the xml - for the positions of the ionic steps.
+
+    Args:
+        filename (str): Path to the vasprun file
+        chunk_size (int): Number of bytes scanned at once
+
+    Returns:
+        dict: "prolog" - the byte offset behind the start tag of the root element and "calculations" - for every
+              complete <calculation> element a dictionary with the byte range [start, end) of the "calculation" and
+              of its "eigenvalues", "dos" and "projected" elements, if present
+    """
+    prolog = None
+    calculations = list()
+    # the open indexed elements and the byte ranges of the current ionic step
+    stack = list()
+    calculation = None
+    buffer = b""
+    # offset of the buffer in the file
+    offset = 0
+    with open_file(filename, "rb") as f:
+        while True:
+            data = f.read(chunk_size)
+            buffer += data
+            stop = len(buffer) if len(data) == 0 else len(buffer) - _MAX_TAG_LENGTH
+            if prolog is None:
+                match = _ROOT_PATTERN.search(buffer)
+                if match is not None:
+                    prolog = offset + match.end()
+            for match in _TAG_PATTERN.finditer(buffer):
+                if match.start() >= stop:
+                    break
+                tag = match.group(2).decode()
+                if match.group(1) == b"":
+                    if tag == "calculation" and len(stack) == 0:
+                        calculation = {tag: [offset + match.start(), None]}
+                    elif tag in INDEXED_SECTIONS and stack == ["calculation"]:
+                        calculation[tag] = [offset + match.start(), None]
+                    stack.append(tag)
+                    continue
+                if len(stack) == 0 or stack[-1] != tag:
+                    raise ValueError(
+                        "The vasprun.xml file is not well-formed, </{}> at byte {}".format(
+                            tag, offset + match.start()
+                        )
+                    )
+                end = buffer.find(b">", match.end())
+                if end < 0:
+                    # the file ends within the closing tag
+                    break
+                end += offset + 1
+                stack.pop()
+                if tag == "calculation" and len(stack) == 0:
+                    calculation[tag][1] = end
+                    calculations.append(calculation)
+                elif tag in INDEXED_SECTIONS and stack == ["calculation"]:
+                    calculation[tag][1] = end
+            if len(data) == 0:
+                break
+            offset += stop
+            buffer = buffer[stop:]
+    if prolog is None:
+        raise ValueError("The vasprun.xml file has no root element")
+    return {"prolog": prolog, "calculations": calculations}
+
+
+def get_vasprun_index(filename, sidecar=False):
+    """
+    Returns the index of a vasprun.xml file (see index_vasprun()). The index can be stored in a sidecar file next to
+    the vasprun.xml file (filename + SIDECAR_SUFFIX), which is used as long as the size and the modification time of
+    the vasprun.xml file are unchanged.
+
+    Args:
+        filename (str): Path to the vasprun file
+        sidecar (bool): Read the index from the sidecar file and write it, if it is missing or outdated
+
+    Returns:
+        dict: The index
+    """
+    if sidecar:
+        index = read_vasprun_index(filename)
+        if index is not None:
+            return index
+    stat = os.stat(filename)
+    index = index_vasprun(filename)
+    index["size"] = stat.st_size
+    index["mtime_ns"] = stat.st_mtime_ns
+    if sidecar:
+        _save_vasprun_index(filename, index)
+    return index
+
+
+def read_vasprun_index(filename):
+    """
+    Reads the index of a vasprun.xml file from its sidecar file, without scanning the vasprun.xml file.
+
+    Args:
+        filename (str): Path to the vasprun file
+
+    Returns:
+        dict/None: The index, None if there is no sidecar file or if it is outdated or unreadable
+    """
+    sidecar_filename = filename + SIDECAR_SUFFIX
+    if not os.path.exists(sidecar_filename):
+        return None
+    stat = os.stat(filename)
+    try:
+        with open(sidecar_filename) as f:
+            index = json.load(f)
+        if (
+            int(index["version"]) != _VASPRUN_INDEX_VERSION
+            or int(index["size"]) != stat.st_size
+            or int(index["mtime_ns"]) != stat.st_mtime_ns
+        ):
+            return None
+        return {
+            key: index[key] for key in ["prolog", "calculations", "size", "mtime_ns"]
+        }
+    except (OSError, ValueError, KeyError, TypeError):
+        warnings.warn("Unable to read the index file {}".format(sidecar_filename))
+        return None
+
+
+def _save_vasprun_index(filename, index):
+    """
+    Stores the index of a vasprun.xml file in its sidecar file. Nothing is stored if the directory is not writable.
+
+    Args:
+        filename (str): Path to the vasprun file
+        index (dict): The index with the size and the modification time of the vasprun file
+    """
+    sidecar_filename = filename + SIDECAR_SUFFIX
+    tmp_filename = "{}.{}.tmp".format(sidecar_filename, os.getpid())
+    try:
+        with open(tmp_filename, "w") as f:
+            json.dump(dict(index, version=_VASPRUN_INDEX_VERSION), f)
+        os.replace(tmp_filename, sidecar_filename)
+    except OSError:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+
+
+def read_calculation(f, calculation, skipped_sections=None):
+    """
+    Reads the bytes of one ionic step of the index without the skipped elements.
+
+    Args:
+        f (file object): The vasprun file opened in binary mode
+        calculation (dict): The byte ranges of the ionic step from the index
+        skipped_sections (list/None): Elements of INDEXED_SECTIONS which are cut out
+
+    Returns:
+        bytes: The <calculation> element
+    """
+    if skipped_sections is None:
+        skipped_sections = list()
+    start, end = calculation["calculation"]
+    parts = list()
+    for section_start, section_end in sorted(
+        calculation[tag] for tag in skipped_sections if tag in calculation
+    ):
+        f.seek(start)
+        parts.append(f.read(section_start - start))
+        start = section_end
+    f.seek(start)
+    parts.append(f.read(end - start))
+    return b"".join(parts)
@@ -9,6 +9,7 @@ import warnings
 import numpy as np
 
 from vaspparser.dft.volumetric import VolumetricData
+from vaspparser.vasp.compression import open_file
 from vaspparser.vasp.structure import (
     atoms_from_string,
     get_species_list_from_potcar,
@@ -93,7 +94,7 @@ class VaspVolumetricData(VolumetricData):
         data_count = 0
         atoms = None
         volume = None
-        with open(filename, "r") as f:
+        with open_file(filename, "r") as f:
             for line in f:
                 line = line.strip()
                 if read_dataset:
@@ -169,7 +170,7 @@ class VaspVolumetricData(VolumetricData):
         if not os.path.getsize(filename) > 0:
             warnings.warn("File:" + filename + "seems to be empty! ")
             return None, None
-        with open(filename, "r") as f:
+        with open_file(filename, "r") as f:
             struct_lines = list()
             get_grid = False
             n_x = 0
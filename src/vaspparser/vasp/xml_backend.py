@@ -0,0 +1,164 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+import importlib.util
+from xml.etree.ElementTree import XMLPullParser
+from xml.parsers import expat
+
+import defusedxml.ElementTree
+from defusedxml.common import DTDForbidden
+from defusedxml.ElementTree import ParseError
+
+__author__ = "Sudarsan Surendralal"
+__copyright__ = (
+    "Copyright 2021, Max-Planck-Institut für Eisenforschung GmbH - "
+    "Computational Materials Design (CM) Department"
+)
+__version__ = "1.0"
+__maintainer__ = "Sudarsan Surendralal"
+__email__ = "surendralal@mpie.de"
+__status__ = "production"
+__date__ = "Sep 1, 2020"
+
+# All backends reject document type declarations - vasprun.xml files do not contain any - so no entities can be
+# declared and expanded. "lxml" is used by default if it is installed, otherwise "defusedxml". "etree" is faster than
+# "defusedxml" but has to be selected explicitly.
+XML_BACKENDS = ["lxml", "etree", "defusedxml"]
+
+
+def get_default_backend():
+    """
+    Returns:
+        str: "lxml" if it is installed, "defusedxml" otherwise
+    """
+    if importlib.util.find_spec("lxml") is not None:
+        return "lxml"
+    return "defusedxml"
+
+
+def iterparse(source, backend=None, chunk_size=2**14):
+    """
+    Parse an xml file incrementally, like xml.etree.ElementTree.iterparse() with the "start" and "end" events, with
+    the same elements and errors for every backend.
+
+    Args:
+        source (file object): The file opened in binary mode
+        backend (str/None): One of XML_BACKENDS, the default backend if None
+        chunk_size (int): Number of bytes parsed at once
+
+    Yields:
+        tuple: The event "start" or "end" and the element
+
+    Raises:
+        ParseError: if the xml file is not well-formed or truncated
+        DTDForbidden: if the xml file has a document type declaration
+    """
+    if backend is None:
+        backend = get_default_backend()
+    if backend == "lxml":
+        return _iterparse_lxml(source)
+    elif backend == "etree":
+        return _iterparse_etree(source, chunk_size=chunk_size)
+    elif backend == "defusedxml":
+        return defusedxml.ElementTree.iterparse(
+            source, events=("start", "end"), forbid_dtd=True
+        )
+    raise ValueError(
+        "Unknown xml backend {}, the backends are {}".format(backend, XML_BACKENDS)
+    )
+
+
+def _iterparse_etree(source, chunk_size=2**14):
+    """
+    Parse with the C accelerated parser of xml.etree.ElementTree. It does not allow to reject document type
+    declarations, so the prolog of the file - everything before the root element - is checked by a separate expat
+    parser first, which raises as soon as it finds a document type declaration and stops at the root element.
+
+    Args:
+        source (file object): The file opened in binary mode
+        chunk_size (int): Number of bytes parsed at once
+
+    Yields:
+        tuple: The event "start" or "end" and the element
+    """
+
+    def forbid_dtd(name, sysid, pubid, has_internal_subset):
+        raise DTDForbidden(name, sysid, pubid)
+
+    def stop_at_root(tag, attrib):
+        raise _RootElementFound()
+
+    prolog_parser = expat.ParserCreate()
+    prolog_parser.StartDoctypeDeclHandler = forbid_dtd
+    prolog_parser.StartElementHandler = stop_at_root
+    in_prolog = True
+    parser = XMLPullParser(events=("start", "end"))
+    while True:
+        data = source.read(chunk_size)
+        if in_prolog:
+            try:
+                prolog_parser.Parse(data, len(data) == 0)
+            except _RootElementFound:
+                in_prolog = False
+            except expat.error as e:
+                raise _get_parse_error(e, position=(e.lineno, e.offset))
+        if len(data) == 0:
+            parser.close()
+            yield from parser.read_events()
+            return
+        parser.feed(data)
+        yield from parser.read_events()
+
+
+def _iterparse_lxml(source):
+    """
+    Parse with lxml, without resolving entities or loading external documents.
+
+    Args:
+        source (file object): The file opened in binary mode
+
+    Yields:
+        tuple: The event "start" or "end" and the element
+    """
+    from lxml import etree
+
+    context = etree.iterparse(
+        source,
+        events=("start", "end"),
+        huge_tree=True,
+        resolve_entities=False,
+        load_dtd=False,
+        no_network=True,
+        remove_comments=True,
+        remove_pis=True,
+    )
+    try:
+        event, root = next(context)
+        # the document type declaration precedes the root element
+        docinfo = root.getroottree().docinfo
+        if docinfo.doctype:
+            raise DTDForbidden(docinfo.root_name, docinfo.system_url, docinfo.public_id)
+        yield event, root
+        yield from context
+    except etree.XMLSyntaxError as e:
+        raise _get_parse_error(e, position=e.position)
+
+
+class _RootElementFound(Exception):
+    pass
+
+
+def _get_parse_error(error, position):
+    """
+    Args:
+        error (Exception): The error raised by the xml parser
+        position (tuple): Line and column of the error
+
+    Returns:
+        ParseError: The error which xml.etree.ElementTree raises for the same problem
+    """
+    parse_error = ParseError(error)
+    parse_error.code = error.code
+    parse_error.position = position
+    return parse_error
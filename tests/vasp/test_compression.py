@@ -0,0 +1,148 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import unittest
+import numpy as np
+from vaspparser.vasp.compression import get_files_present, is_compressed, open_file
+from vaspparser.vasp.parser.oszicar import Oszicar
+from vaspparser.vasp.parser.outcar import Outcar
+from vaspparser.vasp.structure import read_atoms
+from vaspparser.vasp.vasprun import Vasprun
+from vaspparser.vasp.volumetric_data import VaspVolumetricData
+
+
+class TestCompression(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.file_location = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "../static/vasp_test_files"
+        )
+        cls.openers = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def compress(self, filename, extension):
+        compressed_filename = os.path.join(
+            self.tmp_dir.name, os.path.basename(filename) + extension
+        )
+        with (
+            open(filename, "rb") as f,
+            self.openers[extension](compressed_filename, "wb") as f_compressed,
+        ):
+            f_compressed.write(f.read())
+        return compressed_filename
+
+    def test_is_compressed(self):
+        self.assertTrue(is_compressed("OUTCAR.gz"))
+        self.assertTrue(is_compressed("vasprun.xml.bz2"))
+        self.assertTrue(is_compressed("CHGCAR.xz"))
+        self.assertFalse(is_compressed("vasprun.xml"))
+        self.assertFalse(is_compressed("OUTCAR"))
+
+    def test_open_file(self):
+        filename = os.path.join(self.file_location, "outcar_samples/OUTCAR_1")
+        with open(filename, "rb") as f:
+            data = f.read()
+        for extension in self.openers.keys():
+            compressed_filename = self.compress(filename, extension)
+            with open_file(compressed_filename, "rb") as f:
+                self.assertEqual(f.read(), data)
+            with open_file(compressed_filename, "r", errors="ignore") as f:
+                self.assertEqual(f.readlines(), data.decode().splitlines(True))
+        with self.assertRaises(ValueError):
+            open_file(filename, "w")
+
+    def test_get_files_present(self):
+        for filename in [
+            "OUTCAR",
+            "OUTCAR.gz",
+            "vasprun.xml.xz",
+            "CHGCAR.bz2",
+            "INCAR",
+        ]:
+            open(os.path.join(self.tmp_dir.name, filename), "w").close()
+        self.assertEqual(
+            get_files_present(self.tmp_dir.name),
+            {
+                "CHGCAR": "CHGCAR.bz2",
+                "INCAR": "INCAR",
+                "OUTCAR": "OUTCAR",
+                "vasprun.xml": "vasprun.xml.xz",
+            },
+        )
+
+    def test_parsers(self):
+        outcar_filename = os.path.join(self.file_location, "outcar_samples/OUTCAR_1")
+        vasprun_filename = os.path.join(
+            self.file_location, "vasprun_samples/vasprun_1.xml"
+        )
+        chgcar_filename = os.path.join(
+            self.file_location, "chgcar_samples/CHGCAR_no_spin"
+        )
+        oszicar_filename = os.path.join(self.file_location, "full_job_sample/OSZICAR")
+        poscar_filename = os.path.join(self.file_location, "full_job_sample/POSCAR")
+        outcar = Outcar()
+        outcar.from_file(filename=outcar_filename)
+        vasprun = Vasprun()
+        vasprun.from_file(filename=vasprun_filename)
+        chgcar = VaspVolumetricData()
+        chgcar.from_file(filename=chgcar_filename)
+        oszicar = Oszicar()
+        oszicar.from_file(filename=oszicar_filename)
+        structure = read_atoms(poscar_filename, species_list=["Fe"])
+        for extension in self.openers.keys():
+            compressed_outcar = Outcar()
+            compressed_outcar.from_file(
+                filename=self.compress(outcar_filename, extension), memory_map=True
+            )
+            for key, value in outcar.parse_dict.items():
+                self.assertEqual(
+                    repr(value), repr(compressed_outcar.parse_dict[key]), key
+                )
+            compressed_vasprun = Vasprun()
+            compressed_vasprun.from_file(
+                filename=self.compress(vasprun_filename, extension)
+            )
+            np.testing.assert_array_equal(
+                vasprun.vasprun_dict["positions"],
+                compressed_vasprun.vasprun_dict["positions"],
+            )
+            np.testing.assert_array_equal(
+                vasprun.vasprun_dict["forces"],
+                compressed_vasprun.vasprun_dict["forces"],
+            )
+            compressed_chgcar = VaspVolumetricData()
+            compressed_chgcar.from_file(
+                filename=self.compress(chgcar_filename, extension)
+            )
+            np.testing.assert_array_equal(
+                chgcar.total_data, compressed_chgcar.total_data
+            )
+            compressed_oszicar = Oszicar()
+            compressed_oszicar.from_file(
+                filename=self.compress(oszicar_filename, extension)
+            )
+            np.testing.assert_array_equal(
+                oszicar.parse_dict["energy_pot"],
+                compressed_oszicar.parse_dict["energy_pot"],
+            )
+            self.assertEqual(
+                structure,
+                read_atoms(
+                    self.compress(poscar_filename, extension), species_list=["Fe"]
+                ),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,9 +5,21 @@
 import unittest
 import os
 import posixpath
+import tempfile
 import numpy as np
 from vaspparser.vasp.output import Output, VaspCollectError
-from vaspparser.vasp.parser.outcar import Outcar, OutcarCollectError
+from vaspparser.vasp.parser.outcar import (
+    Outcar,
+    OutcarCollectError,
+    OUTCAR_TRIGGERS,
+    _TriggerLines,
+    _MappedLines,
+    _parse_blocks,
+    _get_delimiter_indices,
+    _load_trigger_index,
+    _get_band_data,
+    _parse_outcar_parallel,
+)
 
 
 class TestOutcar(unittest.TestCase):
@@ -1373,6 +1385,59 @@ class TestOutcar(unittest.TestCase):
                 np.allclose(output, output_dict[int(filename.split("/OUTCAR_")[-1])])
             )
 
+    def test_energy_components_as_dict(self):
+        names = [
+            "PSCENC",
+            "TEWEN",
+            "DENC",
+            "EXHF",
+            "XCENC",
+            "PAWPS",
+            "PAWAE",
+            "EENTRO",
+            "EBANDS",
+            "EATOM",
+        ]
+        for filename in self.file_list:
+            components, offsets = self.outcar_parser.get_energy_components(
+                filename, as_dict=True
+            )
+            with open(filename) as f:
+                lines = f.readlines()
+            n_ionic_steps = len(
+                [
+                    line
+                    for line in lines
+                    if "FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)" in line
+                ]
+            )
+            self.assertEqual(len(offsets), n_ionic_steps + 1)
+            self.assertEqual(offsets[0], 0)
+            self.assertTrue(np.all(np.diff(offsets) >= 0))
+            self.assertEqual(list(components.keys())[: len(names)], names)
+            tewen = [
+                float(line.split()[-1])
+                for line in lines
+                if "Ewald energy   TEWEN  =" in line
+            ][: offsets[-1]]
+            self.assertEqual(components["TEWEN"], np.array(tewen))
+            paw = [
+                [float(value) for value in line.split()[-2:]]
+                for line in lines
+                if "PAW double counting   =" in line
+            ][: offsets[-1]]
+            self.assertEqual(
+                np.array([components["PAWPS"], components["PAWAE"]]).T,
+                np.array(paw).reshape(-1, 2),
+            )
+            legacy_output = self.outcar_parser.get_energy_components(filename)
+            if "Ediel_sol" in components.keys():
+                for step, step_components in enumerate(legacy_output):
+                    np.testing.assert_array_equal(
+                        step_components[0],
+                        components["PSCENC"][offsets[step] : offsets[step + 1]],
+                    )
+
     def test_get_positions_and_forces(self):
         for filename in self.file_list:
             output = self.outcar_parser.get_positions_and_forces(filename)
@@ -1860,6 +1925,22 @@ class TestOutcar(unittest.TestCase):
                 )
                 self.assertEqual(np.array(final_magmoms).shape[1], positions.shape[1])
 
+    def test_get_magnetization_as_array(self):
+        for filename in self.file_list:
+            output, final_magmoms = self.outcar_parser.get_magnetization(filename)
+            output_array, final_magmoms_array = self.outcar_parser.get_magnetization(
+                filename, as_array=True
+            )
+            self.assertEqual(output.__str__(), output_array.__str__())
+            self.assertIsInstance(final_magmoms_array, np.ndarray)
+            self.assertEqual(np.array(final_magmoms), final_magmoms_array)
+            if int(filename.split("/OUTCAR_")[-1]) == 6:
+                self.assertEqual(final_magmoms_array.shape[-1], 3)
+            outcar = Outcar()
+            outcar.from_file(filename=filename, magmoms_as_array=True)
+            self.assertIsInstance(outcar.parse_dict["final_magmoms"], np.ndarray)
+            self.assertEqual(outcar.parse_dict["final_magmoms"], final_magmoms_array)
+
     def test_get_broyden_mixing_mesh(self):
         for filename in self.file_list:
             output = self.outcar_parser.get_broyden_mixing_mesh(filename)
@@ -2139,6 +2220,366 @@ class TestOutcar(unittest.TestCase):
                     np.allclose(np.array(cbm_list), np.array([[-0.1332], [0.0219]]))
                 )
 
+    def test_get_band_occupations(self):
+        for filename in self.file_list:
+            with open(filename, "r", errors="ignore") as f:
+                lines = f.readlines()
+            band_occupations = self.outcar_parser.get_band_occupations(
+                filename=filename
+            )
+            fermi_indices = [i for i, line in enumerate(lines) if "E-fermi" in line]
+            if len(fermi_indices) > 0:
+                # the last band table of the last block
+                band_index = max(
+                    i
+                    for i, line in enumerate(lines)
+                    if "band No.  band energies" in line
+                )
+                n_bands = band_occupations.shape[3]
+                self.assertTrue(
+                    np.array_equal(
+                        band_occupations[-1, -1, -1],
+                        [
+                            [float(value) for value in line.split()[1:]]
+                            for line in lines[band_index + 1 : band_index + 1 + n_bands]
+                        ],
+                    )
+                )
+            # the vectorized band edges agree with the ones of the individual tables
+            fermi_list, vbm_list, cbm_list = self.outcar_parser.get_band_properties(
+                filename=filename
+            )
+            band_data = _get_band_data(filename=filename)
+            (
+                fallback_fermi_list,
+                fallback_vbm_list,
+                fallback_cbm_list,
+            ) = self.outcar_parser.get_band_properties(
+                filename=filename, band_data=(band_data[0], band_data[1], None)
+            )
+            self.assertTrue(np.array_equal(fermi_list, fallback_fermi_list))
+            self.assertTrue(np.array_equal(vbm_list, fallback_vbm_list))
+            self.assertTrue(np.array_equal(cbm_list, fallback_cbm_list))
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            self.assertNotIn("band_occupations", outcar.parse_dict.keys())
+            outcar.from_file(filename=filename, fields=["band_occupations"])
+            self.assertTrue(
+                np.array_equal(outcar.parse_dict["band_occupations"], band_occupations)
+            )
+
+    def test_trigger_lines(self):
+        for filename in self.file_list:
+            with open(filename, "r", errors="ignore") as f:
+                lines = f.readlines()
+            trigger_lines = _TriggerLines(lines, triggers=OUTCAR_TRIGGERS)
+            self.assertEqual(list(trigger_lines), lines)
+            for trigger in OUTCAR_TRIGGERS + ("Iteration",):
+                self.assertEqual(
+                    trigger_lines.get_trigger_indices(trigger),
+                    [i for i, line in enumerate(lines) if trigger in line.strip()],
+                )
+        lines = _TriggerLines(
+            [" E-fermi :  -7.3532\n", "\n", "gives a total of \n", "E-fer", "mi\n"],
+            triggers=["E-fermi", "E-fermi :", "gives a total of "],
+        )
+        self.assertEqual(lines.get_trigger_indices("E-fermi"), [0])
+        self.assertEqual(lines.get_trigger_indices("E-fermi :"), [0])
+        self.assertEqual(lines.get_trigger_indices("gives a total of "), [])
+
+    def test_mapped_lines(self):
+        for filename in self.file_list:
+            with open(filename, "r", errors="ignore") as f:
+                lines = f.readlines()
+            with _MappedLines(filename, triggers=OUTCAR_TRIGGERS) as mapped_lines:
+                self.assertEqual(len(mapped_lines), len(lines))
+                self.assertEqual(list(mapped_lines), lines)
+                self.assertEqual(mapped_lines[-1], lines[-1])
+                self.assertEqual(mapped_lines[5:-3:2], lines[5:-3:2])
+                self.assertEqual(
+                    [mapped_lines[i] for i in range(len(lines) - 1, -1, -7)],
+                    lines[::-7],
+                )
+                for trigger in OUTCAR_TRIGGERS + ("Iteration",):
+                    self.assertEqual(
+                        mapped_lines.get_trigger_indices(trigger),
+                        [i for i, line in enumerate(lines) if trigger in line.strip()],
+                    )
+
+    def test_from_file_memory_map(self):
+        for filename in self.file_list:
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            mapped_outcar = Outcar()
+            mapped_outcar.from_file(filename=filename, memory_map=True)
+            self.assertEqual(
+                sorted(outcar.parse_dict.keys()),
+                sorted(mapped_outcar.parse_dict.keys()),
+            )
+            for key, value in outcar.parse_dict.items():
+                self.assertEqual(str(value), str(mapped_outcar.parse_dict[key]))
+
+    def test_parse_blocks(self):
+        lines = [
+            " POSITION                                       TOTAL-FORCE (eV/Angst)\n",
+            " ----------------------------------------------------------------\n",
+            "      0.00000      0.00000      0.00000        -0.000000-10.123456      1.000000\n",
+            "      1.50000     -1.50000      0.00000        12.345678     -0.000001     -1.000000\n",
+            " ----------------------------------------------------------------\n",
+        ]
+        blocks = _parse_blocks(
+            lines=lines + lines, trigger_indices=[0, 5], n_rows=2, n_columns=6, offset=2
+        )
+        self.assertEqual(blocks.shape, (2, 2, 6))
+        self.assertTrue(np.array_equal(blocks[0], blocks[1]))
+        self.assertTrue(
+            np.array_equal(
+                blocks[0],
+                [
+                    [0.0, 0.0, 0.0, -0.0, -10.123456, 1.0],
+                    [1.5, -1.5, 0.0, 12.345678, -0.000001, -1.0],
+                ],
+            )
+        )
+        self.assertEqual(str(blocks[0, 0, 3]), "-0.0")
+        self.assertIsNone(
+            _parse_blocks(
+                lines=lines, trigger_indices=[0], n_rows=3, n_columns=6, offset=2
+            )
+        )
+
+    def test_get_delimiter_indices(self):
+        table = [
+            "  FORCE on cell =-STRESS in cart. coord.  units (eV):\n",
+            "  Direction    XX          YY          ZZ          XY          YZ          ZX\n",
+            "  --------------------------------------------------------------------\n",
+            "  Alpha Z     0.22425     0.22425     0.22425\n",
+            "  Ewald      54.36487    43.93307   -43.78717     0.00000    -0.00000     0.00000\n",
+            "  -------------------------------------------------------------------\n",
+            "  Total      -8.22615   -16.37087   -24.79610     0.00000     0.00000     0.00000\n",
+            "  in kB     -13.17976   -26.22903   -39.72774     0.00000     0.00000     0.00000\n",
+        ]
+        # the second table has an additional contribution
+        lines = table + table[:4] + [table[4]] + table[4:]
+        for window in [24, 4, 1]:
+            self.assertEqual(
+                _get_delimiter_indices(
+                    lines=lines, trigger_indices=[0, 8], window=window
+                ),
+                np.array([[2, 5], [10, 14]]),
+            )
+
+    def test_from_file_fields(self):
+        for filename in self.file_list:
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            for fields in [
+                ["energies", "forces", "cells"],
+                ["time"],
+                ["pressures", "vbm_list"],
+            ]:
+                selected_outcar = Outcar()
+                selected_outcar.from_file(filename=filename, fields=fields)
+                self.assertEqual(
+                    sorted(selected_outcar.parse_dict.keys()), sorted(fields)
+                )
+                for key in fields:
+                    self.assertEqual(
+                        str(outcar.parse_dict[key]),
+                        str(selected_outcar.parse_dict[key]),
+                    )
+        with self.assertRaises(ValueError):
+            Outcar().from_file(filename=self.file_list[0], fields=["energy"])
+
+    def test_from_file_lazy(self):
+        for filename in self.file_list:
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            for memory_map in [False, True]:
+                lazy_outcar = Outcar()
+                lazy_outcar.from_file(
+                    filename=filename, lazy=True, memory_map=memory_map
+                )
+                self.assertEqual(
+                    list(lazy_outcar.parse_dict.keys()), list(outcar.parse_dict.keys())
+                )
+                self.assertEqual(
+                    str(lazy_outcar.parse_dict["energies"]),
+                    str(outcar.parse_dict["energies"]),
+                )
+                self.assertEqual(
+                    list(lazy_outcar.parse_dict._quantities.keys()), ["energies"]
+                )
+                self.assertEqual(
+                    str(lazy_outcar.to_dict_minimal()), str(outcar.to_dict_minimal())
+                )
+                for key, value in outcar.parse_dict.items():
+                    self.assertEqual(str(value), str(lazy_outcar.parse_dict[key]))
+                self.assertIsNone(lazy_outcar.parse_dict._lines)
+                with self.assertRaises(KeyError):
+                    lazy_outcar.parse_dict["energy"]
+                self.assertIsNone(lazy_outcar.parse_dict.get("energy"))
+        lazy_outcar = Outcar()
+        lazy_outcar.from_file(
+            filename=os.path.join(
+                self.file_location,
+                "../static/vasp_test_files/outcar_without_nions/OUTCAR",
+            ),
+            lazy=True,
+        )
+        with self.assertRaises(OutcarCollectError):
+            lazy_outcar.parse_dict["forces"]
+
+    def test_from_file_index(self):
+        for filename in self.file_list:
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp_filename = os.path.join(tmp_dir, "OUTCAR")
+                with open(filename, "rb") as f_in, open(tmp_filename, "wb") as f_out:
+                    f_out.write(f_in.read())
+                for _ in range(2):
+                    indexed_outcar = Outcar()
+                    indexed_outcar.from_file(filename=tmp_filename, index=True)
+                    self.assertTrue(os.path.exists(tmp_filename + ".vpidx"))
+                    for key, value in outcar.parse_dict.items():
+                        self.assertEqual(
+                            str(value), str(indexed_outcar.parse_dict[key])
+                        )
+                stat = os.stat(tmp_filename)
+                self.assertIsNotNone(
+                    _load_trigger_index(
+                        filename=tmp_filename,
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                    )
+                )
+                # a modified file makes the index stale, so it is rebuilt
+                with open(tmp_filename, "ab") as f:
+                    f.write(b" FREE ENERGIE OF THE ION-ELECTRON SYSTEM (eV)\n")
+                stat = os.stat(tmp_filename)
+                self.assertIsNone(
+                    _load_trigger_index(
+                        filename=tmp_filename,
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                    )
+                )
+                indexed_outcar = Outcar()
+                indexed_outcar.from_file(
+                    filename=tmp_filename, index=True, fields=["positions"]
+                )
+                self.assertEqual(
+                    str(outcar.parse_dict["positions"]),
+                    str(indexed_outcar.parse_dict["positions"]),
+                )
+                self.assertIsNotNone(
+                    _load_trigger_index(
+                        filename=tmp_filename,
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns,
+                    )
+                )
+
+    def test_from_file_parallel(self):
+        for filename in self.file_list:
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            parallel_outcar = Outcar()
+            parallel_outcar.from_file(filename=filename, processes=2)
+            self.assertEqual(
+                list(outcar.parse_dict.keys()), list(parallel_outcar.parse_dict.keys())
+            )
+            # small parts to split files with few ionic steps as well
+            for fields in [None, ["time", "forces", "n_elect"]]:
+                parse_dict = _parse_outcar_parallel(
+                    filename=filename, fields=fields, processes=2, max_part_size=1000
+                )
+                for key in fields if fields is not None else outcar.parse_dict.keys():
+                    self.assertEqual(str(outcar.parse_dict[key]), str(parse_dict[key]))
+        with self.assertRaises(ValueError):
+            Outcar().from_file(filename=self.file_list[0], processes=2, lazy=True)
+
+    def test_iter_steps(self):
+        record_keys = {
+            "energy": "energies",
+            "energy_sigma_0": "energies_zero",
+            "forces": "forces",
+            "positions": "positions",
+            "cell": "cells",
+            "stress": "stresses",
+            "temperature": "temperatures",
+            "magnetization": "magnetization",
+        }
+        for filename in self.file_list:
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            for chunk_size in [1000, 2**20]:
+                records = list(Outcar.iter_steps(filename, chunk_size=chunk_size))
+                self.assertEqual(len(records), len(outcar.parse_dict["energies"]))
+                for step, record in enumerate(records):
+                    self.assertEqual(set(record.keys()), set(record_keys.keys()))
+                    for record_key, key in record_keys.items():
+                        if step < len(outcar.parse_dict[key]):
+                            np.testing.assert_array_equal(
+                                record[record_key], outcar.parse_dict[key][step]
+                            )
+                        else:
+                            self.assertIsNone(record[record_key])
+
+    def test_follow(self):
+        for filename in self.file_list:
+            with open(filename, "rb") as f:
+                data = f.read()
+            outcar = Outcar()
+            outcar.from_file(filename=filename)
+            loop_ends = [
+                data.find(b"\n", i) + 1
+                for i in range(len(data))
+                if data.startswith(b"LOOP+", i)
+            ]
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                tmp_filename = os.path.join(tmp_dir, "OUTCAR")
+                followed_outcar = Outcar()
+                open(tmp_filename, "wb").close()
+                self.assertEqual(followed_outcar.follow(filename=tmp_filename), 0)
+                previous_end = 0
+                for step, end in enumerate(loop_ends):
+                    # an incomplete ionic step is held back
+                    with open(tmp_filename, "ab") as f:
+                        f.write(data[previous_end : end - 2])
+                    followed_outcar.follow(filename=tmp_filename)
+                    self.assertEqual(len(followed_outcar.parse_dict["energies"]), step)
+                    with open(tmp_filename, "ab") as f:
+                        f.write(data[end - 2 : end])
+                    self.assertEqual(followed_outcar.follow(filename=tmp_filename), 1)
+                    previous_end = end
+                with open(tmp_filename, "ab") as f:
+                    f.write(data[previous_end:])
+                followed_outcar.follow(filename=tmp_filename)
+                if b"General timing and accounting" in data:
+                    keys = outcar.parse_dict.keys()
+                else:
+                    # the end of an unfinished calculation can not be distinguished from an incomplete ionic step
+                    keys = [
+                        "energies",
+                        "forces",
+                        "positions",
+                        "cells",
+                        "stresses",
+                        "steps",
+                    ]
+                for key in keys:
+                    self.assertEqual(
+                        str(outcar.parse_dict[key]),
+                        str(followed_outcar.parse_dict[key]),
+                    )
+                # a replaced file is parsed from the start again
+                with open(tmp_filename, "wb") as f:
+                    f.write(data[: loop_ends[0]])
+                followed_outcar.follow(filename=tmp_filename)
+                self.assertEqual(len(followed_outcar.parse_dict["energies"]), 1)
+
     def test_error_on_parse(self):
         """OutcarCollectError should be raised when vital information cannot be read."""
         with self.assertRaises(OutcarCollectError):
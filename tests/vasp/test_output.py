@@ -1,5 +1,8 @@
+import gzip
 import unittest
 import os
+import shutil
+import tempfile
 from vaspparser.vasp.output import Output, parse_vasp_output
 from vaspparser.vasp.structure import read_atoms
 import numpy as np
@@ -38,6 +41,113 @@ class TestOutput(unittest.TestCase):
         self.assertIsNone(self.output.electrostatic_potential.total_data)
         self.assertIsNotNone(self.output.procar)
 
+    def test_collect_magmoms_as_array(self):
+        structure = read_atoms(
+            os.path.join(self.full_job_sample_path, "POSCAR"), species_list=["Fe"]
+        )
+        self.output.structure = structure
+        self.output.collect(directory=self.full_job_sample_path)
+        dft_log_dict = self.output.generic_output.dft_log_dict
+        magnetization = dft_log_dict["magnetization"]
+        final_magmoms = dft_log_dict["final_magmoms"]
+        self.assertIsInstance(final_magmoms, list)
+        output = Output()
+        output.structure = structure
+        output.collect(directory=self.full_job_sample_path, magmoms_as_array=True)
+        dft_log_dict = output.generic_output.dft_log_dict
+        self.assertIsInstance(dft_log_dict["final_magmoms"], np.ndarray)
+        np.testing.assert_array_equal(dft_log_dict["final_magmoms"], final_magmoms)
+        for step_magnetization, step_magnetization_array in zip(
+            magnetization, dft_log_dict["magnetization"]
+        ):
+            self.assertIsInstance(step_magnetization_array, np.ndarray)
+            np.testing.assert_array_equal(step_magnetization_array, step_magnetization)
+
+    def test_collect_vasprun_exclude(self):
+        structure = read_atoms(
+            os.path.join(self.full_job_sample_path, "POSCAR"), species_list=["Fe"]
+        )
+        self.output.structure = structure.copy()
+        self.output.collect(directory=self.full_job_sample_path)
+        output = Output()
+        output.structure = structure.copy()
+        output.collect(
+            directory=self.full_job_sample_path,
+            vasprun_exclude=["eigenvalues", "dos", "projected"],
+        )
+        self.assertFalse("grand_eigenvalue_matrix" in output.vp_new.vasprun_dict)
+        self.assertIsNone(output.electronic_structure.eigenvalue_matrix)
+        for key, value in self.output.generic_output.log_dict.items():
+            np.testing.assert_array_equal(
+                value, output.generic_output.log_dict[key], err_msg=key
+            )
+
+    def test_collect_vasprun_exclude_scstep(self):
+        structure = read_atoms(
+            os.path.join(self.full_job_sample_path, "POSCAR"), species_list=["Fe"]
+        )
+        self.output.structure = structure.copy()
+        self.output.collect(directory=self.full_job_sample_path)
+        dft_log_dict = self.output.generic_output.dft_log_dict
+        output = Output()
+        output.structure = structure.copy()
+        output.collect(directory=self.full_job_sample_path, vasprun_exclude=["scstep"])
+        self.assertFalse("scf_energies" in output.vp_new.vasprun_dict)
+        for key, value in self.output.generic_output.log_dict.items():
+            np.testing.assert_array_equal(
+                value, output.generic_output.log_dict[key], err_msg=key
+            )
+        # the energies of the ionic steps are taken from the OUTCAR file
+        for key in ["energy_free", "energy_zero"]:
+            self.assertTrue(
+                np.allclose(output.generic_output.dft_log_dict[key], dft_log_dict[key])
+            )
+        self.assertIn("scf_energy_free", output.generic_output.dft_log_dict)
+        # without the OUTCAR file they are taken from the vasprun.xml file
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for filename in ["vasprun.xml", "POSCAR"]:
+                shutil.copy(os.path.join(self.full_job_sample_path, filename), tmp_dir)
+            output = Output()
+            output.structure = structure.copy()
+            output.collect(directory=tmp_dir, vasprun_exclude=["scstep"])
+        self.assertNotIn("scf_energy_free", output.generic_output.dft_log_dict)
+        self.assertTrue(
+            np.array_equal(
+                output.generic_output.dft_log_dict["energy_zero"],
+                output.vp_new.vasprun_dict["total_0_energies"],
+            )
+        )
+
+    def test_collect_compressed(self):
+        structure = read_atoms(
+            os.path.join(self.full_job_sample_path, "POSCAR"), species_list=["Fe"]
+        )
+        self.output.structure = structure.copy()
+        self.output.collect(directory=self.full_job_sample_path)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for filename in os.listdir(self.full_job_sample_path):
+                path = os.path.join(self.full_job_sample_path, filename)
+                if filename in ["OUTCAR", "vasprun.xml", "OSZICAR", "CHGCAR"]:
+                    with (
+                        open(path, "rb") as f,
+                        gzip.open(
+                            os.path.join(tmp_dir, filename + ".gz"), "wb"
+                        ) as f_compressed,
+                    ):
+                        f_compressed.write(f.read())
+                else:
+                    shutil.copy(path, tmp_dir)
+            output = Output()
+            output.structure = structure.copy()
+            output.collect(directory=tmp_dir)
+        for key, value in self.output.generic_output.log_dict.items():
+            np.testing.assert_array_equal(
+                value, output.generic_output.log_dict[key], err_msg=key
+            )
+        np.testing.assert_array_equal(
+            self.output.charge_density.total_data, output.charge_density.total_data
+        )
+
     def test_to_dict(self):
         structure = read_atoms(
             os.path.join(self.full_job_sample_path, "POSCAR"), species_list=["Fe"]
@@ -85,6 +195,25 @@ class TestOutput(unittest.TestCase):
         self.assertIsNotNone(self.output.outcar)
         self.assertEqual(len(self.output.generic_output.log_dict), 11)
 
+    def test_collect_with_truncated_vasprun(self):
+        structure = read_atoms(
+            os.path.join(self.full_job_sample_path, "POSCAR"), species_list=["Fe"]
+        )
+        self.output.structure = structure
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for f in os.listdir(self.full_job_sample_path):
+                shutil.copy(os.path.join(self.full_job_sample_path, f), tmp_dir)
+            with open(os.path.join(tmp_dir, "vasprun.xml"), "rb") as f:
+                data = f.read()
+            # the file ends in the final structure after the only ionic step
+            with open(os.path.join(tmp_dir, "vasprun.xml"), "wb") as f:
+                f.write(data[: data.index(b"</calculation>") + 100])
+            with self.assertWarns(UserWarning):
+                self.output.collect(directory=tmp_dir)
+        self.assertTrue(self.output.vp_new.is_truncated)
+        self.assertEqual(len(self.output.generic_output.log_dict["positions"]), 1)
+        self.assertIsNotNone(self.output.electronic_structure)
+
     def test_collect_with_no_output_files(self):
         atoms = Atoms("H2", positions=[[0, 0, 0], [0, 0, 1]])
         self.output.structure = atoms
@@ -5,9 +5,12 @@
 import unittest
 import os
 import posixpath
+import tempfile
 import numpy as np
+import defusedxml.ElementTree as ETree
 from ase.atoms import Atoms
 from vaspparser.vasp.vasprun import Vasprun, VasprunError
+from vaspparser.vasp.vasprun_index import SIDECAR_SUFFIX, get_vasprun_index
 from vaspparser.dft.waves.electronic import ElectronicStructure
 
 __author__ = "surendralal"
@@ -39,6 +42,248 @@ class TestVasprun(unittest.TestCase):
         filename = posixpath.join(self.direc, "vasprun_spoilt.xml")
         self.assertRaises(VasprunError, vp.from_file, filename)
 
+    def test_from_file_exclude(self):
+        filename = posixpath.join(self.direc, "vasprun_2.xml")
+        vp_dict = self.vp_list[1].vasprun_dict
+        vp = Vasprun()
+        vp.from_file(filename, exclude=["projected", "partial", "scstep"])
+        for key in [
+            "grand_dos_matrix",
+            "resolved_dos_matrix",
+            "orbital_dict",
+            "scf_energies",
+            "scf_dipole_moments",
+        ]:
+            self.assertFalse(key in vp.vasprun_dict.keys())
+        for key in ["forces", "grand_eigenvalue_matrix", "spin_dos_density"]:
+            self.assertTrue(np.array_equal(vp.vasprun_dict[key], vp_dict[key]))
+        self.assertEqual(vp.vasprun_dict["efermi"], vp_dict["efermi"])
+        vp = Vasprun()
+        vp.from_file(filename, include=["generator", "parameters"])
+        for key in ["incar", "kpoints", "grand_eigenvalue_matrix", "efermi"]:
+            self.assertFalse(key in vp.vasprun_dict.keys())
+        self.assertEqual(vp.vasprun_dict["parameters"], vp_dict["parameters"])
+        self.assertTrue(
+            np.array_equal(vp.vasprun_dict["positions"], vp_dict["positions"])
+        )
+        self.assertRaises(ValueError, vp.from_file, filename, exclude=["forces"])
+
+    def test_from_file_truncated(self):
+        filename = posixpath.join(self.direc, "vasprun_1.xml")
+        vp_dict = self.vp_list[0].vasprun_dict
+        with open(filename, "rb") as f:
+            data = f.read()
+        # the file ends after the eigenvalues of the fourth and last ionic step
+        stop = data.index(b"</eigenvalues>") + len(b"</eigenvalues>")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            truncated_filename = os.path.join(tmp_dir, "vasprun.xml")
+            with open(truncated_filename, "wb") as f:
+                f.write(data[: data.index(b"</calculation>")])
+            self.assertRaises(VasprunError, Vasprun().from_file, truncated_filename)
+            self.assertRaises(
+                VasprunError,
+                Vasprun().from_file,
+                truncated_filename,
+                allow_truncated=True,
+            )
+            with open(truncated_filename, "wb") as f:
+                f.write(data[:stop])
+            self.assertRaises(VasprunError, Vasprun().from_file, truncated_filename)
+            vp = Vasprun()
+            vp.from_file(truncated_filename, allow_truncated=True)
+            self.assertTrue(vp.is_truncated)
+            self.assertEqual(
+                data[: vp.resume_offset].count(b"</calculation>"),
+                len(vp.vasprun_dict["total_energies"]),
+            )
+            self.assertTrue(data[: vp.resume_offset].endswith(b"</calculation>"))
+            for key in ["total_energies", "positions", "cells", "forces"]:
+                self.assertEqual(len(vp.vasprun_dict[key]), 3)
+                self.assertTrue(np.array_equal(vp.vasprun_dict[key], vp_dict[key][:3]))
+            self.assertEqual(
+                vp.vasprun_dict["scf_energies"], vp_dict["scf_energies"][:3]
+            )
+            # the data of the incomplete ionic step is dropped
+            self.assertFalse("grand_eigenvalue_matrix" in vp.vasprun_dict.keys())
+            self.assertEqual(vp.update_from_file(truncated_filename), 0)
+            self.assertTrue(vp.is_truncated)
+            with open(truncated_filename, "wb") as f:
+                f.write(data)
+            self.assertEqual(vp.update_from_file(truncated_filename), 1)
+            self.assertFalse(vp.is_truncated)
+            self.assertEqual(vp.update_from_file(truncated_filename), 0)
+        self.assertEqual(vp.vasprun_dict.keys(), vp_dict.keys())
+        np.testing.assert_equal(vp.vasprun_dict, vp_dict)
+
+    def test_eigenvalue_history(self):
+        with open(posixpath.join(self.direc, "vasprun_1.xml")) as f:
+            text = f.read()
+        # the last ionic step, which contains eigenvalues, is repeated with shifted eigenvalues
+        start = text.rindex("<calculation>")
+        stop = text.index("</calculation>", start) + len("</calculation>")
+        calculation = text[start:stop]
+        shifted = calculation.replace("<r> -", "<r> -1")
+        text = text[:stop] + shifted + calculation + text[stop:]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "vasprun.xml")
+            with open(filename, "w") as f:
+                f.write(text)
+            vp = Vasprun()
+            vp.from_file(filename)
+            vp_history = Vasprun()
+            vp_history.from_file(
+                filename, eigenvalue_history=True, eigenvalue_history_dtype=np.float32
+            )
+            records = list(vp.iter_calculations(filename, eigenvalues=True))
+            # the file is not scanned for the number of ionic steps
+            self.assertFalse(os.path.exists(filename + SIDECAR_SUFFIX))
+            # but an existing index is used to preallocate the history
+            get_vasprun_index(filename, sidecar=True)
+            vp_indexed = Vasprun()
+            vp_indexed.from_file(filename, eigenvalue_history=True)
+        d = vp_history.vasprun_dict
+        for key in [
+            "eigenvalue_history_steps",
+            "grand_eigenvalue_history",
+            "grand_occupancy_history",
+        ]:
+            self.assertTrue(np.allclose(vp_indexed.vasprun_dict[key], d[key]))
+        self.assertFalse("grand_eigenvalue_history" in vp.vasprun_dict.keys())
+        self.assertEqual(list(d["eigenvalue_history_steps"]), [3, 4, 5])
+        self.assertEqual(d["grand_eigenvalue_history"].dtype, np.float32)
+        self.assertEqual(
+            d["grand_eigenvalue_history"].shape,
+            (3,) + vp.vasprun_dict["grand_eigenvalue_matrix"].shape,
+        )
+        for i, step in enumerate(d["eigenvalue_history_steps"]):
+            self.assertTrue(
+                np.allclose(
+                    d["grand_eigenvalue_history"][i], records[step]["eigenvalues"]
+                )
+            )
+            self.assertTrue(
+                np.allclose(
+                    d["grand_occupancy_history"][i], records[step]["occupancies"]
+                )
+            )
+        self.assertFalse(
+            np.allclose(
+                d["grand_eigenvalue_history"][0], d["grand_eigenvalue_history"][1]
+            )
+        )
+        # only the eigenvalues of the last ionic step are kept in the grand_eigenvalue_matrix
+        for key in ["grand_eigenvalue_matrix", "grand_occupancy_matrix"]:
+            self.assertTrue(np.array_equal(d[key], vp.vasprun_dict[key]))
+        self.assertTrue(
+            np.array_equal(
+                vp.vasprun_dict["grand_eigenvalue_matrix"], records[-1]["eigenvalues"]
+            )
+        )
+
+    def test_projected_dos_dtype(self):
+        vp_dict = self.vp_list[1].vasprun_dict
+        vp = Vasprun()
+        vp.from_file(
+            posixpath.join(self.direc, "vasprun_2.xml"), projected_dos_dtype=np.float32
+        )
+        grand_dos_matrix = vp.vasprun_dict["grand_dos_matrix"]
+        self.assertEqual(grand_dos_matrix.dtype, np.float32)
+        self.assertEqual(grand_dos_matrix.shape, vp_dict["grand_dos_matrix"].shape)
+        self.assertTrue(
+            np.allclose(grand_dos_matrix, vp_dict["grand_dos_matrix"], atol=1e-6)
+        )
+        self.assertEqual(vp.vasprun_dict["orbital_dict"], vp_dict["orbital_dict"])
+
+    def test_projected_dos_spin_polarized(self):
+        with open(posixpath.join(self.direc, "vasprun_2.xml")) as f:
+            text = f.read()
+        start = text.index('<set comment="spin1">')
+        stop = text.index("</array>", start)
+        stop = text.rindex("</set>", start, text.rindex("</set>", start, stop))
+        spin_2 = text[start:stop].replace("spin1", "spin2").replace("0.0", "0.1")
+        text = text[:stop] + "</set>\n" + spin_2 + text[stop:]
+        text = text.replace('name="ISPIN">     1', 'name="ISPIN">     2')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "vasprun.xml")
+            with open(filename, "w") as f:
+                f.write(text)
+            vp = Vasprun()
+            vp.from_file(filename)
+            # without the parameters the projections are not streamed
+            vp_complete = Vasprun()
+            vp_complete.from_file(filename, exclude=["parameters"])
+        grand_dos_matrix = vp.vasprun_dict["grand_dos_matrix"]
+        self.assertEqual(grand_dos_matrix.shape, (2, 36, 72, 12, 9))
+        self.assertTrue(
+            np.array_equal(
+                grand_dos_matrix, vp_complete.vasprun_dict["grand_dos_matrix"]
+            )
+        )
+        self.assertFalse(np.array_equal(grand_dos_matrix[0], grand_dos_matrix[1]))
+
+    def test_iter_calculations(self):
+        for f in ["vasprun_1.xml", "vasprun_9.xml"]:
+            vp = Vasprun()
+            vp.from_file(posixpath.join(self.direc, f))
+            d = vp.vasprun_dict
+            records = list(
+                Vasprun().iter_calculations(
+                    posixpath.join(self.direc, f), eigenvalues=True
+                )
+            )
+            self.assertEqual(len(records), len(d["positions"]))
+            for i, record in enumerate(records):
+                self.assertEqual(record["total_energy"], d["total_energies"][i])
+                self.assertEqual(record["total_0_energy"], d["total_0_energies"][i])
+                self.assertTrue(
+                    np.array_equal(record["scf_fr_energies"], d["scf_fr_energies"][i])
+                )
+                self.assertTrue(np.allclose(record["positions"], d["positions"][i]))
+                self.assertTrue(np.array_equal(record["cell"], d["cells"][i]))
+                self.assertTrue(np.array_equal(record["forces"], d["forces"][i]))
+                if len(d["stress_tensors"]) > 0:
+                    self.assertTrue(
+                        np.array_equal(record["stress"], d["stress_tensors"][i])
+                    )
+                else:
+                    self.assertIsNone(record["stress"])
+                if "kinetic_energies" in d.keys():
+                    self.assertEqual(record["kinetic_energy"], d["kinetic_energies"][i])
+                else:
+                    self.assertIsNone(record["kinetic_energy"])
+            self.assertTrue(
+                np.array_equal(records[-1]["eigenvalues"], d["grand_eigenvalue_matrix"])
+            )
+            self.assertTrue(
+                np.array_equal(records[-1]["occupancies"], d["grand_occupancy_matrix"])
+            )
+        records = Vasprun().iter_calculations(
+            posixpath.join(self.direc, "vasprun_1.xml")
+        )
+        self.assertFalse("eigenvalues" in next(records).keys())
+        spoilt = Vasprun().iter_calculations(
+            posixpath.join(self.direc, "vasprun_spoilt.xml")
+        )
+        self.assertRaises(VasprunError, list, spoilt)
+
+    def test_get_calculation(self):
+        filename = posixpath.join(self.direc, "vasprun_1.xml")
+        vp = Vasprun()
+        records = list(vp.iter_calculations(filename, eigenvalues=True))
+        np.testing.assert_equal(
+            vp.get_last_calculation(filename, eigenvalues=True), records[-1]
+        )
+        np.testing.assert_equal(
+            vp.get_calculation(1, filename, eigenvalues=True), records[1]
+        )
+        np.testing.assert_equal(
+            vp.get_calculations(slice(None, None, 2), filename),
+            list(vp.iter_calculations(filename))[::2],
+        )
+        self.assertNotIn("eigenvalues", vp.get_last_calculation(filename).keys())
+        self.assertRaises(IndexError, vp.get_calculation, 4, filename)
+        self.assertEqual(vp.vasprun_dict, dict())
+
     def test_get_potentiostat_output(self):
         for i, vp in enumerate(self.vp_list):
             if i == 8:
@@ -156,6 +401,67 @@ class TestVasprun(unittest.TestCase):
                 self.assertIsInstance(d["orbital_dict"], dict)
                 self.assertEqual(len(d["orbital_dict"].keys()), n_orbitals)
 
+    def test_parse_calc_to_dict(self):
+        filename = posixpath.join(self.direc, "vasprun_2.xml")
+        calculation = ETree.parse(filename).getroot().find("calculation")
+        d = {
+            key: list()
+            for key in [
+                "positions",
+                "cells",
+                "forces",
+                "stress_tensors",
+                "total_energies",
+                "total_fr_energies",
+                "total_0_energies",
+                "kinetic_energies",
+                "scf_energies",
+                "scf_fr_energies",
+                "scf_0_energies",
+                "scf_dipole_moments",
+            ]
+        }
+        vp = Vasprun()
+        vp.parse_calc_to_dict(calculation, d)
+        vp_dict = self.vp_list[1].vasprun_dict
+        for key in [
+            "efermi",
+            "grand_eigenvalue_matrix",
+            "grand_dos_matrix",
+            "resolved_dos_matrix",
+            "spin_dos_density",
+        ]:
+            self.assertTrue(np.array_equal(d[key], vp_dict[key]))
+        self.assertTrue(np.array_equal(d["forces"][-1], vp_dict["forces"][-1]))
+
+    def test_parse_2d_matrix(self):
+        vp = Vasprun()
+        node = ETree.fromstring(
+            '<varray name="forces"><v> 0.1 -0.2 0.3 </v><v>1.0 2.0 -3.0E-01</v></varray>'
+        )
+        self.assertTrue(
+            np.array_equal(
+                vp._parse_2d_matrix(node), [[0.1, -0.2, 0.3], [1.0, 2.0, -0.3]]
+            )
+        )
+        node = ETree.fromstring(
+            '<varray name="selective" type="logical">'
+            '<v type="logical"> F F T</v><v type="logical">T F F </v></varray>'
+        )
+        selective = vp._parse_2d_matrix(node, vec_type=bool)
+        self.assertEqual(selective.dtype, bool)
+        self.assertTrue(
+            np.array_equal(selective, [[False, False, True], [True, False, False]])
+        )
+        node = ETree.fromstring("<set><r> 1 2 </r><r> 3 </r></set>")
+        self.assertRaises(ValueError, vp._parse_2d_matrix, node)
+        # the total number of values is divisible by the number of rows
+        node = ETree.fromstring("<set><r> 1 2 3 </r><r> 4 </r></set>")
+        self.assertRaises(ValueError, vp._parse_2d_matrix, node)
+        node = ETree.fromstring("<set><r> 1 2 </r><r> 3 *** </r></set>")
+        self.assertRaises(ValueError, vp._parse_2d_matrix, node)
+        self.assertEqual(len(vp._parse_2d_matrix(ETree.fromstring("<set/>"))), 0)
+
     def test_parse_parameters(self):
         for vp in self.vp_list:
             d = vp.vasprun_dict
